@@ -8,10 +8,7 @@ def check_python_packages():
         'opencv-python': 'cv2',
         'numpy': 'numpy',
         'PyMuPDF': 'fitz',
-        'Pillow': 'PIL',
-        'mediapipe': 'mediapipe',
-        'python-pptx': 'pptx',
-        'pdf2image': 'pdf2image'
+        'mediapipe': 'mediapipe'
     }
     
     missing_packages = []
@@ -40,16 +37,6 @@ def check_system_dependencies():
     else:
         print("❌ LibreOffice is not found at expected location")
         print("   Please install LibreOffice from: https://www.libreoffice.org/download/download/")
-    
-    # Check Poppler
-    try:
-        from pdf2image.exceptions import PDFInfoNotInstalledError # type: ignore
-        from pdf2image import pdfinfo_from_path # type: ignore
-        print("✅ Poppler is installed and working")
-    except Exception:
-        print("❌ Poppler is not properly installed")
-        print("   For Windows: Download from http://blog.alivate.com.au/poppler-windows/")
-        print("   For Linux: sudo apt-get install poppler-utils")
 
 def install_missing_packages(missing_packages):
     if not missing_packages:
@@ -1,7 +1,23 @@
-from flask import Flask
-from flask_socketio import SocketIO
-from flask_cors import CORS
-from app.gesture_processor import HandGestureProcessor
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from app.startup import startup_report
+
+with startup_report.step('import flask'):
+    from flask import Flask
+    from flask_socketio import SocketIO
+    from flask_cors import CORS
+with startup_report.step('import app modules'):
+    from app.gesture_processor import HandGestureProcessor
+    from app.session_manager import SessionManager
+    from app.deck_cache import DeckCache
+    from app.metrics import Metrics
+    from app.converter import ConverterPool
+    from app.conversion_jobs import ConversionJobs
+    from app.broadcast import ViewerRooms
+    from app.quality import QualityController
 
 
 app = Flask(__name__)
@@ -13,6 +29,148 @@ socketio = SocketIO(app,
     ping_interval=5
 )
 
-# Initialize gesture processor
-gesture_processor = HandGestureProcessor()
-from app import routes
+# One gesture processor per connected presenter
+app.config.setdefault('MAX_SESSIONS', 8)
+app.config.setdefault('SESSION_IDLE_TIMEOUT', 300)
+# Seconds a disconnected presenter has to reconnect and resume its session
+app.config.setdefault('SESSION_RECONNECT_GRACE', 30)
+# Seconds between sweeps closing idle and expired detached sessions
+app.config.setdefault('SESSION_REAP_INTERVAL', 5)
+# Keep one processor built and warmed up ahead of the next presenter
+app.config.setdefault('WARM_SPARE_PROCESSOR', True)
+# Overlap decode/inference/encode of consecutive frames on multi-core hosts
+app.config.setdefault('PIPELINED_FRAMES', False)
+# Frames waiting in front of each pipeline stage; more only adds latency,
+# since the mailbox already holds the newest frame
+app.config.setdefault('PIPELINE_DEPTH', 1)
+# Converted decks are cached on disk by content hash
+app.config.setdefault('DECK_CACHE_DIR', None)
+app.config.setdefault('DECK_CACHE_MAX_BYTES', 2 * 1024 ** 3)
+# Rendered slides held in memory per presenter
+app.config.setdefault('SLIDE_RASTER_CACHE_BYTES', 128 * 1024 ** 2)
+# Processes rasterizing slides in parallel after an upload; 0 renders lazily
+app.config.setdefault('RENDER_WORKERS', min(os.cpu_count() or 1, 4))
+# Undo history per annotated slide; older strokes are folded into a snapshot
+app.config.setdefault('ANNOTATION_HISTORY_BYTES', 4 * 1024 ** 2)
+app.config.setdefault('CHECKPOINT_STROKES', 16)
+# Predict landmarks between MediaPipe calls, for at most this many frames
+app.config.setdefault('ADAPTIVE_INFERENCE', False)
+app.config.setdefault('MAX_INFERENCE_GAP', 2)
+# JSON gesture definitions; None uses app/gesture_table.json
+app.config.setdefault('GESTURE_TABLE', None)
+# Max grey-level change for a camera frame to count as a repeat; 0 disables
+app.config.setdefault('DUPLICATE_FRAME_THRESHOLD', 4)
+# LibreOffice workers for pptx -> pdf; SOFFICE_PATH=None searches PATH
+app.config.setdefault('SOFFICE_PATH', None)
+app.config.setdefault('CONVERTER_POOL_SIZE', 2)
+app.config.setdefault('CONVERSION_TIMEOUT', 120)
+app.config.setdefault('CONVERTER_PROFILE_DIR', None)
+# Output encoder: 'auto' (libjpeg-turbo if installed, else OpenCV), 'opencv',
+# 'turbojpeg' or 'webp'; see benchmarks/bench_encoders.py
+app.config.setdefault('FRAME_ENCODER', 'auto')
+app.config.setdefault('CHROMA_SUBSAMPLING', '420')
+# Per-connection output quality, resolution and client capture rate/size,
+# lowered while the round trip exceeds the target; ranges are best, worst
+app.config.setdefault('ADAPTIVE_QUALITY', True)
+app.config.setdefault('QUALITY_TARGET_LATENCY', 0.2)
+app.config.setdefault('JPEG_QUALITY_RANGE', [85, 50])
+app.config.setdefault('OUTPUT_SCALE_RANGE', [1.0, 0.5])
+app.config.setdefault('CAPTURE_FPS_RANGE', [30, 8])
+app.config.setdefault('CAPTURE_WIDTH_RANGE', [800, 480])
+# Let clients ask for scene updates (cached slides + vector ink) instead of
+# encoded frames with the 'render_mode' event
+app.config.setdefault('CLIENT_COMPOSITING', True)
+# Audience viewers per presentation; a viewer not acking within the
+# timeout is sent frames again
+app.config.setdefault('MAX_VIEWERS', 200)
+app.config.setdefault('VIEWER_ACK_TIMEOUT', 5.0)
+# Prometheus-text latency histograms and counters at /metrics
+app.config.setdefault('METRICS_ENABLED', True)
+app.config.from_prefixed_env()
+
+metrics = Metrics() if app.config['METRICS_ENABLED'] else None
+
+deck_cache = DeckCache(
+    root=app.config['DECK_CACHE_DIR'],
+    max_bytes=app.config['DECK_CACHE_MAX_BYTES']
+)
+# Spawned rather than forked: the server process is multi-threaded. Workers
+# only import render_worker, never this package
+render_pool = ProcessPoolExecutor(
+    max_workers=app.config['RENDER_WORKERS'],
+    mp_context=multiprocessing.get_context('spawn')
+) if app.config['RENDER_WORKERS'] else None
+converter = ConverterPool(
+    size=app.config['CONVERTER_POOL_SIZE'],
+    soffice=app.config['SOFFICE_PATH'],
+    profile_root=app.config['CONVERTER_PROFILE_DIR'],
+    timeout=app.config['CONVERSION_TIMEOUT']
+)
+conversion_jobs = ConversionJobs(
+    max_workers=app.config['CONVERTER_POOL_SIZE'],
+    on_update=lambda job: socketio.emit('conversion_progress', job.to_dict(), to=job.sid)
+)
+viewer_rooms = ViewerRooms(
+    send=lambda event, data, to, skip_sid=None: socketio.emit(event, data, to=to, skip_sid=skip_sid),
+    ack_timeout=app.config['VIEWER_ACK_TIMEOUT'],
+    max_viewers=app.config['MAX_VIEWERS']
+)
+
+def _end_presentation(session):
+    # Viewers outlast a presenter's reconnect; only a closed session ends the show
+    room = viewer_rooms.close(session.sid)
+    if room is not None:
+        socketio.emit('presentation_ended', {'presentation_id': room.id}, to=room.room)
+        socketio.close_room(room.room)
+
+session_manager = SessionManager(
+    max_sessions=app.config['MAX_SESSIONS'],
+    idle_timeout=app.config['SESSION_IDLE_TIMEOUT'],
+    reconnect_grace=app.config['SESSION_RECONNECT_GRACE'],
+    processor_factory=lambda: HandGestureProcessor(
+        deck_cache=deck_cache,
+        raster_cache_bytes=app.config['SLIDE_RASTER_CACHE_BYTES'],
+        adaptive_inference=app.config['ADAPTIVE_INFERENCE'],
+        max_inference_gap=app.config['MAX_INFERENCE_GAP'],
+        gesture_table=app.config['GESTURE_TABLE'],
+        metrics=metrics,
+        duplicate_threshold=app.config['DUPLICATE_FRAME_THRESHOLD'],
+        converter=converter,
+        render_pool=render_pool,
+        history_bytes=app.config['ANNOTATION_HISTORY_BYTES'],
+        checkpoint_strokes=app.config['CHECKPOINT_STROKES'],
+        frame_encoder=app.config['FRAME_ENCODER'],
+        output_quality=app.config['JPEG_QUALITY_RANGE'][0],
+        chroma_subsampling=app.config['CHROMA_SUBSAMPLING']
+    ),
+    warm_spare=app.config['WARM_SPARE_PROCESSOR'],
+    quality_factory=lambda: QualityController(
+        target_latency=app.config['QUALITY_TARGET_LATENCY'],
+        quality_range=tuple(app.config['JPEG_QUALITY_RANGE']),
+        scale_range=tuple(app.config['OUTPUT_SCALE_RANGE']),
+        fps_range=tuple(app.config['CAPTURE_FPS_RANGE']),
+        capture_range=tuple(app.config['CAPTURE_WIDTH_RANGE'])
+    ) if app.config['ADAPTIVE_QUALITY'] else None,
+    on_close=_end_presentation
+)
+
+def reap_sessions():
+    """Close idle sessions and detached ones whose reconnect grace ran out.
+
+    Runs forever; start it with ``socketio.start_background_task``.
+    Without it sessions are only reclaimed when another presenter arrives.
+    """
+    while True:
+        socketio.sleep(app.config['SESSION_REAP_INTERVAL'])
+        try:
+            session_manager.evict_idle()
+        except Exception as e:
+            logging.error(f"Error reaping presenter sessions: {e}")
+
+if metrics is not None:
+    metrics.gauge('gesture_active_sessions', 'Connected presenter sessions.', lambda: len(session_manager))
+    metrics.gauge('gesture_viewers', 'Connected audience viewers.', lambda: len(viewer_rooms))
+    metrics.gauge('gesture_slide_raster_bytes', 'Memory held by rendered slide rasters.',
+                  session_manager.raster_bytes)
+with startup_report.step('import routes'):
+    from app import routes
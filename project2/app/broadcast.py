@@ -0,0 +1,182 @@
+import secrets
+import threading
+import time
+
+
+class _Viewer:
+    __slots__ = ('sid', 'in_flight_since', 'pending', 'sent', 'dropped')
+
+    def __init__(self, sid):
+        self.sid = sid
+        self.in_flight_since = None  # monotonic send time of the unacknowledged frame
+        self.pending = False  # a newer frame is waiting for the ack
+        self.sent = 0
+        self.dropped = 0
+
+
+class ViewerRoom:
+    """Audience viewers watching one presenter's output.
+
+    Every viewer is in the Socket.IO room ``room``, and ``publish`` sends a
+    frame to all of them with a single room emit, so the message is encoded
+    once however many viewers there are. Each viewer has at most one
+    unacknowledged frame: viewers still waiting for an ack are skipped and
+    only remember that a newer frame exists, which they get as soon as they
+    ack. A slow viewer therefore just sees fewer frames, never a backlog,
+    and never holds up the presenter or other viewers.
+    """
+
+    def __init__(self, presenter_sid, send, ack_timeout=5.0):
+        self.presenter_sid = presenter_sid
+        self.id = secrets.token_urlsafe(6)
+        self.room = f'viewers:{self.id}'
+        self.send = send  # send(event, data, to, skip_sid=None)
+        self.ack_timeout = ack_timeout
+        self._viewers = {}
+        self._latest = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._viewers)
+
+    def add(self, sid):
+        """Register a viewer that has joined ``room``; sends it the current frame."""
+        with self._lock:
+            viewer = self._viewers[sid] = _Viewer(sid)
+            message = self._latest
+            if message is not None:
+                self._mark_sent(viewer, time.monotonic())
+        if message is not None:
+            self.send('viewer_frame', message, to=sid)
+
+    def remove(self, sid):
+        with self._lock:
+            return self._viewers.pop(sid, None) is not None
+
+    def publish(self, message):
+        with self._lock:
+            self._latest = message
+            if not self._viewers:
+                return
+            now = time.monotonic()
+            busy = []
+            for viewer in self._viewers.values():
+                if viewer.in_flight_since is not None and now - viewer.in_flight_since < self.ack_timeout:
+                    if viewer.pending:
+                        viewer.dropped += 1
+                    viewer.pending = True
+                    busy.append(viewer.sid)
+                else:
+                    self._mark_sent(viewer, now)
+            if len(busy) == len(self._viewers):
+                return
+        self.send('viewer_frame', message, to=self.room, skip_sid=busy)
+
+    def ack(self, sid):
+        """A viewer finished displaying its frame; send the newest if it missed one."""
+        with self._lock:
+            viewer = self._viewers.get(sid)
+            if viewer is None:
+                return
+            viewer.in_flight_since = None
+            if not viewer.pending:
+                return
+            message = self._latest
+            self._mark_sent(viewer, time.monotonic())
+        self.send('viewer_frame', message, to=sid)
+
+    def _mark_sent(self, viewer, now):
+        viewer.in_flight_since = now
+        viewer.pending = False
+        viewer.sent += 1
+
+    def stats(self):
+        with self._lock:
+            return {sid: {'sent': v.sent, 'dropped': v.dropped} for sid, v in self._viewers.items()}
+
+
+class ViewerRooms:
+    """Viewer rooms by presentation id, presenter sid and viewer sid."""
+
+    def __init__(self, send, ack_timeout=5.0, max_viewers=200):
+        self.send = send
+        self.ack_timeout = ack_timeout
+        self.max_viewers = max_viewers
+        self._by_id = {}
+        self._by_presenter = {}
+        self._by_viewer = {}
+        self._lock = threading.Lock()
+
+    def open(self, presenter_sid):
+        """Room for ``presenter_sid``, created on first use."""
+        with self._lock:
+            room = self._by_presenter.get(presenter_sid)
+            if room is None:
+                room = ViewerRoom(presenter_sid, self.send, self.ack_timeout)
+                self._by_presenter[presenter_sid] = room
+                self._by_id[room.id] = room
+            return room
+
+    def for_presenter(self, presenter_sid):
+        return self._by_presenter.get(presenter_sid)
+
+    def has_viewers(self, presenter_sid):
+        room = self._by_presenter.get(presenter_sid)
+        return room is not None and len(room) > 0
+
+    def join(self, presentation_id, sid):
+        """Add viewer ``sid``; returns the room, or None if it is unknown or full.
+
+        The caller must put ``sid`` in ``room.room`` before the first
+        ``publish``; the room only tracks acks.
+        """
+        with self._lock:
+            room = self._by_id.get(presentation_id)
+            if room is None or len(room) >= self.max_viewers:
+                return None
+            previous = self._by_viewer.get(sid)
+            self._by_viewer[sid] = room
+        if previous is not None and previous is not room:
+            previous.remove(sid)
+        return room
+
+    def ack(self, sid):
+        room = self._by_viewer.get(sid)
+        if room is not None:
+            room.ack(sid)
+
+    def leave(self, sid):
+        """Forget viewer ``sid``.
+
+        A presenter's room outlives its socket, so a presenter that
+        reconnects can be ``retarget``-ed to it; see ``close``.
+        """
+        with self._lock:
+            room = self._by_viewer.pop(sid, None)
+        if room is not None:
+            room.remove(sid)
+
+    def retarget(self, old_sid, sid):
+        """Move a reconnected presenter's room to its new sid."""
+        with self._lock:
+            room = self._by_presenter.pop(old_sid, None)
+            if room is not None:
+                room.presenter_sid = sid
+                self._by_presenter[sid] = room
+        return room
+
+    def close(self, presenter_sid):
+        """Close the presenter's room once its session is gone.
+
+        Returns the closed room so the caller can notify its viewers.
+        """
+        with self._lock:
+            closed = self._by_presenter.pop(presenter_sid, None)
+            if closed is not None:
+                self._by_id.pop(closed.id, None)
+                for viewer_sid in [v for v, r in self._by_viewer.items() if r is closed]:
+                    del self._by_viewer[viewer_sid]
+        return closed
+
+    def __len__(self):
+        return len(self._by_viewer)
@@ -0,0 +1,124 @@
+from collections import OrderedDict
+
+import numpy as np
+
+
+def union_rect(a, b):
+    return (min(a[0], b[0]), min(a[1], b[1]), max(a[2], b[2]), max(a[3], b[3]))
+
+
+class Compositor:
+    """Incrementally maintained output frame.
+
+    For every surface (a slide or the whiteboard) a cached composite of the
+    background plus ink is kept and patched only inside the dirty rectangles
+    reported by its ``TiledCanvas``. The output buffer is reused between
+    frames: transient overlays (pointer, toolbar, status text) are drawn
+    onto it after ``compose`` and registered with ``mark_transient`` so the
+    next frame restores just those rectangles from the composite.
+
+    Rectangles are ``(x0, y0, x1, y1)`` with exclusive right/bottom edges.
+    Transients carry a token describing what was drawn; ``frame_changes``
+    compares tokens with the previous frame to report only the rectangles
+    whose pixels actually differ, and ``version`` counts output frames that
+    changed at all.
+    """
+
+    def __init__(self, height, width, max_composites=4):
+        self.height = height
+        self.width = width
+        self.max_composites = max_composites
+        self._composites = OrderedDict()  # surface key -> slide+ink composite
+        self._output = np.zeros((height, width, 3), dtype=np.uint8)
+        self._output_key = None
+        self._transient = []
+        self._previous_transient = []
+        self._full_change = True
+        self._dirty = []
+        self.version = 0
+
+    @property
+    def full_rect(self):
+        return (0, 0, self.width, self.height)
+
+    def invalidate(self, key=None):
+        """Forget the composite for ``key`` (or all of them)."""
+        if key is None:
+            self._composites.clear()
+            self._output_key = None
+        else:
+            self._composites.pop(key, None)
+            if self._output_key == key:
+                self._output_key = None
+
+    def compose(self, key, background, canvas=None):
+        """Bring the output buffer up to date with ``background`` + ``canvas``.
+
+        Returns the output buffer, which stays owned by the compositor.
+        """
+        dirty = canvas.take_dirty() if canvas is not None else []
+        composite = self._composites.get(key)
+        if composite is None:
+            composite = np.array(background, dtype=np.uint8, copy=True)
+            if canvas is not None and not canvas.is_empty():
+                canvas.composite(composite)
+            self._composites[key] = composite
+            while len(self._composites) > self.max_composites:
+                self._composites.popitem(last=False)
+            dirty = [self.full_rect]
+        else:
+            self._composites.move_to_end(key)
+            for x0, y0, x1, y1 in dirty:
+                composite[y0:y1, x0:x1] = background[y0:y1, x0:x1]
+                canvas.composite(composite, (x0, y0, x1, y1))
+
+        self._full_change = self._output_key != key or self.full_rect in dirty
+        if self._full_change:
+            np.copyto(self._output, composite)
+            self._output_key = key
+            self._dirty = []
+        else:
+            self._dirty = dirty
+            for x0, y0, x1, y1 in [rect for rect, _ in self._transient] + dirty:
+                self._output[y0:y1, x0:x1] = composite[y0:y1, x0:x1]
+
+        self._previous_transient = self._transient
+        self._transient = []
+        return self._output
+
+    def mark_transient(self, rect, token=None):
+        """Record an overlay drawn on the output so it is undone next frame.
+
+        ``token`` identifies the overlay's appearance (e.g. the pointer
+        position or the status text); a transient with the same rectangle
+        and token as on the previous frame is not reported as changed. A
+        None token always counts as changed.
+        """
+        x0, y0, x1, y1 = rect
+        rect = (max(int(x0), 0), max(int(y0), 0),
+                min(int(x1), self.width), min(int(y1), self.height))
+        if rect[0] < rect[2] and rect[1] < rect[3]:
+            self._transient.append((rect, token))
+
+    def frame_changes(self):
+        """Rectangles of the output that differ from the previous frame.
+
+        Call after all transients of the frame have been drawn. Returns an
+        empty list when the frame is pixel-identical to the previous one.
+        """
+        if self._full_change:
+            changes = [self.full_rect]
+        else:
+            current = set(t for t in self._transient if t[1] is not None)
+            previous = set(t for t in self._previous_transient if t[1] is not None)
+            changes = list(self._dirty)
+            changes += [rect for rect, token in self._transient
+                        if token is None or (rect, token) not in previous]
+            changes += [rect for rect, token in self._previous_transient
+                        if token is None or (rect, token) not in current]
+        if changes:
+            self.version += 1
+        return changes
+
+    def memory_usage(self):
+        return self._output.nbytes + sum(c.nbytes for c in self._composites.values())
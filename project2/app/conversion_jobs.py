@@ -0,0 +1,105 @@
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ConversionJob:
+    """Progress of one uploaded presentation."""
+
+    def __init__(self, sid, filename=None):
+        self.id = uuid.uuid4().hex
+        self.sid = sid
+        self.filename = filename
+        self.state = 'queued'  # queued -> converting -> rendering -> done | failed
+        self.progress = 0.0
+        self.message = None
+        self.error = None
+        self.created_at = time.time()
+        self.finished_at = None
+
+    @property
+    def finished(self):
+        return self.state in ('done', 'failed')
+
+    def to_dict(self):
+        return {
+            'job_id': self.id,
+            'filename': self.filename,
+            'state': self.state,
+            'progress': round(self.progress, 3),
+            'message': self.message,
+            'error': self.error,
+            'created_at': self.created_at,
+            'finished_at': self.finished_at
+        }
+
+
+class ConversionJobs:
+    """Runs deck conversions off the request thread.
+
+    ``submit(sid, work)`` returns a job immediately and later calls
+    ``work(job)`` on one of ``max_workers`` threads; ``work`` reports
+    progress through ``update`` and raises to fail the job. Every state
+    change is passed to ``on_update(job)``. The most recent ``keep`` jobs
+    stay queryable through ``get``.
+    """
+
+    def __init__(self, max_workers=2, on_update=None, keep=100):
+        self.on_update = on_update
+        self.keep = keep
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='deck-convert')
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, sid, work, filename=None):
+        job = ConversionJob(sid, filename)
+        with self._lock:
+            self._jobs[job.id] = job
+            while len(self._jobs) > self.keep:
+                self._jobs.popitem(last=False)
+        self._notify(job)
+        self._executor.submit(self._run, job, work)
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def retarget(self, old_sid, sid):
+        """Report unfinished jobs of a reconnected presenter to its new sid."""
+        with self._lock:
+            for job in self._jobs.values():
+                if job.sid == old_sid and not job.finished:
+                    job.sid = sid
+
+    def update(self, job, state=None, progress=None, message=None):
+        if state is not None:
+            job.state = state
+        if progress is not None:
+            job.progress = progress
+        job.message = message
+        self._notify(job)
+
+    def _run(self, job, work):
+        try:
+            work(job)
+            job.finished_at = time.time()
+            self.update(job, 'done', 1.0)
+        except Exception as e:
+            logging.error(f"Conversion job {job.id} failed: {e}")
+            job.error = str(e)
+            job.finished_at = time.time()
+            self.update(job, 'failed')
+
+    def _notify(self, job):
+        if self.on_update is not None:
+            try:
+                self.on_update(job)
+            except Exception as e:
+                logging.error(f"Error reporting conversion job {job.id}: {e}")
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
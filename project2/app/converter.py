@@ -0,0 +1,205 @@
+import logging
+import os
+import queue
+import shutil
+import socket
+import subprocess
+import tempfile
+import threading
+import time
+
+WINDOWS_SOFFICE = 'C:\\Program Files\\LibreOffice\\program\\soffice.exe'
+
+
+class ConversionError(Exception):
+    pass
+
+
+def find_soffice(configured=None):
+    """Locate the LibreOffice binary: explicit path, then ``PATH``."""
+    if configured:
+        return configured
+    for name in ('soffice', 'libreoffice'):
+        path = shutil.which(name)
+        if path:
+            return path
+    if os.path.exists(WINDOWS_SOFFICE):
+        return WINDOWS_SOFFICE
+    return None
+
+
+def _profile_url(profile_dir):
+    return 'file://' + os.path.abspath(profile_dir).replace('\\', '/')
+
+
+def convert_to_pdf(src_path, outdir, soffice=None, profile_dir=None, timeout=120):
+    """Convert one document with a fresh ``soffice --headless`` process.
+
+    ``profile_dir`` pins the LibreOffice user profile; reusing an already
+    initialized profile skips most of the first-start cost, and separate
+    profiles let several conversions run at once.
+    """
+    soffice = soffice or find_soffice()
+    if soffice is None:
+        raise ConversionError('LibreOffice (soffice) not found')
+    cmd = [soffice, '--headless', '--norestore', '--nolockcheck']
+    if profile_dir is not None:
+        cmd.append(f'-env:UserInstallation={_profile_url(profile_dir)}')
+    cmd += ['--convert-to', 'pdf', '--outdir', outdir, src_path]
+    try:
+        completed = subprocess.run(cmd, capture_output=True, timeout=timeout)
+    except subprocess.TimeoutExpired:
+        raise ConversionError(f'LibreOffice timed out after {timeout}s')
+    pdf_path = os.path.join(outdir, os.path.splitext(os.path.basename(src_path))[0] + '.pdf')
+    if not os.path.exists(pdf_path):
+        stderr = completed.stderr.decode('utf-8', 'replace').strip()
+        raise ConversionError(f'LibreOffice produced no PDF: {stderr or completed.returncode}')
+    return pdf_path
+
+
+class _ProfileWorker:
+    """Runs ``soffice`` per document against its own persistent profile."""
+
+    def __init__(self, soffice, profile_dir, timeout):
+        self.soffice = soffice
+        self.profile_dir = profile_dir
+        self.timeout = timeout
+
+    def start(self):
+        pass
+
+    def convert(self, src_path, outdir):
+        return convert_to_pdf(src_path, outdir, self.soffice, self.profile_dir, self.timeout)
+
+    def close(self):
+        pass
+
+
+class _UnoserverWorker:
+    """A long-lived ``unoserver`` process converting via ``unoconvert``."""
+
+    def __init__(self, soffice, profile_dir, port, timeout):
+        self.soffice = soffice
+        self.profile_dir = profile_dir
+        self.port = port
+        self.timeout = timeout
+        self._process = None
+
+    def start(self):
+        if self._process is not None and self._process.poll() is None:
+            return
+        cmd = [shutil.which('unoserver'), '--port', str(self.port), '--uno-port', str(self.port + 1),
+               f'--user-installation={_profile_url(self.profile_dir)}']
+        if self.soffice:
+            cmd.append(f'--executable={self.soffice}')
+        self._process = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        deadline = time.monotonic() + self.timeout
+        while time.monotonic() < deadline and self._process.poll() is None:
+            try:
+                socket.create_connection(('127.0.0.1', self.port), timeout=0.5).close()
+                return
+            except OSError:
+                time.sleep(0.2)
+        raise ConversionError(f'unoserver on port {self.port} did not start')
+
+    def convert(self, src_path, outdir):
+        self.start()  # Restart if the server died
+        pdf_path = os.path.join(outdir, os.path.splitext(os.path.basename(src_path))[0] + '.pdf')
+        try:
+            completed = subprocess.run(
+                [shutil.which('unoconvert'), '--port', str(self.port), '--convert-to', 'pdf',
+                 src_path, pdf_path],
+                capture_output=True, timeout=self.timeout)
+        except subprocess.TimeoutExpired:
+            self.close()
+            raise ConversionError(f'unoserver timed out after {self.timeout}s')
+        if completed.returncode != 0 or not os.path.exists(pdf_path):
+            stderr = completed.stderr.decode('utf-8', 'replace').strip()
+            raise ConversionError(f'unoconvert failed: {stderr or completed.returncode}')
+        return pdf_path
+
+    def close(self):
+        if self._process is not None:
+            self._process.terminate()
+            try:
+                self._process.wait(5)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+            self._process = None
+
+
+class ConverterPool:
+    """A fixed number of warm LibreOffice workers shared by all sessions.
+
+    If ``unoserver``/``unoconvert`` are installed each worker is a
+    long-lived headless LibreOffice server, so uploads pay no startup cost.
+    Otherwise each worker keeps its own pre-initialized user profile and
+    starts ``soffice`` per document. ``convert`` blocks until a worker is
+    free, which bounds how many conversions run at once.
+    """
+
+    def __init__(self, size=2, soffice=None, profile_root=None, timeout=120,
+                 use_unoserver=None, base_port=2003):
+        self.size = size
+        self.soffice = find_soffice(soffice)
+        self.profile_root = profile_root or os.path.join(tempfile.gettempdir(), 'gesture-soffice-profiles')
+        self.timeout = timeout
+        if use_unoserver is None:
+            use_unoserver = bool(shutil.which('unoserver') and shutil.which('unoconvert'))
+        self.use_unoserver = use_unoserver
+        self._idle = queue.Queue()
+        self._workers = []
+        for i in range(size):
+            profile_dir = os.path.join(self.profile_root, f'worker-{i}')
+            if use_unoserver:
+                worker = _UnoserverWorker(self.soffice, profile_dir, base_port + 2 * i, timeout)
+            else:
+                worker = _ProfileWorker(self.soffice, profile_dir, timeout)
+            self._workers.append(worker)
+            self._idle.put(worker)
+
+    def start(self):
+        """Start workers and initialize their profiles in the background."""
+        threading.Thread(target=self._warm_up, daemon=True, name='soffice-warm-up').start()
+
+    def _warm_up(self):
+        if self.soffice is None:
+            logging.warning('LibreOffice not found; presentation uploads will fail')
+            return
+        # Take every worker so no upload races the profile initialization
+        workers = [self._idle.get() for _ in self._workers]
+        start = time.perf_counter()
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                threads = [threading.Thread(target=self._warm_up_worker, args=(worker, tmp, i))
+                           for i, worker in enumerate(workers)]
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+            logging.info(f'{len(workers)} LibreOffice workers ready in {time.perf_counter() - start:.1f}s')
+        finally:
+            for worker in workers:
+                self._idle.put(worker)
+
+    def _warm_up_worker(self, worker, tmp, index):
+        src = os.path.join(tmp, f'warm-up-{index}.txt')
+        with open(src, 'w') as f:
+            f.write('warm-up')
+        try:
+            os.makedirs(worker.profile_dir, exist_ok=True)
+            worker.start()
+            worker.convert(src, tmp)
+        except (ConversionError, OSError) as e:
+            logging.warning(f'LibreOffice warm-up failed: {e}')
+
+    def convert(self, src_path, outdir):
+        worker = self._idle.get()
+        try:
+            return worker.convert(src_path, outdir)
+        finally:
+            self._idle.put(worker)
+
+    def close(self):
+        for worker in self._workers:
+            worker.close()
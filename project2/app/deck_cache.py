@@ -0,0 +1,200 @@
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+import time
+import uuid
+
+import cv2
+import numpy as np
+
+
+class DeckCache:
+    """Content-addressed on-disk cache of converted decks.
+
+    Entries are keyed by the SHA-256 of the uploaded bytes plus the render
+    parameters, and laid out as::
+
+        <root>/<key>/deck.pdf           converted PDF
+        <root>/<key>/pages/0000.png     BGR slide rasters, one per page
+        <root>/<key>/meta.json
+
+    Rasters are written as slides are first rendered. They are stored as
+    PNG: slides are mostly flat colour and text, so a 1280x720 page that
+    is 2.7 MB raw usually compresses to well under a tenth of that, and
+    decoding it is still far cheaper than rasterizing the PDF page again.
+    Deck and page writes are counted against ``max_bytes``; once the
+    running total goes over, least recently used entries are evicted.
+    Entries ``pin``-ned by an open ``SlideDeck`` are never evicted, since
+    its lazy renders and prefetches still read them.
+    """
+
+    PDF_NAME = 'deck.pdf'
+    PAGES_DIR = 'pages'
+    META_NAME = 'meta.json'
+
+    def __init__(self, root=None, max_bytes=2 * 1024 ** 3):
+        self.root = root or os.path.join(tempfile.gettempdir(), 'gesture-deck-cache')
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._total = None  # bytes on disk as of the last evict(), plus writes since
+        self._pins = {}  # key -> number of open decks using the entry
+        os.makedirs(self.root, exist_ok=True)
+
+    def key(self, data, **render_params):
+        digest = hashlib.sha256(data)
+        digest.update(json.dumps(render_params, sort_keys=True).encode('utf-8'))
+        return digest.hexdigest()
+
+    def entry_path(self, key):
+        return os.path.join(self.root, key)
+
+    def pdf_path(self, key):
+        """Path of the cached PDF for ``key``, or None if not cached."""
+        path = os.path.join(self.entry_path(key), self.PDF_NAME)
+        if not os.path.exists(path):
+            return None
+        self._touch(self.entry_path(key))
+        return path
+
+    def store_pdf(self, key, pdf_path, pages):
+        """Add an entry for a freshly converted PDF and return its cached path.
+
+        The write is atomic; if another session stored the same deck first,
+        its copy is kept. Slide rasters are added later by ``store_page``.
+        """
+        entry = self.entry_path(key)
+        if os.path.exists(entry):
+            self._touch(entry)
+            return self.pdf_path(key)
+
+        staging = os.path.join(self.root, f".staging-{uuid.uuid4().hex}")
+        try:
+            os.makedirs(os.path.join(staging, self.PAGES_DIR))
+            shutil.copyfile(pdf_path, os.path.join(staging, self.PDF_NAME))
+            with open(os.path.join(staging, self.META_NAME), 'w') as f:
+                json.dump({'pages': pages, 'created': time.time()}, f)
+            try:
+                os.rename(staging, entry)
+            except OSError:
+                # Another session stored the same deck first
+                self._remove(staging)
+        except Exception as e:
+            logging.error(f"Error writing deck cache entry {key}: {e}")
+            self._remove(staging)
+            return None
+
+        self.evict()
+        return self.pdf_path(key)
+
+    def pin(self, key):
+        """Keep ``key``'s entry from eviction until a matching ``unpin``."""
+        with self._lock:
+            self._pins[key] = self._pins.get(key, 0) + 1
+
+    def unpin(self, key):
+        with self._lock:
+            count = self._pins.get(key, 0) - 1
+            if count > 0:
+                self._pins[key] = count
+            else:
+                self._pins.pop(key, None)
+
+    def load_page(self, key, index):
+        """Return the cached raster for one slide, or None on a miss."""
+        path = self._page_path(self.entry_path(key), index)
+        if not os.path.exists(path):
+            return None
+        try:
+            raster = cv2.imdecode(np.fromfile(path, dtype=np.uint8), cv2.IMREAD_COLOR)
+        except Exception as e:
+            logging.error(f"Error reading cached slide {index} of {key}: {e}")
+            return None
+        if raster is None:
+            logging.error(f"Error reading cached slide {index} of {key}: not a valid image")
+        return raster
+
+    def has_page(self, key, index):
+        return os.path.exists(self._page_path(self.entry_path(key), index))
+
+    def store_page(self, key, index, raster):
+        entry = self.entry_path(key)
+        if not os.path.isdir(entry):
+            return False
+        path = self._page_path(entry, index)
+        staging = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            ok, encoded = cv2.imencode('.png', np.ascontiguousarray(raster))
+            if not ok:
+                raise ValueError("PNG encoding failed")
+            encoded.tofile(staging)
+            os.replace(staging, path)
+        except Exception as e:
+            logging.error(f"Error caching slide {index} of {key}: {e}")
+            if os.path.exists(staging):
+                os.unlink(staging)
+            return False
+
+        self._touch(entry)
+        if self._count_write(encoded.nbytes):
+            self.evict()
+        return True
+
+    def evict(self):
+        """Drop least recently used entries until under ``max_bytes``.
+
+        Pinned entries are skipped, so the total may stay over budget while
+        they are open.
+        """
+        with self._lock:
+            entries = []
+            for name in os.listdir(self.root):
+                path = os.path.join(self.root, name)
+                if name.startswith('.') or not os.path.isdir(path):
+                    continue
+                entries.append((os.stat(path).st_mtime, self._size(path), path))
+
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                if os.path.basename(path) in self._pins:
+                    continue
+                logging.info(f"Evicting deck cache entry {os.path.basename(path)}")
+                self._remove(path)
+                total -= size
+            self._total = total
+            return total
+
+    def _count_write(self, nbytes):
+        """Add a write to the running total; True once it is over budget."""
+        with self._lock:
+            if self._total is None:
+                return True  # nothing measured yet, let evict() take stock
+            self._total += nbytes
+            return self._total > self.max_bytes
+
+    def _page_path(self, entry, index):
+        return os.path.join(entry, self.PAGES_DIR, f"{index:04d}.png")
+
+    def _touch(self, entry):
+        try:
+            os.utime(entry)
+        except OSError:
+            pass
+
+    def _size(self, path):
+        total = 0
+        for dirpath, _, filenames in os.walk(path):
+            for filename in filenames:
+                try:
+                    total += os.path.getsize(os.path.join(dirpath, filename))
+                except OSError:
+                    pass
+        return total
+
+    def _remove(self, path):
+        shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,68 @@
+import io
+import os
+import re
+import zipfile
+
+PDF = 'pdf'
+PPTX = 'pptx'
+IMAGES = 'images'
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+
+def detect_deck_format(data):
+    """Identify an uploaded deck from its magic bytes.
+
+    Returns ``'pdf'``, ``'pptx'`` (a zip with a ``ppt/`` part),
+    ``'images'`` (a zip of PNG/JPEG slides) or None.
+    """
+    if data[:5] == b'%PDF-':
+        return PDF
+    if data[:4] != b'PK\x03\x04':
+        return None
+    try:
+        with zipfile.ZipFile(io.BytesIO(data)) as archive:
+            names = archive.namelist()
+    except zipfile.BadZipFile:
+        return None
+    if any(name.startswith('ppt/') for name in names):
+        return PPTX
+    if _image_names(names):
+        return IMAGES
+    return None
+
+
+def _image_names(names):
+    images = [name for name in names
+              if name.lower().endswith(IMAGE_EXTENSIONS)
+              and not name.endswith('/')
+              and not os.path.basename(name).startswith('.')
+              and not name.startswith('__MACOSX/')]
+    return sorted(images, key=_natural_key)
+
+
+def _natural_key(name):
+    """Sort key comparing digit runs as numbers: Slide2 before Slide10."""
+    return [(0, int(part), part) if part.isdigit() else (1, part.lower(), part)
+            for part in re.split(r'(\d+)', name) if part]
+
+
+def images_zip_to_pdf(data, pdf_path):
+    """Write a PDF with one page per image in the zip, in filename order.
+
+    Numbers in names compare by value, so ``Slide2`` comes before
+    ``Slide10``. Each page is sized to its image so rendering it at slide resolution
+    scales the picture exactly once.
+    """
+    import fitz
+    with zipfile.ZipFile(io.BytesIO(data)) as archive, fitz.open() as document:
+        for name in _image_names(archive.namelist()):
+            image = archive.read(name)
+            with fitz.open(stream=image) as picture:
+                rect = picture[0].rect
+            page = document.new_page(width=rect.width, height=rect.height)
+            page.insert_image(page.rect, stream=image)
+        if not len(document):
+            raise ValueError('Zip contains no PNG or JPEG slides')
+        document.save(pdf_path, deflate=True)
+    return pdf_path
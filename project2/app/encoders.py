@@ -0,0 +1,152 @@
+"""Interchangeable backends for encoding output frames.
+
+``create_encoder(backend, quality, subsampling)`` returns a ``FrameEncoder``:
+
+* ``opencv``: ``cv2.imencode`` JPEG, always available
+* ``turbojpeg``: libjpeg-turbo through PyTurboJPEG or simplejpeg, if installed
+* ``webp``: ``cv2.imencode`` WebP; smaller, but slower to encode
+* ``auto``: ``turbojpeg`` when available, otherwise ``opencv``
+
+Run ``benchmarks/bench_encoders.py`` to compare them on this machine.
+"""
+import binascii
+import logging
+
+import cv2
+import numpy as np
+
+SUBSAMPLING = ('444', '422', '420')
+
+
+class FrameEncoder:
+    """Encodes BGR frames to image bytes or ``data:`` URLs."""
+
+    name = None
+    mime = 'image/jpeg'
+
+    def __init__(self, quality=85, subsampling='420'):
+        if subsampling not in SUBSAMPLING:
+            raise ValueError(f'subsampling must be one of {SUBSAMPLING}')
+        self.quality = quality
+        self.subsampling = subsampling
+
+    @classmethod
+    def available(cls):
+        return True
+
+    def encode(self, image, quality=None):
+        raise NotImplementedError
+
+    def encode_data_url(self, image, quality=None):
+        # b2a_base64 produces the ASCII payload in one allocation
+        payload = binascii.b2a_base64(self.encode(image, quality), newline=False)
+        return f'data:{self.mime};base64,{payload.decode("ascii")}'
+
+
+class OpenCVJpegEncoder(FrameEncoder):
+    name = 'opencv'
+    SAMPLING_FACTORS = {
+        '444': cv2.IMWRITE_JPEG_SAMPLING_FACTOR_444,
+        '422': cv2.IMWRITE_JPEG_SAMPLING_FACTOR_422,
+        '420': cv2.IMWRITE_JPEG_SAMPLING_FACTOR_420,
+    }
+
+    def __init__(self, quality=85, subsampling='420'):
+        super().__init__(quality, subsampling)
+        # Reused parameter list; only the quality slot changes per call
+        self._params = [int(cv2.IMWRITE_JPEG_QUALITY), quality,
+                        int(cv2.IMWRITE_JPEG_SAMPLING_FACTOR), self.SAMPLING_FACTORS[subsampling]]
+
+    def encode(self, image, quality=None):
+        self._params[1] = quality or self.quality
+        ok, buffer = cv2.imencode('.jpg', image, self._params)
+        if not ok:
+            raise ValueError('JPEG encoding failed')
+        return buffer.tobytes()
+
+
+class TurboJpegEncoder(FrameEncoder):
+    """libjpeg-turbo's SIMD encoder via PyTurboJPEG, else simplejpeg."""
+
+    name = 'turbojpeg'
+
+    def __init__(self, quality=85, subsampling='420'):
+        super().__init__(quality, subsampling)
+        try:
+            import turbojpeg
+            self._turbo = turbojpeg.TurboJPEG()
+            self._encode = self._encode_turbojpeg
+            self._pixel_format = turbojpeg.TJPF_BGR
+            self._subsample = {'444': turbojpeg.TJSAMP_444, '422': turbojpeg.TJSAMP_422,
+                               '420': turbojpeg.TJSAMP_420}[subsampling]
+        except (ImportError, OSError):
+            import simplejpeg
+            self._simplejpeg = simplejpeg
+            self._encode = self._encode_simplejpeg
+
+    @classmethod
+    def available(cls):
+        try:
+            import turbojpeg
+            turbojpeg.TurboJPEG()
+            return True
+        except (ImportError, OSError):
+            pass
+        try:
+            import simplejpeg  # noqa: F401
+            return True
+        except ImportError:
+            return False
+
+    def encode(self, image, quality=None):
+        return self._encode(np.ascontiguousarray(image), quality or self.quality)
+
+    def _encode_turbojpeg(self, image, quality):
+        return self._turbo.encode(image, quality=quality, pixel_format=self._pixel_format,
+                                  jpeg_subsample=self._subsample)
+
+    def _encode_simplejpeg(self, image, quality):
+        return self._simplejpeg.encode_jpeg(image, quality=quality, colorspace='BGR',
+                                            colorsubsampling=self.subsampling)
+
+
+class WebPEncoder(FrameEncoder):
+    """Lossy WebP; chroma is always 4:2:0, so ``subsampling`` is ignored."""
+
+    name = 'webp'
+    mime = 'image/webp'
+
+    def __init__(self, quality=85, subsampling='420'):
+        super().__init__(quality, subsampling)
+        self._params = [int(cv2.IMWRITE_WEBP_QUALITY), quality]
+
+    @classmethod
+    def available(cls):
+        return cv2.haveImageWriter('.webp')
+
+    def encode(self, image, quality=None):
+        self._params[1] = quality or self.quality
+        ok, buffer = cv2.imencode('.webp', image, self._params)
+        if not ok:
+            raise ValueError('WebP encoding failed')
+        return buffer.tobytes()
+
+
+ENCODERS = {cls.name: cls for cls in (OpenCVJpegEncoder, TurboJpegEncoder, WebPEncoder)}
+
+
+def available_encoders():
+    return [name for name, cls in ENCODERS.items() if cls.available()]
+
+
+def create_encoder(backend='auto', quality=85, subsampling='420'):
+    """Build the named encoder, falling back to OpenCV JPEG if it is unavailable."""
+    if backend == 'auto':
+        backend = 'turbojpeg' if TurboJpegEncoder.available() else 'opencv'
+    cls = ENCODERS.get(backend)
+    if cls is None:
+        raise ValueError(f'Unknown frame encoder {backend!r}; expected one of {sorted(ENCODERS)}')
+    if not cls.available():
+        logging.warning(f'Frame encoder {backend!r} is not available; using OpenCV JPEG')
+        cls = OpenCVJpegEncoder
+    return cls(quality, subsampling)
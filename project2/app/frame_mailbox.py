@@ -0,0 +1,58 @@
+import threading
+
+
+class FrameMailbox:
+    """Single-slot mailbox where the newest frame always wins.
+
+    ``put`` never blocks: a frame that has not been picked up yet is
+    overwritten and counted as dropped, so a slow consumer only ever sees the
+    most recent frame and queueing latency is bounded by one frame.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._item = None
+        self._has_item = False
+        self._closed = False
+        self.received = 0
+        self.dropped = 0
+
+    def put(self, item):
+        """Store ``item``; returns True if an older frame was overwritten."""
+        with self._cond:
+            if self._closed:
+                return False
+            replaced = self._has_item
+            if replaced:
+                self.dropped += 1
+            self._item = item
+            self._has_item = True
+            self.received += 1
+            self._cond.notify()
+            return replaced
+
+    def take(self, timeout=None):
+        """Wait for the next frame; returns None on timeout or close."""
+        with self._cond:
+            if not self._has_item and not self._closed:
+                self._cond.wait(timeout)
+            if not self._has_item:
+                return None
+            item = self._item
+            self._item = None
+            self._has_item = False
+            return item
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._item = None
+            self._has_item = False
+            self._cond.notify_all()
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def stats(self):
+        return {'received': self.received, 'dropped': self.dropped}
@@ -0,0 +1,124 @@
+import queue
+import threading
+import time
+import logging
+
+_STOP = object()
+
+
+class FramePipeline:
+    """Runs HandGestureProcessor stages for consecutive frames in parallel.
+
+    Three threads are connected by bounded FIFO queues::
+
+        submit -> [decode] -> [inference + render] -> [encode] -> on_result
+
+    Decode and encode are plain OpenCV calls that release the GIL, so they
+    overlap with MediaPipe inference of the neighbouring frames. Each stage
+    has exactly one thread, which keeps results in submission order; the
+    stateful middle stage runs under ``lock`` so it never races with
+    ``load_ppt`` or other users of the processor, and the encode stage
+    takes the processor's ``encode_lock`` (see ``_encode_stage``).
+
+    Each queue holds ``depth`` frames. Under overload every frame waiting
+    in a queue is an older frame the client sees late, while newer ones
+    are already replaced in ``FrameMailbox``, so keep ``depth`` at 1: at
+    most one frame waits per stage and ``submit`` blocks otherwise.
+
+    ``on_result(result, header)`` is called from the encode thread, with
+    ``result`` set to None when a frame could not be processed.
+    """
+
+    STAGES = ('decode', 'render', 'encode')
+
+    def __init__(self, processor, on_result, lock=None, depth=1):
+        self.processor = processor
+        self.on_result = on_result
+        self.lock = lock or threading.RLock()
+        self._queues = {name: queue.Queue(maxsize=depth) for name in self.STAGES}
+        self._closed = False
+        self._threads = [
+            threading.Thread(target=self._run, args=(name,), daemon=True,
+                             name=f"frame-pipeline-{name}")
+            for name in self.STAGES
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, frame_data, header=None, timeout=None):
+        """Queue a frame; blocks while the decode queue is full.
+
+        Returns False if the pipeline is closed or ``timeout`` expired.
+        """
+        if self._closed:
+            return False
+        try:
+            self._queues['decode'].put((frame_data, header or {}), timeout=timeout)
+            return True
+        except queue.Full:
+            return False
+
+    def queue_depths(self):
+        return {name: q.qsize() for name, q in self._queues.items()}
+
+    def close(self, timeout=1.0):
+        if self._closed:
+            return
+        self._closed = True
+        self._queues['decode'].put(_STOP)
+        for thread in self._threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout)
+
+    def _run(self, name):
+        inbox = self._queues[name]
+        outbox = self._queues[self.STAGES[self.STAGES.index(name) + 1]] \
+            if name != self.STAGES[-1] else None
+        step = getattr(self, f"_{name}")
+        while True:
+            item = inbox.get()
+            if item is _STOP:
+                if outbox is not None:
+                    outbox.put(_STOP)
+                return
+            value, header = item
+            if value is not None:
+                try:
+                    value = step(value, header)
+                except Exception as e:
+                    logging.error(f"Error in {name} stage: {e}")
+                    value = None
+            if outbox is not None:
+                outbox.put((value, header))
+            else:
+                try:
+                    self.on_result(value, header)
+                except Exception as e:
+                    logging.error(f"Error delivering pipelined frame: {e}")
+
+    def _decode(self, frame_data, header):
+        start = time.perf_counter()
+        binary = isinstance(frame_data, (bytes, bytearray, memoryview))
+        frame_rgb = self.processor._decode_stage(frame_data)
+        if frame_rgb is None:
+            return None
+        return frame_rgb, binary, start
+
+    def _render(self, decoded, header):
+        frame_rgb, binary, start = decoded
+        with self.lock:
+            results = self.processor._inference_stage(frame_rgb)
+            final_display, meta = self.processor._render_stage(results)
+            # The render buffer is reused by the next frame; there is none
+            # when the client composites the output itself
+            final_display = final_display.copy() if final_display is not None else None
+        return final_display, meta, binary, start
+
+    def _encode(self, rendered, header):
+        final_display, meta, binary, start = rendered
+        result = self.processor._encode_stage(final_display, meta, binary, bool(header.get('delta')))
+        metrics = self.processor.metrics
+        if metrics is not None:
+            # From the start of decode, including waits between stages
+            metrics.frame_seconds.observe(time.perf_counter() - start)
+        return result
@@ -1,23 +1,53 @@
 import cv2
 import numpy as np
-import fitz
-from PIL import Image
 import base64
-from io import BytesIO
-import mediapipe as mp
 from collections import deque
 import time
+import threading
 from typing import Any
 import logging
-from pptx import Presentation
 import os
 import tempfile
-import subprocess
-from pdf2image import convert_from_path
+import shutil
+import uuid
+from app import brushes
+from app.converter import convert_to_pdf
+from app.encoders import create_encoder
+from app.deck_formats import IMAGES, PDF, detect_deck_format, images_zip_to_pdf
+from app.slide_deck import SlideDeck
+from app.tiled_canvas import TiledCanvas
+from app.stroke_journal import Stroke, StrokeJournal, clear_record, pack_points
+from app.compositor import Compositor, union_rect
+from app.gestures import GestureClassifier, load_gesture_table
+from app.hand_tracker import (DuplicateFrameDetector, InferenceScheduler, LandmarkTracker,
+                              TrackedHand, TrackedResults, fingertip_speed, landmarks_to_array)
+from app.startup import startup_report
+
+_mediapipe = None
+
+
+def _import_mediapipe():
+    """Import MediaPipe on first use; it dominates the app's import time."""
+    global _mediapipe
+    if _mediapipe is None:
+        with startup_report.step('import mediapipe'):
+            import mediapipe
+        _mediapipe = mediapipe
+    return _mediapipe
+
+
+def _rgb(bgr):
+    b, g, r = bgr
+    return [int(r), int(g), int(b)]
+
 
 class HandGestureProcessor:
-    def __init__(self):
-        self.mp_hands = mp.solutions.hands
+    def __init__(self, deck_cache=None, raster_cache_bytes=128 * 1024 ** 2,
+                 adaptive_inference=False, max_inference_gap=2, gesture_table=None,
+                 metrics=None, duplicate_threshold=4, converter=None, render_pool=None,
+                 history_bytes=4 * 1024 ** 2, checkpoint_strokes=16, frame_encoder='auto',
+                 output_quality=85, chroma_subsampling='420'):
+        self.mp_hands = _import_mediapipe().solutions.hands
         self.hands = self.mp_hands.Hands(
             static_image_mode=False,
             max_num_hands=1,
@@ -63,22 +93,92 @@ class HandGestureProcessor:
         
         # Presentation state
         self.current_slide = 0
-        self.slides = deque(maxlen=100)
-        self.drawings = deque(maxlen=100)
+        self.slides = SlideDeck()
+        self.drawings = {}  # slide index -> annotation layer, allocated on first stroke
         self.whiteboard = np.ones((self.SLIDE_HEIGHT, self.SLIDE_WIDTH, 3), dtype=np.uint8) * 255
-        self.whiteboard_drawing = np.zeros((self.SLIDE_HEIGHT, self.SLIDE_WIDTH, 3), dtype=np.uint8)
+        self.whiteboard_drawing = TiledCanvas(self.SLIDE_HEIGHT, self.SLIDE_WIDTH)
+        self.compositor = Compositor(self.SLIDE_HEIGHT, self.SLIDE_WIDTH)
+        self.pointer_position = None
+
+        # Undo/redo: one stroke journal per annotated surface, keyed like
+        # the compositor. The stroke being drawn is journaled when it ends.
+        self.journals = {}
+        self.history_bytes = history_bytes
+        self.checkpoint_strokes = checkpoint_strokes
+        self._stroke = None  # Stroke settings of the stroke in progress
+        self._stroke_points = []
+        self._stroke_surface = None  # (surface key, canvas)
+        self._stroke_rng = None
+        
+        # Output change tracking for skipping encodes and sending deltas
+        self.STATUS_REFRESH = 1.0  # seconds between FPS readout updates
+        self._status_fps = None
+        self._status_time = 0
+        self._last_encoded = None
+        self.DELTA_ALIGN = 16  # JPEG-friendly patch alignment
+        self.DELTA_MAX_AREA = 0.4  # send a full frame above this changed fraction
+
+        # While audience viewers are watching, each new output version is
+        # also encoded once as a full JPEG for the viewer broadcast
+        self.broadcast = False
+        self._broadcast_version = None
+
+        # Client-side compositing: the browser caches slide rasters and draws
+        # ink itself, so frames become small scene updates (see _scene_update)
+        self.client_compositing = False
+        self.deck_id = uuid.uuid4().hex  # changes with every opened deck
+        self._ink_events = []  # ink drawn this frame, for the client to replay
+        self._scene_key = None  # (deck, surface) whose ink the client holds
+        self._scene_toolbar = None
+
+        # Output encoder, quality and resolution; a QualityController may
+        # lower quality and resolution per connection (see apply_quality)
+        self.encoder = create_encoder(frame_encoder, output_quality, chroma_subsampling)
+        self.JPEG_QUALITY = output_quality
+        self.jpeg_quality = self.JPEG_QUALITY
+        self.output_scale = 1.0
+        self._scale_buffer = None  # reused for downscaled full frames
+        self._encode_seconds = 0.0
+        # Guards the encoder and encode state above, which the encode stage
+        # may use on its own thread (see FramePipeline)
+        self.encode_lock = threading.Lock()
+        # Captures at least this wide are decoded at half resolution
+        self.REDUCED_DECODE_MIN_WIDTH = 768
+        self.capture_width = 800
         
-        # Performance tracking
+        # Converted/rasterized decks shared between sessions
+        self.deck_cache = deck_cache
+        self.converter = converter  # shared ConverterPool; None runs soffice per upload
+        self.raster_cache_bytes = raster_cache_bytes
+        self.render_pool = render_pool  # process pool shared by all sessions
+        
+        # Adaptive inference: between MediaPipe calls landmarks are
+        # extrapolated by the tracker; the scheduler decides the gap
+        self.adaptive_inference = adaptive_inference
+        self.tracker = LandmarkTracker()
+        self.scheduler = InferenceScheduler(max_gap=max_inference_gap)
+
+        # A camera frame that has not visibly changed reuses the previous
+        # MediaPipe result; gestures, UI and output still update every frame
+        self.duplicate_detector = DuplicateFrameDetector(threshold=duplicate_threshold) \
+            if duplicate_threshold else None
+        self._last_results = None
+
+        # Performance tracking; set stage_times to a dict to collect
+        # seconds spent per stage (see benchmarks/replay.py)
+        self.stage_times = None
+        self.metrics = metrics  # app.metrics.Metrics, or None when disabled
         self.fps_history = deque(maxlen=30)
         self.last_frame_time = time.time()
         
         # Gesture handling
-        self.position_history = deque(maxlen=5)
+        self.position_history = deque(maxlen=5)  # fingertip (x, y, t), normalized
+        self.gesture_classifier = GestureClassifier(load_gesture_table(gesture_table))
         self.last_gesture = None
-        self.gesture_cooldown = 0
-        self.hover_cooldown = 0
+        self.gesture_since = 0  # monotonic time the current gesture started
         self.gesture_active = False
-        self.navigation_timer = 0
+        self.navigation_until = 0
+        self.history_until = 0
         
         # Mode tracking
         self.is_whiteboard = False
@@ -87,28 +187,19 @@ class HandGestureProcessor:
         self.hover_states = {
             'eraser': {
                 'is_hovering': False,
-                'cooldown': 0
+                'until': 0
             },
             'whiteboard': {
                 'is_hovering': False,
-                'cooldown': 0
+                'until': 0
             }
         }
-        self.HOVER_COOLDOWN = 30 
-        
-        # Add caching for performance
-        self._frame_cache = {}
-        self._gesture_cache = {}
-        self.CACHE_SIZE = 30
+        self.HOVER_COOLDOWN = 1.0  # seconds
         
         # Pre-calculate commonly used values
         self._control_panel_rect = (100, 0, self.SLIDE_WIDTH - 100, self.CONTROL_HEIGHT)
         self._brush_styles = ["normal", "spray", "calligraphy", "neon"]
         
-        # Use numpy arrays for better performance
-        self._zero_drawing = np.zeros((self.SLIDE_HEIGHT, self.SLIDE_WIDTH, 3), dtype=np.uint8)
-        self._drawing_mask = np.zeros((self.SLIDE_HEIGHT, self.SLIDE_WIDTH), dtype=np.uint8)
-        
         # Optimize frame processing
         self.PROCESS_WIDTH = 640
         self.PROCESS_HEIGHT = 480
@@ -118,73 +209,48 @@ class HandGestureProcessor:
         ])
         
         
-    def _detect_gesture(self, hand_landmarks):
-        """Detect gestures based on hand landmarks."""
-        def finger_is_extended(tip_id, pip_id):
-            """Check if a finger is extended."""
-            return hand_landmarks.landmark[tip_id].y < hand_landmarks.landmark[pip_id].y
-
-        thumb_extended = hand_landmarks.landmark[self.mp_hands.HandLandmark.THUMB_TIP].x < \
-                        hand_landmarks.landmark[self.mp_hands.HandLandmark.THUMB_IP].x
-
-        index_extended = finger_is_extended(self.mp_hands.HandLandmark.INDEX_FINGER_TIP,
-                                            self.mp_hands.HandLandmark.INDEX_FINGER_PIP)
-        middle_extended = finger_is_extended(self.mp_hands.HandLandmark.MIDDLE_FINGER_TIP,
-                                            self.mp_hands.HandLandmark.MIDDLE_FINGER_PIP)
-        ring_extended = finger_is_extended(self.mp_hands.HandLandmark.RING_FINGER_TIP,
-                                            self.mp_hands.HandLandmark.RING_FINGER_PIP)
-        pinky_extended = finger_is_extended(self.mp_hands.HandLandmark.PINKY_TIP,
-                                            self.mp_hands.HandLandmark.PINKY_PIP)
-
-        if thumb_extended and index_extended and middle_extended and not ring_extended and not pinky_extended:
-            return "NEXT"
-        elif thumb_extended and index_extended and not middle_extended and not ring_extended and not pinky_extended:
-            return "PREVIOUS"
-        elif index_extended and middle_extended and not thumb_extended and not ring_extended and not pinky_extended:
-            return "DRAW"
-        elif index_extended and not thumb_extended and not middle_extended and not ring_extended and not pinky_extended:
-            return "POINTER"
-        elif thumb_extended and index_extended and middle_extended and ring_extended and pinky_extended:
-            return "CLEAR"
-
-        return "NONE"
+    def _detect_gesture(self, points):
+        """Classify a ``(21, 3)`` landmark array against the gesture table."""
+        return self.gesture_classifier.classify(points)
     
     
-    def _handle_gesture(self, gesture, x, y, current_drawing, display):
+    def _handle_gesture(self, gesture, x, y, current_drawing):
         """Handle different gestures and their corresponding actions."""
+        now = time.monotonic()
+        if gesture != "DRAW":
+            self._end_stroke()
         if gesture != self.last_gesture:
-            self.gesture_cooldown = 5
+            self.gesture_since = now
             self.gesture_active = False
-            if gesture in ["NEXT", "PREVIOUS", "CLEAR"]:
+            if gesture in ["NEXT", "PREVIOUS", "CLEAR", "UNDO", "REDO"]:
                 self.prev_x = self.prev_y = None
 
-        if self.gesture_cooldown > 0:
-            self.gesture_cooldown -= 1
-
-        if self.navigation_timer > 0:
-            self.navigation_timer -= 1
-
-        if self.gesture_cooldown == 0:
+        if now - self.gesture_since >= self.gesture_classifier.hold.get(gesture, 0):
             if gesture == "DRAW":
                 if y > self.CONTROL_HEIGHT:  # Only draw below control panel
                     if self.prev_x is None:
                         self.prev_x, self.prev_y = x, y
+                    elif current_drawing is None and self.is_eraser:
+                        self.prev_x, self.prev_y = x, y  # Nothing to erase yet
                     else:
+                        if current_drawing is None:
+                            current_drawing = self._drawing_layer(create=True)
                         self.draw(x, y, current_drawing)
 
             elif gesture == "POINTER":
                 if y > self.CONTROL_HEIGHT:
-                    cv2.circle(display, (x, y), 5, self.pointer_color, -1)
+                    self.pointer_position = (x, y)  # Drawn after compositing
                 self.prev_x = self.prev_y = None
 
-            elif not self.is_whiteboard and gesture in ["NEXT", "PREVIOUS"] and self.navigation_timer == 0:
+            elif not self.is_whiteboard and gesture in ["NEXT", "PREVIOUS"] and now >= self.navigation_until:
                 if not self.gesture_active:
+                    navigation_cooldown = self.gesture_classifier.cooldown.get(gesture, 0)
                     if gesture == "NEXT" and self.current_slide < len(self.slides) - 1:
                         self.current_slide += 1
-                        self.navigation_timer = 15
+                        self.navigation_until = now + navigation_cooldown
                     elif gesture == "PREVIOUS" and self.current_slide > 0:
                         self.current_slide -= 1
-                        self.navigation_timer = 15
+                        self.navigation_until = now + navigation_cooldown
                     self.gesture_active = True
 
             elif gesture == "CLEAR":
@@ -192,6 +258,15 @@ class HandGestureProcessor:
                     self.clear_drawings()
                     self.gesture_active = True
 
+            elif gesture in ["UNDO", "REDO"] and now >= self.history_until:
+                if not self.gesture_active:
+                    if gesture == "UNDO":
+                        self.undo()
+                    else:
+                        self.redo()
+                    self.history_until = now + self.gesture_classifier.cooldown.get(gesture, 0)
+                    self.gesture_active = True
+
         self.last_gesture = gesture
         
         
@@ -307,21 +382,18 @@ class HandGestureProcessor:
                     self.is_eraser = False
                 elif name == "eraser":
                     # Handle eraser hover state
-                    if not self.hover_states['eraser']['is_hovering'] and self.hover_states['eraser']['cooldown'] == 0:
+                    if not self.hover_states['eraser']['is_hovering'] and time.monotonic() >= self.hover_states['eraser']['until']:
                         self.is_eraser = not self.is_eraser
                         self.hover_states['eraser']['is_hovering'] = True
-                        self.hover_states['eraser']['cooldown'] = self.HOVER_COOLDOWN
+                        self.hover_states['eraser']['until'] = time.monotonic() + self.HOVER_COOLDOWN
                 elif name == "whiteboard":
                     # Handle whiteboard hover state
-                    if not self.hover_states['whiteboard']['is_hovering'] and self.hover_states['whiteboard']['cooldown'] == 0:
+                    if not self.hover_states['whiteboard']['is_hovering'] and time.monotonic() >= self.hover_states['whiteboard']['until']:
                         self.is_whiteboard = not self.is_whiteboard
                         self.hover_states['whiteboard']['is_hovering'] = True
-                        self.hover_states['whiteboard']['cooldown'] = self.HOVER_COOLDOWN
+                        self.hover_states['whiteboard']['until'] = time.monotonic() + self.HOVER_COOLDOWN
                 elif name == "clear":
-                    if self.is_whiteboard:
-                        self.whiteboard_drawing.fill(0)
-                    else:
-                        self.drawings[self.current_slide].fill(0)
+                    self.clear_drawings()
                 elif name.startswith("color_"):
                     color_name = name.split("_")[1]
                     self.current_color = self.colors[color_name]
@@ -347,219 +419,697 @@ class HandGestureProcessor:
             self.prev_x, self.prev_y = x, y
             return
 
-        if self.is_eraser:
-            cv2.circle(drawing_surface, (x, y), self.brush_thickness * 3, (0, 0, 0), -1)
-        else:
-            if self.current_brush_style == "spray":
-                self._spray_paint(x, y, drawing_surface)
-            elif self.current_brush_style == "calligraphy":
-                self._calligraphy_stroke((self.prev_x, self.prev_y), (x, y), drawing_surface)
-            elif self.current_brush_style == "neon":
-                self._neon_stroke((self.prev_x, self.prev_y), (x, y), drawing_surface)
-            else:  # normal brush
-                cv2.line(drawing_surface, (self.prev_x, self.prev_y), (x, y),
-                        self.current_color, self.brush_thickness)
-
+        if self._stroke is None:
+            self._begin_stroke(drawing_surface)
+        dots = self._paint_segment(self._stroke, (self.prev_x, self.prev_y), (x, y),
+                                   drawing_surface, self._stroke_rng)
+        # Journaled only once painted, so undo never replays a failed segment
+        self._stroke_points.append((x, y))
+        if self.client_compositing:
+            self._ink_events.append(self._ink_event(self._stroke, (self.prev_x, self.prev_y), (x, y), dots))
         self.prev_x, self.prev_y = x, y
 
-    def _spray_paint(self, x, y, surface):
-        for _ in range(20):
-            angle = np.random.random() * 360
-            radius = np.random.random() * self.brush_thickness * 2
-            px = int(x + radius * np.cos(angle))
-            py = int(y + radius * np.sin(angle))
-            cv2.circle(surface, (px, py), 1, self.current_color, -1)
-
-    def _calligraphy_stroke(self, start_pos, end_pos, surface):
-        angle = np.arctan2(end_pos[1]-start_pos[1], end_pos[0]-start_pos[0]) + np.pi/4
-        points = []
-        width = self.brush_thickness * 2
-        
-        for i in [-1, 1]:
-            dx = width * np.cos(angle) * i
-            dy = width * np.sin(angle) * i
-            points.append((int(start_pos[0] + dx), int(start_pos[1] + dy)))
-            points.append((int(end_pos[0] + dx), int(end_pos[1] + dy)))
-        
-        pts = np.array(points, np.int32)
-        cv2.fillPoly(surface, [pts], self.current_color)
+    def _begin_stroke(self, surface):
+        seed = int(np.random.randint(2 ** 31))
+        self._stroke = Stroke('eraser' if self.is_eraser else 'brush', self.current_brush_style,
+                              self.current_color, self.brush_thickness, None, seed)
+        self._stroke_points = [(self.prev_x, self.prev_y)]
+        self._stroke_surface = (self._surface_key(), surface)
+        self._stroke_rng = np.random.default_rng(seed)
+        # Before anything is painted, so a new journal's base snapshot
+        # doesn't already contain this stroke
+        self._journal(*self._stroke_surface)
+
+    def _end_stroke(self):
+        """Journal the stroke in progress, if any."""
+        if self._stroke is None:
+            return
+        stroke = self._stroke._replace(points=pack_points(self._stroke_points))
+        key, surface = self._stroke_surface
+        self._stroke = self._stroke_surface = self._stroke_rng = None
+        self._stroke_points = []
+        self._journal(key, surface).append(stroke)
+
+    def _journal(self, key, surface):
+        journal = self.journals.get(key)
+        if journal is None:
+            journal = StrokeJournal(surface, self._render_stroke, max_bytes=self.history_bytes,
+                                    checkpoint_strokes=self.checkpoint_strokes)
+            self.journals[key] = journal
+        return journal
+
+    def _render_stroke(self, stroke, surface):
+        """Repaint a journaled stroke exactly as it was drawn live."""
+        if stroke.tool == 'clear':
+            surface.clear()
+            return
+        rng = np.random.default_rng(stroke.seed)
+        points = [tuple(point) for point in stroke.points.tolist()]
+        for start_pos, end_pos in zip(points, points[1:]):
+            self._paint_segment(stroke, start_pos, end_pos, surface, rng)
+
+    def _paint_segment(self, stroke, start_pos, end_pos, surface, rng):
+        """Paint one segment of ``stroke``; returns the spray dots, if any."""
+        if stroke.tool == 'eraser':
+            self._erase(end_pos, surface, stroke.thickness)
+        elif stroke.style == "spray":
+            return self._spray_paint(end_pos, surface, stroke.color, stroke.thickness, rng)
+        elif stroke.style == "calligraphy":
+            self._calligraphy_stroke(start_pos, end_pos, surface, stroke.color, stroke.thickness)
+        elif stroke.style == "neon":
+            self._neon_stroke(start_pos, end_pos, surface, stroke.color, stroke.thickness)
+        else:  # normal brush
+            self._line_stroke(start_pos, end_pos, surface, stroke.color, stroke.thickness)
+
+    def _stroke_region(self, surface, points, margin):
+        """Edit the tiles of ``surface`` around ``points`` (see TiledCanvas.region)."""
+        xs = [p[0] for p in points]
+        ys = [p[1] for p in points]
+        return surface.region(min(xs) - margin, min(ys) - margin,
+                              max(xs) + margin + 1, max(ys) + margin + 1)
+
+    def _erase(self, pos, surface, thickness):
+        x, y = pos
+        radius = thickness * 3
+        with self._stroke_region(surface, [(x, y)], radius) as (patch, ox, oy):
+            if patch is None:  # fingertip off the canvas
+                return
+            cv2.circle(patch, (x - ox, y - oy), radius, (0, 0, 0), -1)
+
+    def _line_stroke(self, start_pos, end_pos, surface, color, thickness):
+        with self._stroke_region(surface, [start_pos, end_pos], thickness) as (patch, ox, oy):
+            if patch is None:
+                return
+            cv2.line(patch, (start_pos[0] - ox, start_pos[1] - oy), (end_pos[0] - ox, end_pos[1] - oy),
+                     color, thickness)
+
+    def _spray_paint(self, pos, surface, color, thickness, rng):
+        margin = thickness * 2 + 2
+        with self._stroke_region(surface, [pos], margin) as (patch, ox, oy):
+            if patch is None:
+                return []
+            dots = brushes.spray(patch, (ox, oy), pos, color, thickness, rng)
+        return dots.tolist()
+
+    def _calligraphy_polygon(self, start_pos, end_pos, thickness):
+        return brushes.calligraphy_polygon(start_pos, end_pos, thickness).tolist()
+
+    def _calligraphy_stroke(self, start_pos, end_pos, surface, color, thickness):
+        pts = brushes.calligraphy_polygon(start_pos, end_pos, thickness)
+        with self._stroke_region(surface, pts, 1) as (patch, ox, oy):
+            if patch is None:
+                return
+            cv2.fillPoly(patch, [pts], color, offset=(-ox, -oy))
+
+    def _neon_stroke(self, start_pos, end_pos, surface, color, thickness):
+        with self._stroke_region(surface, [start_pos, end_pos], thickness * 2) as (patch, ox, oy):
+            if patch is None:
+                return
+            brushes.neon(patch, (ox, oy), start_pos, end_pos, color, thickness)
 
-    def _neon_stroke(self, start_pos, end_pos, surface):
-        for thickness in range(self.brush_thickness * 2, self.brush_thickness - 1, -1):
-            alpha = (thickness - self.brush_thickness) / (self.brush_thickness * 2)
-            color = tuple(int(c * alpha) for c in self.current_color)
-            cv2.line(surface, start_pos, end_pos, color, thickness)
-        cv2.line(surface, start_pos, end_pos, self.current_color, self.brush_thickness)
+    def process_frame(self, frame_data: str | bytes, delta: bool = False) -> dict[str, Any] | None:
+        """Process one camera frame.
 
-    def process_frame(self, frame_data: str) -> dict[str, Any] | None:
+        ``frame_data`` is either a ``data:image/jpeg;base64,...`` string or the
+        raw JPEG bytes from the binary transport; the output frame is returned
+        in the same form. With ``delta`` the result may instead carry
+        ``unchanged`` or ``patches`` (see ``_encode_stage``).
+
+        The work is split into ``_decode_stage``, ``_inference_stage``,
+        ``_render_stage`` and ``_encode_stage`` so that ``FramePipeline`` can
+        run them on separate threads; here they simply run back to back.
+        """
+        binary = isinstance(frame_data, (bytes, bytearray, memoryview))
+        start = time.perf_counter()
         try:
-            # Cache frame data for repeated processing
-            cache_key = hash(frame_data)
-            if cache_key in self._frame_cache:
-                return self._frame_cache[cache_key]
-            
-            frame = self._decode_base64_frame(frame_data)
-            if frame is None:
+            frame_rgb = self._decode_stage(frame_data)
+            if frame_rgb is None:
                 return None
 
-            # Reduce frame resolution for processing
-            frame = cv2.resize(frame, (self.PROCESS_WIDTH, self.PROCESS_HEIGHT))  # Process at lower resolution
-            
-            # Calculate FPS 
-            current_time = time.time()
-            fps = 1 / (current_time - self.last_frame_time)
-            self.fps_history.append(fps)
-            self.last_frame_time = current_time
+            results = self._inference_stage(frame_rgb)
+            final_display, meta = self._render_stage(results)
+            result = self._encode_stage(final_display, meta, binary, delta)
+            if self.metrics is not None:
+                self.metrics.frame_seconds.observe(time.perf_counter() - start)
+            return result
 
-            frame = cv2.flip(frame, 1)
-            
-            # Convert to RGB more efficiently
-            frame_rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = self.hands.process(frame_rgb)
-
-            # Get current display surface
-            if self.is_whiteboard:
-                display = self.whiteboard
-                current_drawing = self.whiteboard_drawing
-            else:
-                display = self.slides[self.current_slide]
-                current_drawing = self.drawings[self.current_slide]
+        except Exception as e:
+            logging.error(f"Error processing frame: {e}")
+            return None
 
-            # Create display copy only if needed
-            display_copy = None
+    def process_landmarks(self, points, handedness=None, binary=True, delta=False) -> dict[str, Any] | None:
+        """Process one frame of hand landmarks tracked by the client.
 
-            if results.multi_hand_landmarks:
-                hand_landmarks = results.multi_hand_landmarks[0]
-                
-                # Scale coordinates from processed frame to display resolution
-                x = int(hand_landmarks.landmark[self.mp_hands.HandLandmark.INDEX_FINGER_TIP].x * self.SLIDE_WIDTH)
-                y = int(hand_landmarks.landmark[self.mp_hands.HandLandmark.INDEX_FINGER_TIP].y * self.SLIDE_HEIGHT)
+        ``points`` is a ``(21, 3)`` array of normalized landmarks in the
+        mirrored view ``_decode_stage`` produces, or an empty array when no
+        hand is visible (see ``transport.unpack_landmarks_message``). There
+        is no decode and no inference; gestures, rendering and encoding are
+        the same as for ``process_frame``, returning image bytes when
+        ``binary`` and ``data:`` URLs otherwise.
+        """
+        start = time.perf_counter()
+        try:
+            hands = [TrackedHand(points)] if len(points) else None
+            results = TrackedResults(hands, handedness=[handedness] if hands and handedness else None)
+            final_display, meta = self._render_stage(results)
+            result = self._encode_stage(final_display, meta, binary, delta)
+            if self.metrics is not None:
+                self.metrics.frame_seconds.observe(time.perf_counter() - start)
+            return result
 
-                if not self.handle_ui_interaction(x, y):
-                    gesture = self._detect_gesture(hand_landmarks)
-                    
-                    # Create display copy only when needed
-                    if display_copy is None:
-                        display_copy = display.copy()
-                        
-                    self._handle_gesture(gesture, x, y, current_drawing, display_copy)
-
-            # Optimize drawing overlay
-            if np.any(current_drawing):  # Only process if there are drawings
-                if display_copy is None:
-                    display_copy = display.copy()
-                mask = cv2.cvtColor(current_drawing, cv2.COLOR_BGR2GRAY)
-                display_copy[mask != 0] = current_drawing[mask != 0]
-
-            final_display = display_copy if display_copy is not None else display
-            
-            # Draw UI
-            self.draw_ui(final_display)
-
-            # Optimize status text rendering
-            if len(self.fps_history) > 0:  # Only calculate if we have FPS data
-                avg_fps = int(sum(self.fps_history) / len(self.fps_history))
-                mode_text = "Whiteboard" if self.is_whiteboard else f"Slide {self.current_slide + 1}/{len(self.slides)}"
-                status_text = f"{mode_text} - FPS: {avg_fps}"
-                cv2.putText(final_display, status_text, (10, self.SLIDE_HEIGHT - 20),
-                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
-
-            # Update cooldown states more efficiently
-            for state in self.hover_states.values():
-                if state['cooldown'] > 0:
-                    state['cooldown'] -= 1
+        except Exception as e:
+            logging.error(f"Error processing landmarks: {e}")
+            return None
+
+    def _decode_stage(self, frame_data):
+        """JPEG decode, resize, mirror and convert to RGB. Touches no state."""
+        start = time.perf_counter()
+        if isinstance(frame_data, (bytes, bytearray, memoryview)):
+            frame = self._decode_jpeg_frame(frame_data)
+        else:
+            frame = self._decode_base64_frame(frame_data)
+        if frame is None:
+            return None
+        start = self._lap('decode', start)
+
+        # Reduce frame resolution for processing
+        frame = cv2.resize(frame, (self.PROCESS_WIDTH, self.PROCESS_HEIGHT))  # Process at lower resolution
+        frame = cv2.flip(frame, 1)
+
+        # Convert to RGB more efficiently
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        self._lap('resize_flip', start)
+        return frame
+
+    def _inference_stage(self, frame_rgb):
+        """Run MediaPipe, or reuse/predict landmarks when that is safe.
+
+        Must see frames in order.
+        """
+        start = time.perf_counter()
+        now = time.monotonic()
+        signature = None
+        if self.duplicate_detector is not None:
+            signature = self.duplicate_detector.signature(frame_rgb)
+            if self._last_results is not None and self.duplicate_detector.is_duplicate(signature, now):
+                self.scheduler.record(False)
+                self._lap('mediapipe', start)
+                return self._last_results
+
+        if self.adaptive_inference and not self.scheduler.should_infer():
+            predicted = self.tracker.predict(now)
+            if predicted is not None:
+                self.scheduler.record(False)
+                self._lap('mediapipe', start)
+                return TrackedResults([TrackedHand(predicted)], predicted=True)
+
+        results = self.hands.process(frame_rgb)
+        self._last_results = results
+        if signature is not None:
+            self.duplicate_detector.update(signature, now)
+        self.scheduler.record(True)
+        if results.multi_hand_landmarks:
+            self.tracker.update(landmarks_to_array(results.multi_hand_landmarks[0]), now)
+        else:
+            self.tracker.reset()
+        self._lap('mediapipe', start)
+        return results
+
+    def _lap(self, stage, start):
+        """Add the time since ``start`` to ``stage_times[stage]``; return now."""
+        now = time.perf_counter()
+        if self.stage_times is not None:
+            self.stage_times[stage] = self.stage_times.get(stage, 0.0) + now - start
+        if self.metrics is not None:
+            self.metrics.stage_seconds.observe(now - start, stage)
+        return now
 
-            # Use JPEG encoding with optimized quality for better performance
-            result = {
-                'frame': f'data:image/jpeg;base64,{self._encode_frame_to_base64(final_display)}',
+    def inference_stats(self):
+        """Share of recent frames that ran MediaPipe rather than the tracker."""
+        stats = self.scheduler.stats()
+        stats['adaptive'] = self.adaptive_inference
+        if self.duplicate_detector is not None:
+            stats['duplicates'] = self.duplicate_detector.duplicates
+        return stats
+
+    def _render_stage(self, results):
+        """Apply gestures and compose the output frame.
+
+        Returns the compositor's output buffer, which is updated in place
+        on the next call; copy it before handing it to another thread.
+        """
+        start = time.perf_counter()
+
+        # Calculate FPS 
+        current_time = time.time()
+        fps = 1 / max(current_time - self.last_frame_time, 1e-6)
+        self.fps_history.append(fps)
+        self.last_frame_time = current_time
+        self.pointer_position = None
+
+        gesture = None
+        if results.multi_hand_landmarks:
+            # Converted once; everything below works on the array
+            points = landmarks_to_array(results.multi_hand_landmarks[0])
+            tip_x, tip_y = points[self.mp_hands.HandLandmark.INDEX_FINGER_TIP, :2]
+            self.position_history.append((tip_x, tip_y, time.monotonic()))
+
+            # Scale coordinates from processed frame to display resolution
+            x = int(tip_x * self.SLIDE_WIDTH)
+            y = int(tip_y * self.SLIDE_HEIGHT)
+
+            if not self.handle_ui_interaction(x, y):
+                gesture = self._detect_gesture(points)
+                self._handle_gesture(gesture, x, y, self._drawing_layer())
+        else:
+            self.position_history.clear()
+        if gesture != "DRAW":
+            self._end_stroke()  # Hand lost or over the toolbar
+        self.scheduler.observe(bool(results.multi_hand_landmarks), gesture,
+                               fingertip_speed(self.position_history))
+
+        start = self._lap('gestures', start)
+
+        if self.client_compositing and not self.broadcast:
+            # The browser composites; nothing to draw or encode here
+            meta = {
                 'currentSlide': self.current_slide,
-                'totalSlides': len(self.slides)
+                'totalSlides': len(self.slides),
+                'version': self.compositor.version,
+                'scene': self._scene_update(current_time)
             }
-            
-            # Cache the result
-            if len(self._frame_cache) > self.CACHE_SIZE:
-                self._frame_cache.clear()
-            self._frame_cache[cache_key] = result
+            self._lap('ui', start)
+            return None, meta
+
+        # Slide + ink, patched only where ink changed since the last frame
+        if self.is_whiteboard:
+            background = self.whiteboard
+        else:
+            background = self.slides[self.current_slide]
+        final_display = self.compositor.compose(self._surface_key(), background, self._drawing_layer())
+        start = self._lap('composite', start)
+
+        # Transient overlays, undone by the compositor next frame
+        if self.pointer_position is not None:
+            px, py = self.pointer_position
+            cv2.circle(final_display, (px, py), 5, self.pointer_color, -1)
+            self.compositor.mark_transient((px - 6, py - 6, px + 7, py + 7), ('pointer', px, py))
+
+        # Draw UI
+        self.draw_ui(final_display)
+        x0, y0, x1, y1 = self._control_panel_rect
+        self.compositor.mark_transient((x0, y0, x1 + 1, y1 + 1),
+                                       ('toolbar', self.current_tool, self.is_eraser, self.is_whiteboard))
+
+        # Optimize status text rendering
+        if len(self.fps_history) > 0:  # Only calculate if we have FPS data
+            self._refresh_status_fps(current_time)
+            mode_text = "Whiteboard" if self.is_whiteboard else f"Slide {self.current_slide + 1}/{len(self.slides)}"
+            status_text = f"{mode_text} - FPS: {self._status_fps}"
+            origin = (10, self.SLIDE_HEIGHT - 20)
+            cv2.putText(final_display, status_text, origin,
+                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (255, 255, 255), 2)
+            (w, h), baseline = cv2.getTextSize(status_text, cv2.FONT_HERSHEY_SIMPLEX, 0.7, 2)
+            self.compositor.mark_transient((origin[0] - 2, origin[1] - h - 2,
+                                            origin[0] + w + 2, origin[1] + baseline + 2), status_text)
+
+        changes = self.compositor.frame_changes()
+        meta = {
+            'currentSlide': self.current_slide,
+            'totalSlides': len(self.slides),
+            'version': self.compositor.version,
+            'changes': changes
+        }
+        if self.client_compositing:
+            # Composed only for the viewer broadcast
+            meta['scene'] = self._scene_update(current_time)
+        self._lap('ui', start)
+        return final_display, meta
+
+    def _refresh_status_fps(self, current_time):
+        # Refresh the FPS readout only every STATUS_REFRESH seconds so an
+        # idle presenter produces identical frames
+        if self._status_fps is None or current_time - self._status_time >= self.STATUS_REFRESH:
+            self._status_fps = int(sum(self.fps_history) / len(self.fps_history))
+            self._status_time = current_time
+
+    def set_client_compositing(self, enabled):
+        """Switch between encoded frames and scene updates for this client."""
+        self.client_compositing = enabled
+        self._ink_events = []
+        self._scene_key = None
+        self._scene_toolbar = None
+        with self.encode_lock:
+            self._last_encoded = None
+        self.compositor.invalidate()
+
+    def _scene_update(self, current_time):
+        """What changed for a client compositing the output itself.
+
+        The client holds the current surface's ink layer. On a new surface
+        (or deck, after undo/redo, or on resuming after a reconnect) it
+        gets the authoritative ink as ``inkReset`` tiles, otherwise just
+        the ``ink`` segments drawn since the last update. Slide rasters are fetched once per deck from
+        ``/slides/<sid>/<deckId>/<index>``.
+        """
+        if self.fps_history:
+            self._refresh_status_fps(current_time)
+        scene = {
+            'vector': True,
+            'deckId': self.deck_id,
+            'whiteboard': self.is_whiteboard,
+            'pointer': list(self.pointer_position) if self.pointer_position is not None else None,
+            'fps': self._status_fps
+        }
+        key = (self.deck_id, self._surface_key())
+        if key != self._scene_key:
+            if self._scene_key is None:
+                scene['layout'] = self._toolbar_layout()
+            scene['inkReset'] = self._ink_tiles()
+            self._scene_key = key
+        elif self._ink_events:
+            scene['ink'] = self._ink_events
+        self._ink_events = []
+        toolbar = [name for name, active in (('brush', self.current_tool == 'brush'),
+                                             ('eraser', self.is_eraser),
+                                             ('whiteboard', self.is_whiteboard)) if active]
+        if toolbar != self._scene_toolbar:
+            scene['toolbar'] = toolbar
+            self._scene_toolbar = toolbar
+        return scene
+
+    def _ink_event(self, stroke, start_pos, end_pos, dots):
+        event = {'tool': stroke.tool, 'style': stroke.style, 'color': _rgb(stroke.color),
+                 'width': stroke.thickness, 'from': start_pos, 'to': end_pos}
+        if dots is not None:
+            event['dots'] = dots
+        elif stroke.tool == 'brush' and stroke.style == 'calligraphy':
+            event['poly'] = self._calligraphy_polygon(start_pos, end_pos, stroke.thickness)
+        return event
+
+    def _ink_tiles(self):
+        """The current surface's ink as PNG tiles with an alpha channel."""
+        layer = self._drawing_layer()
+        if layer is None:
+            return []
+        tiles = []
+        for x, y, tile, mask in layer.tiles():
+            _, png = cv2.imencode('.png', np.dstack([tile, mask * 255]))
+            tiles.append({'x': x, 'y': y, 'png': png.tobytes()})
+        return tiles
+
+    def _toolbar_layout(self):
+        return {
+            'panel': list(self._control_panel_rect),
+            'activeColor': _rgb((100, 100, 255)),
+            'pointerColor': _rgb(self.pointer_color),
+            'elements': [{'name': name, 'x': e['x'], 'y': e['y'], 'width': e['width'],
+                          'height': e['height'], 'color': _rgb(e['color']), 'label': e['label']}
+                         for name, e in self.ui_elements.items()]
+        }
+
+    def slide_image(self, index, quality=90):
+        """Encoded raster of slide ``index`` for client-side compositing."""
+        image = self.slides[index]
+        with self.encode_lock:
+            return self.encoder.encode(image, quality)
+
+    def _encode_stage(self, final_display, meta, binary, delta=False):
+        """Encode the composed frame.
+
+        Frames identical to the previous one are never re-encoded: with
+        ``delta`` they become ``{'unchanged': True}``, otherwise the last
+        payload is reused. With ``delta``, small changes are sent as
+        ``patches`` of JPEG-encoded rectangles for the client to blit onto
+        its canvas. With ``broadcast`` set, a changed frame also carries
+        ``broadcast``, the full frame as JPEG bytes for viewers. Only the
+        encode state guarded by ``encode_lock`` is touched, so this may run
+        on its own thread as long as it sees frames in order.
+        """
+        with self.encode_lock:
+            return self._encode_locked(final_display, meta, binary, delta)
+
+    def _encode_locked(self, final_display, meta, binary, delta):
+        self._encode_seconds = 0.0
+        if 'scene' in meta:
+            result = {key: value for key, value in meta.items() if key not in ('scene', 'changes')}
+            result.update(meta['scene'])
+        else:
+            result = self._encode_presenter(final_display, meta, binary, delta)
+        if not self.broadcast or final_display is None:
+            self._broadcast_version = None
+        elif result['version'] != self._broadcast_version:
+            frame = result.get('frame')
+            full_quality = self.output_scale == 1.0 and self.jpeg_quality == self.JPEG_QUALITY
+            result['broadcast'] = frame if isinstance(frame, bytes) and full_quality else \
+                self._encode_payload(final_display, True, full_quality=True)
+            self._broadcast_version = result['version']
+        if self.encoder.mime != 'image/jpeg' and ('frame' in result or 'patches' in result):
+            result['mime'] = self.encoder.mime
+        result['encodeSeconds'] = self._encode_seconds
+        return result
+
+    def _encode_presenter(self, final_display, meta, binary, delta):
+        result = dict(meta)
+        changes = result.pop('changes', None)
+
+        if changes is not None and not changes:
+            if delta:
+                result['unchanged'] = True
+                return result
+            if self._last_encoded is not None and self._last_encoded[0] == binary:
+                result['frame'] = self._last_encoded[1]
+                return result
+
+        patches = self._delta_rects(changes) if delta and changes else None
+        if patches is not None:
+            result['patches'] = [
+                {'x': x0, 'y': y0, 'w': x1 - x0, 'h': y1 - y0,
+                 'frame': self._encode_payload(final_display[y0:y1, x0:x1], binary)}
+                for x0, y0, x1, y1 in patches
+            ]
+            # The client's canvas no longer matches the cached full frame
+            self._last_encoded = None
             return result
 
+        # Use JPEG encoding with optimized quality for better performance
+        encoded = self._encode_payload(final_display, binary)
+        self._last_encoded = (binary, encoded)
+        result['frame'] = encoded
+        if self.output_scale < 1.0:
+            result['scale'] = self.output_scale  # the client stretches it back
+        return result
+
+    def _encode_payload(self, image, binary, full_quality=False):
+        """Encode ``image`` at the current output quality and scale.
+
+        Returns image bytes when ``binary``, else a ``data:`` URL; None if
+        encoding failed.
+        """
+        start = time.perf_counter()
+        quality = self.JPEG_QUALITY if full_quality else self.jpeg_quality
+        if self.output_scale < 1.0 and not full_quality:
+            image = self._downscale(image)
+        try:
+            if binary:
+                payload = self.encoder.encode(image, quality)
+            else:
+                payload = self.encoder.encode_data_url(image, quality)
         except Exception as e:
-            logging.error(f"Error processing frame: {e}")
+            logging.error(f"Error encoding frame: {e}")
+            payload = None
+        self._encode_seconds += time.perf_counter() - start
+        self._lap('encode', start)
+        return payload
+
+    def _downscale(self, image):
+        height, width = image.shape[:2]
+        size = (max(round(width * self.output_scale), 1), max(round(height * self.output_scale), 1))
+        if (height, width) != (self.SLIDE_HEIGHT, self.SLIDE_WIDTH):
+            return cv2.resize(image, size, interpolation=cv2.INTER_AREA)  # a delta patch
+        if self._scale_buffer is None or self._scale_buffer.shape[:2] != (size[1], size[0]):
+            self._scale_buffer = np.empty((size[1], size[0], 3), dtype=np.uint8)
+        return cv2.resize(image, size, dst=self._scale_buffer, interpolation=cv2.INTER_AREA)
+
+    def apply_quality(self, settings):
+        """Adopt ``QualitySettings`` from a QualityController."""
+        with self.encode_lock:
+            if (settings.jpeg_quality, settings.output_scale) != (self.jpeg_quality, self.output_scale):
+                self._last_encoded = None  # don't reuse a frame encoded at the old settings
+            self.jpeg_quality = settings.jpeg_quality
+            self.output_scale = settings.output_scale
+        self.capture_width = settings.capture_width
+
+    def _delta_rects(self, changes):
+        """Align and merge changed rectangles; None means send a full frame."""
+        a = self.DELTA_ALIGN
+        rects = []
+        for x0, y0, x1, y1 in changes:
+            rect = (x0 // a * a, y0 // a * a,
+                    min(-(-x1 // a) * a, self.SLIDE_WIDTH), min(-(-y1 // a) * a, self.SLIDE_HEIGHT))
+            # Merge with overlapping rectangles until none overlap
+            overlapping = True
+            while overlapping:
+                overlapping = False
+                for other in rects:
+                    if rect[0] < other[2] and other[0] < rect[2] and rect[1] < other[3] and other[1] < rect[3]:
+                        rects.remove(other)
+                        rect = union_rect(rect, other)
+                        overlapping = True
+                        break
+            rects.append(rect)
+
+        area = sum((x1 - x0) * (y1 - y0) for x0, y0, x1, y1 in rects)
+        if area > self.DELTA_MAX_AREA * self.SLIDE_WIDTH * self.SLIDE_HEIGHT:
             return None
+        return rects
 
     def _decode_base64_frame(self, frame_data):
         try:
             # More efficient decoding
             img_bytes = base64.b64decode(frame_data.split(',')[1])
-            img_arr = np.frombuffer(img_bytes, np.uint8)
-            return cv2.imdecode(img_arr, cv2.IMREAD_REDUCED_COLOR_2)  # Load at reduced resolution
+            return self._decode_jpeg_frame(img_bytes)
         except Exception as e:
             logging.error(f"Error decoding frame: {e}")
             return None
 
-    def _encode_frame_to_base64(self, frame):
+    def _decode_jpeg_frame(self, img_bytes):
         try:
-            # Optimize JPEG encoding for better performance
-            encode_param = [int(cv2.IMWRITE_JPEG_QUALITY), 85]  # Balanced quality
-            _, buffer = cv2.imencode('.jpg', frame, encode_param)
-            return base64.b64encode(buffer).decode('utf-8')
+            img_arr = np.frombuffer(img_bytes, np.uint8)
+            # Large captures load at reduced resolution; small ones would
+            # end up below the processing size
+            flag = cv2.IMREAD_REDUCED_COLOR_2 if self.capture_width >= self.REDUCED_DECODE_MIN_WIDTH \
+                else cv2.IMREAD_COLOR
+            return cv2.imdecode(img_arr, flag)
         except Exception as e:
-            logging.error(f"Error encoding frame: {e}")
+            logging.error(f"Error decoding frame: {e}")
             return None
 
     def load_ppt(self, ppt_data):
+        """Convert and open a presentation (pptx, PDF or zip of images)."""
+        start = time.perf_counter()
         try:
-            # Create temporary files more efficiently
-            with tempfile.NamedTemporaryFile(suffix='.pptx', delete=False) as pptx_temp:
-                pptx_temp.write(ppt_data)
-                pptx_path = pptx_temp.name
-
-            pdf_path = pptx_path.replace('.pptx', '.pdf')
-
-            # Convert PPTX to PDF
-            subprocess.run([
-                'C:\\Program Files\\LibreOffice\\program\\soffice.exe',
-                '--headless',
-                '--convert-to', 'pdf',
-                '--outdir', os.path.dirname(pdf_path),
-                pptx_path
-            ], capture_output=True)  # Capture output for better performance
-
-            # Load PDF and convert slides
-            pdf_document = fitz.open(pdf_path)
-            
-            # Pre-allocate lists for better performance
-            self.slides = deque(maxlen=100)
-            self.drawings = deque(maxlen=100)
-            
-            for page_num in range(len(pdf_document)):
-                page = pdf_document[page_num]
-                pix = page.get_pixmap(matrix=fitz.Matrix(1.5, 1.5))  # Reduced resolution
-                
-                # More efficient image conversion
-                img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-                np_img = np.array(img)
-                
-                # Optimize resize operation
-                slide = cv2.resize(np_img, (self.SLIDE_WIDTH, self.SLIDE_HEIGHT), 
-                                 interpolation=cv2.INTER_LINEAR)  # Faster interpolation
-                
-                slide = cv2.cvtColor(slide, cv2.COLOR_RGB2BGR)
-                
-                self.slides.append(slide)
-                self.drawings.append(np.zeros((self.SLIDE_HEIGHT, self.SLIDE_WIDTH, 3), 
-                                           dtype=np.uint8))
-
-            # Cleanup
-            pdf_document.close()
-            os.unlink(pptx_path)  # More efficient file removal
-            os.unlink(pdf_path)
-            
-            self.current_slide = 0
-            return True
-
+            prepared = self.prepare_deck(ppt_data)
         except Exception as e:
             logging.error(f"Error loading PowerPoint: {e}")
             return False
+        success = self.open_deck(*prepared)
+        self._load_phase('total', start)
+        return success
+
+    def _load_phase(self, phase, start):
+        """Record a ``load_ppt`` phase that began at ``start``; return now."""
+        now = time.perf_counter()
+        if self.metrics is not None:
+            self.metrics.deck_load_seconds.observe(now - start, phase)
+        return now
+
+    def prepare_deck(self, ppt_data, progress=None):
+        """Turn an uploaded deck into a PDF without touching presentation state.
+
+        The format is detected from magic bytes: PDFs are used as they are,
+        a zip of PNG/JPEG slides becomes one PDF page per image, and only
+        pptx files go through LibreOffice. Needs no session lock, so a slow
+        conversion never stalls frame processing. Returns ``(pdf_path, cache_key, owns_pdf)`` for
+        ``open_deck`` and raises on failure. ``progress(state, fraction)``
+        is called before conversion starts.
+        """
+        start = time.perf_counter()
+        cache_key = None
+        if self.deck_cache is not None:
+            cache_key = self.deck_cache.key(ppt_data, width=self.SLIDE_WIDTH,
+                                            height=self.SLIDE_HEIGHT, render='direct')
+            cached_pdf = self.deck_cache.pdf_path(cache_key)
+            start = self._load_phase('cache_lookup', start)
+            if cached_pdf is not None:
+                return cached_pdf, cache_key, False
+
+        deck_format = detect_deck_format(ppt_data)
+        if deck_format is None:
+            raise ValueError('Unsupported presentation format')
+
+        if progress is not None:
+            progress('converting', 0.1)
+        workdir = tempfile.mkdtemp(prefix='gesture-deck-')
+        try:
+            pdf_path = os.path.join(workdir, 'presentation.pdf')
+            if deck_format == PDF:
+                with open(pdf_path, 'wb') as f:
+                    f.write(ppt_data)
+            elif deck_format == IMAGES:
+                images_zip_to_pdf(ppt_data, pdf_path)
+            else:
+                pptx_path = os.path.join(workdir, 'presentation.pptx')
+                with open(pptx_path, 'wb') as f:
+                    f.write(ppt_data)
+                if self.converter is not None:
+                    pdf_path = self.converter.convert(pptx_path, workdir)
+                else:
+                    pdf_path = convert_to_pdf(pptx_path, workdir)
+                os.unlink(pptx_path)
+            start = self._load_phase('convert', start)
+
+            if cache_key is not None:
+                import fitz
+                with fitz.open(pdf_path) as pdf_document:
+                    pages = len(pdf_document)
+                cached_pdf = self.deck_cache.store_pdf(cache_key, pdf_path, pages)
+                self._load_phase('cache_store', start)
+                if cached_pdf is not None:
+                    return cached_pdf, cache_key, False
+
+            # No cache: the deck owns the converted PDF and deletes it on close
+            fd, owned_pdf = tempfile.mkstemp(suffix='.pdf')
+            os.close(fd)
+            shutil.move(pdf_path, owned_pdf)
+            return owned_pdf, None, True
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    def open_deck(self, pdf_path, cache_key=None, owns_pdf=False, on_rendered=None):
+        """Replace the current deck.
+
+        With a render pool all slides are rendered in the background, slide
+        1 first, reporting each through ``on_rendered(index, rendered,
+        total)``; otherwise they are rendered lazily on access.
+        """
+        start = time.perf_counter()
+        try:
+            deck = SlideDeck(pdf_path, width=self.SLIDE_WIDTH, height=self.SLIDE_HEIGHT,
+                             budget_bytes=self.raster_cache_bytes, deck_cache=self.deck_cache,
+                             cache_key=cache_key, owns_pdf=owns_pdf, render_pool=self.render_pool)
+        except Exception as e:
+            logging.error(f"Error opening presentation: {e}")
+            return False
+
+        old_deck = self.slides
+        self._end_stroke()
+        self.slides = deck
+        self.deck_id = uuid.uuid4().hex
+        self.drawings = {}
+        self.journals = {key: journal for key, journal in self.journals.items() if key == 'whiteboard'}
+        self.current_slide = 0
+        self.compositor.invalidate()
+        old_deck.close()
+        if self.render_pool is not None:
+            deck.render_all(on_rendered)
+        elif len(deck):
+            deck.prefetch(0)
+        self._load_phase('open', start)
+        return True
+
+    def _surface_key(self):
+        return 'whiteboard' if self.is_whiteboard else ('slide', self.current_slide)
+
+    def _drawing_layer(self, create=False):
+        """Annotation layer for the current surface, allocated on demand."""
+        if self.is_whiteboard:
+            return self.whiteboard_drawing
+        layer = self.drawings.get(self.current_slide)
+        if layer is None and create:
+            layer = TiledCanvas(self.SLIDE_HEIGHT, self.SLIDE_WIDTH)
+            self.drawings[self.current_slide] = layer
+        return layer
 
     def next_slide(self):
         if self.current_slide < len(self.slides) - 1:
@@ -574,13 +1124,74 @@ class HandGestureProcessor:
         return False
 
     def clear_drawings(self):
-        if self.is_whiteboard:
-            self.whiteboard_drawing.fill(0)
-        else:
-            self.drawings[self.current_slide].fill(0)
+        """Wipe the current surface's ink; the clear itself can be undone."""
+        self._end_stroke()
+        layer = self._drawing_layer()
+        if layer is None or layer.is_empty():
+            return
+        journal = self._journal(self._surface_key(), layer)
+        layer.clear()
+        journal.append(clear_record())
+        if self.client_compositing:
+            self._ink_events.append({'tool': 'clear'})
+
+    def undo(self):
+        """Revert the last stroke or clear on the current surface."""
+        self._end_stroke()
+        journal = self.journals.get(self._surface_key())
+        if journal is None or not journal.undo():
+            return False
+        self._resend_ink()
+        return True
+
+    def redo(self):
+        self._end_stroke()
+        journal = self.journals.get(self._surface_key())
+        if journal is None or not journal.redo():
+            return False
+        self._resend_ink()
+        return True
+
+    def _resend_ink(self):
+        # Undo/redo aren't incremental; send the client the whole layer
+        if self._scene_key is not None:
+            self._scene_key = (None, None)
+
+    def history_state(self):
+        journal = self.journals.get(self._surface_key())
+        return {
+            'canUndo': journal is not None and journal.can_undo,
+            'canRedo': journal is not None and journal.can_redo
+        }
 
     def toggle_whiteboard(self):
         self.is_whiteboard = not self.is_whiteboard
         
+    def memory_usage(self):
+        """Bytes held by slide rasters, annotation layers, undo history and scratch buffers."""
+        slides = self.slides.nbytes
+        drawings = sum(drawing.nbytes for drawing in self.drawings.values())
+        history = sum(journal.nbytes for journal in self.journals.values())
+        buffers = (self.whiteboard.nbytes + self.whiteboard_drawing.nbytes +
+                   self.compositor.memory_usage())
+        return {
+            'slides': slides,
+            'drawings': drawings,
+            'history': history,
+            'buffers': buffers,
+            'total': slides + drawings + history + buffers
+        }
+
+    def warm_up(self):
+        """Run the Hands graph once on a blank frame.
+
+        MediaPipe initializes its graph lazily, which would otherwise stall
+        the presenter's first real frame. A blank frame contains no hand, so
+        no tracking state carries over.
+        """
+        blank = np.zeros((self.PROCESS_HEIGHT, self.PROCESS_WIDTH, 3), dtype=np.uint8)
+        self.hands.process(blank)
+
     def cleanup(self):
-        self.hands.close()
\ No newline at end of file
+        self.hands.close()
+        self.slides.close()
\ No newline at end of file
@@ -0,0 +1,110 @@
+import json
+import os
+
+import numpy as np
+
+DEFAULT_TABLE_PATH = os.path.join(os.path.dirname(__file__), 'gesture_table.json')
+
+# Landmark indices, thumb to pinky
+FINGER_TIPS = np.array([4, 8, 12, 16, 20])
+FINGER_PIPS = np.array([3, 6, 10, 14, 18])  # the thumb uses its IP joint
+WRIST = 0
+MIDDLE_FINGER_MCP = 9
+
+NO_GESTURE = "NONE"
+
+
+def load_gesture_table(path=None):
+    with open(path or DEFAULT_TABLE_PATH) as f:
+        return json.load(f)
+
+
+def finger_states(points):
+    """Extended/folded state of each finger, thumb first.
+
+    ``points`` is ``(21, 3)`` or a batch ``(N, 21, 3)`` of normalized
+    landmarks; the result is a boolean array of shape ``(5,)`` or ``(N, 5)``.
+    A finger is extended when its tip is above its PIP joint, the thumb
+    when its tip is left of its IP joint.
+    """
+    tips = points[..., FINGER_TIPS, :]
+    pips = points[..., FINGER_PIPS, :]
+    states = tips[..., 1] < pips[..., 1]
+    states[..., 0] = tips[..., 0, 0] < pips[..., 0, 0]
+    return states
+
+
+def landmark_distances(points, pairs):
+    """Distances between landmark ``pairs``, in units of palm length."""
+    pairs = np.asarray(pairs).reshape(-1, 2)
+    palm = np.linalg.norm(points[..., MIDDLE_FINGER_MCP, :2] - points[..., WRIST, :2], axis=-1)
+    distances = np.linalg.norm(points[..., pairs[:, 0], :2] - points[..., pairs[:, 1], :2], axis=-1)
+    return distances / np.maximum(palm, 1e-6)[..., None]
+
+
+class GestureClassifier:
+    """Matches finger states against a declarative gesture table.
+
+    The table (``gesture_table.json`` by default) lists gestures in priority
+    order; the first entry whose constraints all hold wins::
+
+        {"hold": 0.15,
+         "gestures": [
+           {"name": "NEXT", "fingers": [1, 1, 1, 0, 0], "cooldown": 0.5},
+           {"name": "PINCH", "fingers": [null, null, 0, 0, 0],
+            "distances": [{"between": [4, 8], "max": 0.3}]}]}
+
+    ``fingers`` gives thumb..pinky as 1 (extended), 0 (folded) or null
+    (either). ``distances`` bounds the distance between two landmarks
+    relative to palm length. ``hold`` is how long, in seconds, a new
+    gesture must persist before it acts, and ``cooldown`` how long a
+    one-shot action is locked out afterwards; both may be set per gesture.
+    """
+
+    def __init__(self, table=None):
+        if table is None:
+            table = load_gesture_table()
+        gestures = table['gestures']
+        self.names = [g['name'] for g in gestures] + [NO_GESTURE]
+        self.patterns = np.array([[-1 if f is None else int(f) for f in g['fingers']]
+                                  for g in gestures], dtype=np.int8).reshape(-1, 5)
+
+        default_hold = table.get('hold', 0.0)
+        self.hold = {g['name']: g.get('hold', default_hold) for g in gestures}
+        self.hold[NO_GESTURE] = default_hold
+        self.cooldown = {g['name']: g.get('cooldown', 0.0) for g in gestures}
+
+        # Distance constraints flattened into one vectorized check
+        pairs, bounds, owners = [], [], []
+        for i, g in enumerate(gestures):
+            for constraint in g.get('distances', ()):
+                pairs.append(constraint['between'])
+                bounds.append((constraint.get('min', 0.0), constraint.get('max', np.inf)))
+                owners.append(i)
+        self._pairs = np.array(pairs, dtype=np.intp).reshape(-1, 2)
+        self._bounds = np.array(bounds, dtype=np.float32).reshape(-1, 2)
+        self._owners = np.array(owners, dtype=np.intp)
+
+    def _matches(self, points):
+        """Boolean ``(N, G)`` matrix of gestures matched by each landmark set."""
+        states = finger_states(points).astype(np.int8)
+        matches = ((self.patterns == -1) | (self.patterns == states[:, None, :])).all(axis=2)
+        if len(self._pairs):
+            distances = landmark_distances(points, self._pairs)
+            ok = (distances >= self._bounds[:, 0]) & (distances <= self._bounds[:, 1])
+            for constraint, owner in enumerate(self._owners):
+                matches[:, owner] &= ok[:, constraint]
+        return matches
+
+    def classify(self, points):
+        """Name of the gesture shown by one ``(21, 3)`` landmark array."""
+        return self.classify_batch(points[None])[0]
+
+    def classify_batch(self, points):
+        """Gesture names for an ``(N, 21, 3)`` stack of recorded landmarks."""
+        points = np.asarray(points, dtype=np.float32)
+        if len(points) == 0:
+            return []
+        matches = self._matches(points)
+        first = np.where(matches.any(axis=1), matches.argmax(axis=1), len(self.names) - 1)
+        return [self.names[i] for i in first]
@@ -0,0 +1,181 @@
+from collections import deque, namedtuple
+
+import cv2
+import numpy as np
+
+NUM_LANDMARKS = 21
+
+Landmark = namedtuple('Landmark', 'x y z')
+
+
+class TrackedHand:
+    """Stand-in for MediaPipe's ``NormalizedLandmarkList`` built from an array.
+
+    Everything in the pipeline reads ``points`` (see ``landmarks_to_array``);
+    the per-landmark ``landmark`` list is only built if something asks for it.
+    """
+
+    def __init__(self, points):
+        self.points = points
+        self._landmark = None
+
+    @property
+    def landmark(self):
+        if self._landmark is None:
+            self._landmark = [Landmark(float(x), float(y), float(z)) for x, y, z in self.points]
+        return self._landmark
+
+
+class TrackedResults:
+    """Stand-in for the result of ``Hands.process`` holding predicted or client-tracked landmarks."""
+
+    def __init__(self, hands=None, predicted=False, handedness=None):
+        self.multi_hand_landmarks = hands or None
+        self.multi_handedness = None
+        self.predicted = predicted
+        self.handedness = handedness  # 'Left'/'Right' labels, when known
+
+
+def landmarks_to_array(hand_landmarks):
+    """Convert MediaPipe landmarks to a ``(21, 3)`` float32 array."""
+    points = getattr(hand_landmarks, 'points', None)
+    if points is not None:
+        return points
+    return np.array([(lm.x, lm.y, lm.z) for lm in hand_landmarks.landmark], dtype=np.float32)
+
+
+class LandmarkTracker:
+    """Constant-velocity model of all 21 landmarks between inferences.
+
+    ``update`` is fed every real MediaPipe result; ``predict`` extrapolates
+    the last observation and refuses to guess further ahead than
+    ``max_age`` seconds.
+    """
+
+    def __init__(self, max_age=0.25, smoothing=0.5):
+        self.max_age = max_age
+        self.smoothing = smoothing
+        self.reset()
+
+    def reset(self):
+        self._points = None
+        self._velocity = np.zeros((NUM_LANDMARKS, 3), dtype=np.float32)
+        self._time = None
+
+    def update(self, points, timestamp):
+        if self._points is not None and timestamp > self._time:
+            velocity = (points - self._points) / (timestamp - self._time)
+            self._velocity = self.smoothing * velocity + (1 - self.smoothing) * self._velocity
+        else:
+            self._velocity[:] = 0
+        self._points = points
+        self._time = timestamp
+
+    def predict(self, timestamp):
+        if self._points is None or timestamp - self._time > self.max_age:
+            return None
+        return self._points + self._velocity * (timestamp - self._time)
+
+
+class InferenceScheduler:
+    """Decides which frames get full MediaPipe inference.
+
+    Up to ``max_gap`` frames in a row may be predicted by the tracker. The
+    allowed gap shrinks linearly with fingertip speed and drops to zero at
+    ``fast_motion`` (normalized screen units per second), when no hand is
+    visible, and for ``boost_frames`` frames after the gesture changes.
+    """
+
+    def __init__(self, max_gap=2, fast_motion=1.0, boost_frames=3, window=60):
+        self.max_gap = max_gap
+        self.fast_motion = fast_motion
+        self.boost_frames = boost_frames
+        self._gap = 0
+        self._skipped = 0
+        self._boost = 0
+        self._hand_visible = False
+        self._last_gesture = None
+        self._history = deque(maxlen=window)  # True for inferred frames
+
+    def should_infer(self):
+        if not self._hand_visible or self._boost > 0 or self._skipped >= self._gap:
+            return True
+        return False
+
+    def record(self, inferred):
+        self._history.append(inferred)
+        if inferred:
+            self._skipped = 0
+        else:
+            self._skipped += 1
+        if self._boost > 0:
+            self._boost -= 1
+
+    def observe(self, hand_visible, gesture=None, speed=0.0):
+        """Feed back what the frame showed so the next decision can adapt."""
+        self._hand_visible = hand_visible
+        if gesture != self._last_gesture:
+            self._boost = self.boost_frames
+            self._last_gesture = gesture
+        ratio = min(speed / self.fast_motion, 1.0) if self.fast_motion else 1.0
+        self._gap = int(round(self.max_gap * (1.0 - ratio)))
+
+    def stats(self):
+        frames = len(self._history)
+        inferred = sum(self._history)
+        return {
+            'frames': frames,
+            'inferred': inferred,
+            'inference_rate': round(inferred / frames, 3) if frames else 1.0,
+            'current_gap': self._gap
+        }
+
+
+class DuplicateFrameDetector:
+    """Spots camera frames that are effectively identical to a reference.
+
+    The signature is a small grayscale thumbnail. A frame is a duplicate
+    when no thumbnail cell differs by more than ``threshold`` grey levels
+    from the signature of the last frame that went through inference, and
+    that reference is younger than ``max_age`` seconds. Comparing with the
+    reference rather than the previous frame keeps slow drift from
+    accumulating unnoticed.
+    """
+
+    def __init__(self, size=(32, 24), threshold=4, max_age=1.0):
+        self.size = size
+        self.threshold = threshold
+        self.max_age = max_age
+        self.duplicates = 0
+        self._reference = None
+        self._reference_time = None
+
+    def signature(self, frame_rgb):
+        gray = cv2.cvtColor(frame_rgb, cv2.COLOR_RGB2GRAY)
+        return cv2.resize(gray, self.size, interpolation=cv2.INTER_AREA)
+
+    def is_duplicate(self, signature, timestamp):
+        if self._reference is None or timestamp - self._reference_time > self.max_age:
+            return False
+        if cv2.absdiff(signature, self._reference).max() > self.threshold:
+            return False
+        self.duplicates += 1
+        return True
+
+    def update(self, signature, timestamp):
+        self._reference = signature
+        self._reference_time = timestamp
+
+    def reset(self):
+        self._reference = None
+
+
+def fingertip_speed(position_history):
+    """Average speed over ``(x, y, t)`` samples in normalized units per second."""
+    if len(position_history) < 2:
+        return 0.0
+    x0, y0, t0 = position_history[0]
+    x1, y1, t1 = position_history[-1]
+    if t1 <= t0:
+        return 0.0
+    return float(np.hypot(x1 - x0, y1 - y0) / (t1 - t0))
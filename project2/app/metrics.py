@@ -0,0 +1,114 @@
+import bisect
+import threading
+
+# Upper bounds in seconds; +Inf is implicit
+STAGE_BUCKETS = (0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.25, 1.0)
+LOAD_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{k}="{v}"' for k, v in labels) + '}'
+
+
+class Counter:
+    def __init__(self, name, help):
+        self.name = name
+        self.help = help
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def render(self):
+        return [f'# HELP {self.name} {self.help}',
+                f'# TYPE {self.name} counter',
+                f'{self.name} {self.value}']
+
+
+class Gauge:
+    """Gauge whose value is read from ``fn`` at scrape time."""
+
+    def __init__(self, name, help, fn):
+        self.name = name
+        self.help = help
+        self.fn = fn
+
+    def render(self):
+        return [f'# HELP {self.name} {self.help}',
+                f'# TYPE {self.name} gauge',
+                f'{self.name} {self.fn()}']
+
+
+class Histogram:
+    """Fixed-bucket histogram, optionally split by one label.
+
+    ``observe`` is a bisect plus two additions under a lock; cumulative
+    counts are only built when rendering.
+    """
+
+    def __init__(self, name, help, buckets, label=None):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.label = label
+        self._series = {}  # label value -> [bucket counts..., sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value, label_value=None):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(label_value)
+            if series is None:
+                series = self._series[label_value] = [0] * (len(self.buckets) + 2)
+            series[index] += 1
+            series[-1] += value
+
+    def render(self):
+        lines = [f'# HELP {self.name} {self.help}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            series = {key: list(values) for key, values in self._series.items()}
+        for label_value, values in sorted(series.items(), key=lambda item: str(item[0])):
+            labels = [(self.label, label_value)] if self.label else []
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), values[:-1]):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{_format_labels(labels + [("le", bound)])} {cumulative}')
+            lines.append(f'{self.name}_sum{_format_labels(labels)} {values[-1]}')
+            lines.append(f'{self.name}_count{_format_labels(labels)} {cumulative}')
+        return lines
+
+
+class Metrics:
+    """Process-wide counters and histograms rendered as Prometheus text.
+
+    When metrics are disabled no instance exists: callers hold ``None``
+    and skip their bookkeeping with a single ``is not None`` check.
+    """
+
+    def __init__(self):
+        self.stage_seconds = Histogram(
+            'gesture_frame_stage_seconds', 'Time spent in each frame processing stage.',
+            STAGE_BUCKETS, label='stage')
+        self.frame_seconds = Histogram(
+            'gesture_frame_seconds', 'Time to process one frame end to end.', STAGE_BUCKETS)
+        self.deck_load_seconds = Histogram(
+            'gesture_deck_load_seconds', 'Time spent loading a presentation, by phase.',
+            LOAD_BUCKETS, label='phase')
+        self.frames_processed = Counter('gesture_frames_processed_total', 'Frames processed and sent back.')
+        self.frames_dropped = Counter('gesture_frames_dropped_total', 'Frames replaced by a newer one before processing.')
+        self.frames_errored = Counter('gesture_frames_errored_total', 'Frames that failed to process.')
+        self._metrics = [self.stage_seconds, self.frame_seconds, self.deck_load_seconds,
+                         self.frames_processed, self.frames_dropped, self.frames_errored]
+
+    def gauge(self, name, help, fn):
+        self._metrics.append(Gauge(name, help, fn))
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
@@ -0,0 +1,110 @@
+import time
+from collections import namedtuple
+
+QualitySettings = namedtuple('QualitySettings', [
+    'jpeg_quality',    # output JPEG quality
+    'output_scale',    # output resolution as a fraction of the slide size
+    'frame_interval',  # seconds between frames the client captures
+    'capture_width',   # client capture size
+    'capture_height'
+])
+
+
+def _lerp(bounds, level):
+    best, worst = bounds
+    return best + (worst - best) * level
+
+
+class QualityController:
+    """Per-connection feedback loop trading image quality for latency.
+
+    ``observe`` is fed after every frame with the client-measured round
+    trip time, the server's encode time and the mailbox's running count of
+    dropped frames. Every ``update_interval`` seconds the smoothed numbers
+    move a single degradation ``level`` between 0 (best) and 1 (worst): it
+    rises quickly when latency exceeds ``target_latency``, frames are being
+    dropped or encoding eats more than ``encode_budget`` of the frame
+    interval, and falls slowly once latency is comfortably below target.
+    Each setting is interpolated between its best and worst bound by the
+    level. ``observe`` returns the new ``QualitySettings`` when they change.
+    """
+
+    def __init__(self, target_latency=0.2, quality_range=(85, 50), scale_range=(1.0, 0.5),
+                 fps_range=(30, 8), capture_range=(800, 480), update_interval=0.5,
+                 smoothing=0.3, encode_budget=0.5, degrade_step=0.15, recover_step=0.05):
+        self.target_latency = target_latency
+        self.quality_range = quality_range
+        self.scale_range = scale_range
+        self.fps_range = fps_range
+        self.capture_range = capture_range
+        self.update_interval = update_interval
+        self.smoothing = smoothing
+        self.encode_budget = encode_budget
+        self.degrade_step = degrade_step
+        self.recover_step = recover_step
+
+        self.level = 0.0
+        self.latency = None  # smoothed round trip, seconds
+        self.encode_seconds = None  # smoothed encode time, seconds
+        self._dropped_total = None
+        self._dropped = 0
+        self._frames = 0
+        self._last_update = None
+        self.settings = self.settings_for(self.level)
+
+    def settings_for(self, level):
+        width = int(_lerp(self.capture_range, level)) // 16 * 16
+        return QualitySettings(
+            jpeg_quality=int(round(_lerp(self.quality_range, level))),
+            output_scale=round(_lerp(self.scale_range, level), 2),
+            frame_interval=round(1.0 / _lerp(self.fps_range, level), 3),
+            capture_width=width,
+            capture_height=width * 3 // 4
+        )
+
+    def _smooth(self, current, sample):
+        if current is None:
+            return sample
+        return current + self.smoothing * (sample - current)
+
+    def observe(self, rtt=None, encode_seconds=None, dropped_total=None, now=None):
+        if rtt is not None and rtt >= 0:
+            self.latency = self._smooth(self.latency, rtt)
+        if encode_seconds is not None:
+            self.encode_seconds = self._smooth(self.encode_seconds, encode_seconds)
+        if dropped_total is not None:
+            if self._dropped_total is not None:
+                self._dropped += max(dropped_total - self._dropped_total, 0)
+            self._dropped_total = dropped_total
+        self._frames += 1
+
+        now = time.monotonic() if now is None else now
+        if self._last_update is None:
+            self._last_update = now
+        if now - self._last_update < self.update_interval:
+            return None
+        drop_rate = self._dropped / max(self._frames + self._dropped, 1)
+        self._dropped = self._frames = 0
+        self._last_update = now
+
+        encode_slow = self.encode_seconds is not None and \
+            self.encode_seconds > self.encode_budget * self.settings.frame_interval
+        latency = self.latency or 0.0
+        if latency > self.target_latency or drop_rate > 0.1 or encode_slow:
+            self.level = min(self.level + self.degrade_step, 1.0)
+        elif latency < 0.6 * self.target_latency and not drop_rate:
+            self.level = max(self.level - self.recover_step, 0.0)
+
+        settings = self.settings_for(self.level)
+        if settings == self.settings:
+            return None
+        self.settings = settings
+        return settings
+
+    def to_dict(self):
+        return {
+            'level': round(self.level, 3),
+            'latency_ms': None if self.latency is None else round(self.latency * 1000, 1),
+            'encode_ms': None if self.encode_seconds is None else round(self.encode_seconds * 1000, 2),
+            'settings': self.settings._asdict()
+        }
@@ -1,12 +1,22 @@
+import os
+import time
 from flask import render_template
-from app import app, socketio, gesture_processor
-from flask import request, jsonify
-from flask_socketio import emit
+from app import app, socketio, session_manager, metrics, conversion_jobs, viewer_rooms
+from flask import request, jsonify, Response, abort
+from flask_socketio import emit, join_room
+from app.transport import unpack_frame_message, unpack_landmarks_message, echo_header
+from app.frame_pipeline import FramePipeline
+from app.deck_formats import detect_deck_format
+from app.startup import startup_report
 
 @app.route('/')
 def index():
     return render_template('index.html');
 
+@app.route('/view/<presentation_id>')
+def viewer(presentation_id):
+    return render_template('viewer.html', presentation_id=presentation_id)
+
 @app.route('/upload-ppt', methods=['POST'])
 def upload_pptx():
     if 'file' not in request.files:
@@ -16,22 +26,317 @@ def upload_pptx():
     if file.filename == '':
         return jsonify({'error': 'No file selected'}), 400
         
-    if not file.filename.endswith('.pptx'):
-        return jsonify({'error': 'File must be a pptx'}), 400
+    sid = request.form.get('sid')
+    if not sid:
+        return jsonify({'error': 'No socket session provided'}), 400
+    # Sessions are only created for live sockets, never for arbitrary sids
+    if not socketio.server.manager.is_connected(sid, '/'):
+        return jsonify({'error': 'Unknown socket session'}), 400
         
-    pptx_data = file.read()
-    success = gesture_processor.load_ppt(pptx_data)
-    
-    if success:
-        return jsonify({'message': 'pptx loaded successfully'})
+    deck_data = file.read()
+    # Trust the content, not the file extension
+    if detect_deck_format(deck_data) is None:
+        return jsonify({'error': 'File must be a pptx, a PDF or a zip of PNG/JPEG slides'}), 400
+
+    session = session_manager.get(sid)
+    # The resume token only ever goes to the presenter's own socket, never
+    # to whoever made this request
+    socketio.emit('session_token', {'token': session.token}, to=sid)
+    # Conversion runs in the background; progress arrives as
+    # 'conversion_progress' events and from /jobs/<job_id>
+    job = conversion_jobs.submit(sid, lambda job: _load_presentation(job, session, deck_data),
+                                 filename=file.filename)
+    return jsonify({
+        'message': 'presentation conversion started',
+        'job_id': job.id,
+        'status_url': f'/jobs/{job.id}'
+    }), 202
+
+def _load_presentation(job, session, deck_data):
+    """Convert on a job thread, then swap the deck in under the session lock."""
+    start = time.perf_counter()
+    if session.mailbox.closed:
+        raise RuntimeError('Presenter session closed')
+    prepared = session.processor.prepare_deck(
+        deck_data, progress=lambda state, fraction: conversion_jobs.update(job, state, fraction))
+    conversion_jobs.update(job, 'rendering', 0.9)
+    with session.lock:
+        opened = session.processor.open_deck(*prepared, on_rendered=_slide_progress(job))
+        deck = session.processor.slides
+    if not opened:
+        pdf_path, _, owns_pdf = prepared
+        if owns_pdf and os.path.exists(pdf_path):
+            os.unlink(pdf_path)
+        raise RuntimeError('Failed to open converted presentation')
+    # Later slides keep rendering; the presentation can start once slide 1 is ready
+    if len(deck):
+        deck[0]
+    if metrics is not None:
+        metrics.deck_load_seconds.observe(time.perf_counter() - start, 'total')
+
+def _slide_progress(job):
+    def on_rendered(index, rendered, total):
+        socketio.emit('slides_rendered', {'job_id': job.id, 'index': index,
+                                          'rendered': rendered, 'total': total}, to=job.sid)
+    return on_rendered
+
+@app.route('/jobs/<job_id>', methods=['GET'])
+def job_status(job_id):
+    job = conversion_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown job'}), 404
+    return jsonify(job.to_dict())
+
+@app.route('/slides/<sid>/<deck_id>/<int:index>', methods=['GET'])
+def slide_image(sid, deck_id, index):
+    """One slide raster for a client compositing its own output.
+
+    URLs are unique per opened deck, so browsers may cache them for good.
+    """
+    session = session_manager.get(sid, create=False)
+    if session is None:
+        abort(404)
+    with session.lock:
+        processor = session.processor
+        if processor.deck_id != deck_id or not 0 <= index < len(processor.slides):
+            abort(404)
+        image = processor.slide_image(index)
+        mime = processor.encoder.mime
+    response = Response(image, mimetype=mime)
+    response.headers['Cache-Control'] = 'private, max-age=31536000, immutable'
+    return response
+
+@app.route('/sessions', methods=['GET'])
+def sessions():
+    return jsonify({
+        'active': len(session_manager),
+        'max': session_manager.max_sessions,
+        'sessions': session_manager.memory_report()
+    })
+
+@app.route('/metrics', methods=['GET'])
+def prometheus_metrics():
+    if metrics is None:
+        abort(404)
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/startup', methods=['GET'])
+def startup_timings():
+    return jsonify(startup_report.to_dict())
+
+@socketio.on('disconnect')
+def handle_disconnect():
+    viewer_rooms.leave(request.sid)
+    # Kept for a while so the presenter can resume after a reconnect; its
+    # viewer room stays open until the session is closed for good
+    session_manager.detach(request.sid)
+
+@socketio.on('resume_session')
+def handle_resume(data):
+    """Reattach a reconnected presenter to its session and deck."""
+    token = data.get('token') if isinstance(data, dict) else None
+    session, old_sid = session_manager.resume(token, request.sid)
+    if session is None:
+        emit('session_expired')
+        return
+    conversion_jobs.retarget(old_sid, request.sid)
+    viewer_rooms.retarget(old_sid, request.sid)
+    with session.lock:
+        if session.processor.client_compositing:
+            # Scene updates sent while disconnected never arrived; start the
+            # client over from the authoritative ink
+            session.processor.set_client_compositing(True)
+        emit('session_resumed', {'currentSlide': session.processor.current_slide,
+                                 'totalSlides': len(session.processor.slides)})
+
+def _emit_result(session, result, header):
+    if result:
+        session.processed += 1
+        if metrics is not None:
+            metrics.frames_processed.inc()
+        result = echo_header(dict(result), header)
+        result['dropped'] = session.mailbox.dropped
+        broadcast = result.pop('broadcast', None)
+        encode_seconds = result.pop('encodeSeconds', None)
+        socketio.emit('processed_frame', result, to=session.sid)
+        _adapt_quality(session, header, encode_seconds)
+        room = viewer_rooms.for_presenter(session.sid)
+        if broadcast and room is not None:
+            # Encoded once by the processor; one room emit reaches every viewer
+            room.publish({'frame': broadcast, 'mime': session.processor.encoder.mime,
+                          'currentSlide': result['currentSlide'],
+                          'totalSlides': result['totalSlides'], 'version': result['version']})
     else:
-        return jsonify({'error': 'Failed to load pptx from server'}), 500
+        session.errors += 1
+        if metrics is not None:
+            metrics.frames_errored.inc()
+        socketio.emit('frame_ack', echo_header({'dropped': session.mailbox.dropped}, header),
+                      to=session.sid)
+
+def _adapt_quality(session, header, encode_seconds):
+    """Feed the session's quality controller and push any new settings."""
+    if session.quality is None:
+        return
+    rtt = header.get('rtt')
+    settings = session.quality.observe(
+        rtt=rtt / 1000 if isinstance(rtt, (int, float)) else None,
+        encode_seconds=encode_seconds,
+        dropped_total=session.mailbox.dropped
+    )
+    if settings is None:
+        return
+    session.processor.apply_quality(settings)
+    socketio.emit('quality', {
+        'frameInterval': settings.frame_interval * 1000,
+        'captureWidth': settings.capture_width,
+        'captureHeight': settings.capture_height,
+        'jpegQuality': settings.jpeg_quality,
+        'outputScale': settings.output_scale
+    }, to=session.sid)
+
+def _frame_worker(session):
+    """Drain a presenter's mailbox, always processing the newest frame."""
+    if app.config['PIPELINED_FRAMES']:
+        session.pipeline = FramePipeline(
+            session.processor,
+            on_result=lambda result, header: _emit_result(session, result, header),
+            lock=session.lock,
+            depth=app.config['PIPELINE_DEPTH']
+        )
+
+    while not session.mailbox.closed:
+        item = session.mailbox.take(timeout=1.0)
+        if item is None:
+            continue
+        payload, header = item
+        session.processor.broadcast = viewer_rooms.has_viewers(session.sid)
+        try:
+            if header.get('landmarks'):
+                # Client-tracked hands: no decode or inference to overlap
+                with session.lock:
+                    result = session.processor.process_landmarks(
+                        payload, header.get('handedness'),
+                        binary=header.get('binary', True) is not False, delta=bool(header.get('delta')))
+                _emit_result(session, result, header)
+                continue
+            if session.pipeline is not None:
+                # Blocks while the pipeline is full; newer frames keep
+                # replacing this one's successor in the mailbox meanwhile
+                session.pipeline.submit(payload, header)
+                continue
+            with session.lock:
+                result = session.processor.process_frame(payload, delta=bool(header.get('delta')))
+            _emit_result(session, result, header)
+        except Exception as e:
+            session.errors += 1
+            if metrics is not None:
+                metrics.frames_errored.inc()
+            print(f"Error in frame worker: {str(e)}")
+            socketio.emit('error', {'message': 'Error processing frame'}, to=session.sid)
+
 @socketio.on('process_frame')
 def handle_frame(frame_data):
     try:
-        result = gesture_processor.process_frame(frame_data)
-        if result:
-            emit('processed_frame', result)
+        session = session_manager.get(request.sid, create=False)
+        if session is None:
+            # Tells the client to stop streaming and upload again
+            emit('session_expired')
+            return
+        payload, header = unpack_frame_message(frame_data)
+        if payload is None:
+            emit('error', {'message': 'Malformed frame'})
+            return
+        _queue_input(session, payload, header)
     except Exception as e:
         print(f"Error in handle_frame: {str(e)}")
         emit('error', {'message': 'Error processing frame'})
+
+@socketio.on('process_landmarks')
+def handle_landmarks(message):
+    """Hand landmarks from a client doing its own tracking (see transport.py)."""
+    try:
+        session = session_manager.get(request.sid, create=False)
+        if session is None:
+            emit('session_expired')
+            return
+        points, header = unpack_landmarks_message(message)
+        if points is None:
+            emit('error', {'message': 'Malformed landmarks'})
+            return
+        header['landmarks'] = True
+        _queue_input(session, points, header)
+    except Exception as e:
+        print(f"Error in handle_landmarks: {str(e)}")
+        emit('error', {'message': 'Error processing landmarks'})
+
+def _queue_input(session, payload, header):
+    # Frames and landmark packets share the mailbox; the newest one wins
+    session.ensure_worker(lambda s: socketio.start_background_task(_frame_worker, s))
+    if session.mailbox.put((payload, header)) and metrics is not None:
+        metrics.frames_dropped.inc()
+
+def _edit_history(action):
+    session = session_manager.get(request.sid, create=False)
+    if session is None:
+        emit('error', {'message': 'No presentation loaded'})
+        return
+    try:
+        with session.lock:
+            processor = session.processor
+            changed = processor.undo() if action == 'undo' else processor.redo()
+            state = processor.history_state()
+    except Exception as e:
+        print(f"Error in {action}: {str(e)}")
+        emit('error', {'message': f'Could not {action}'})
+        return
+    emit('history', dict(state, action=action, changed=changed))
+
+@socketio.on('undo')
+def handle_undo():
+    _edit_history('undo')
+
+@socketio.on('redo')
+def handle_redo():
+    _edit_history('redo')
+
+@socketio.on('render_mode')
+def handle_render_mode(data):
+    """'client' for scene updates the browser composites, 'server' for frames."""
+    mode = data.get('mode') if isinstance(data, dict) else None
+    if mode not in ('client', 'server'):
+        emit('error', {'message': 'Unknown render mode'})
+        return
+    if mode == 'client' and not app.config['CLIENT_COMPOSITING']:
+        mode = 'server'
+    session = session_manager.get(request.sid, create=False)
+    if session is None:
+        emit('error', {'message': 'No presentation loaded'})
+        return
+    with session.lock:
+        session.processor.set_client_compositing(mode == 'client')
+    emit('render_mode', {'mode': mode})
+
+@socketio.on('share_presentation')
+def handle_share():
+    """Open a viewer room for the calling presenter."""
+    if session_manager.get(request.sid, create=False) is None:
+        emit('error', {'message': 'No presentation loaded'})
+        return
+    room = viewer_rooms.open(request.sid)
+    emit('presentation_shared', {'presentation_id': room.id,
+                                 'viewer_url': f'/view/{room.id}'})
+
+@socketio.on('join_presentation')
+def handle_join(data):
+    presentation_id = data.get('presentation_id') if isinstance(data, dict) else None
+    room = viewer_rooms.join(presentation_id, request.sid)
+    if room is None:
+        emit('error', {'message': 'Unknown or full presentation'})
+        return
+    join_room(room.room)
+    room.add(request.sid)
+    emit('viewer_joined', {'presentation_id': room.id, 'viewers': len(room)})
+
+@socketio.on('viewer_ack')
+def handle_viewer_ack(*args):
+    viewer_rooms.ack(request.sid)
@@ -0,0 +1,274 @@
+import secrets
+import threading
+import time
+import logging
+from collections import OrderedDict
+from contextlib import nullcontext
+
+from app.gesture_processor import HandGestureProcessor
+from app.startup import startup_report
+from app.frame_mailbox import FrameMailbox
+
+
+class PresenterSession:
+    """State owned by a single connected presenter."""
+
+    def __init__(self, sid, processor, quality=None):
+        self.sid = sid
+        # Names the session in reports; sids are never exposed
+        self.id = secrets.token_hex(6)
+        # Held by the client to reclaim the session after a reconnect
+        self.token = secrets.token_urlsafe(16)
+        self.detached_until = None  # reconnect deadline while disconnected
+        self.processor = processor
+        self.quality = quality  # QualityController, or None for fixed quality
+        self.lock = threading.RLock()
+        self.created_at = time.time()
+        self.last_seen = self.created_at
+
+        # Latest-frame-wins input and the worker draining it
+        self.mailbox = FrameMailbox()
+        self.processed = 0
+        self.errors = 0
+        self._worker = None
+        self._worker_lock = threading.Lock()
+        self.pipeline = None
+
+    def touch(self):
+        self.last_seen = time.time()
+
+    def ensure_worker(self, start_worker):
+        """Start the frame worker once via ``start_worker(session)``."""
+        with self._worker_lock:
+            if self._worker is None and not self.mailbox.closed:
+                self._worker = start_worker(self)
+
+    def frame_stats(self):
+        stats = self.mailbox.stats()
+        stats['processed'] = self.processed
+        stats['errors'] = self.errors
+        if self.pipeline is not None:
+            stats['queues'] = self.pipeline.queue_depths()
+        return stats
+
+    def close(self):
+        self.mailbox.close()
+        if self.pipeline is not None:
+            self.pipeline.close()
+        with self.lock:
+            try:
+                self.processor.cleanup()
+            except Exception as e:
+                logging.error(f"Error cleaning up session {self.sid}: {e}")
+
+
+class SessionManager:
+    """Hands out one HandGestureProcessor per Socket.IO sid.
+
+    At most ``max_sessions`` processors (and therefore MediaPipe ``Hands``
+    graphs) are alive at once. When the cap is reached the least recently
+    used session is evicted, and sessions idle for longer than
+    ``idle_timeout`` seconds are reclaimed on the next lookup.
+
+    With ``warm_spare`` one extra processor is built and warmed up in the
+    background, so a new presenter does not wait for MediaPipe to load.
+
+    A disconnected presenter's session is only ``detach``-ed: for
+    ``reconnect_grace`` seconds the client can ``resume`` it under its new
+    sid with the session's token, keeping the deck and annotations.
+    ``on_close(session)`` is called once a session is finally closed,
+    whether released, evicted or expired after a disconnect.
+    """
+
+    def __init__(self, max_sessions=8, idle_timeout=300, processor_factory=HandGestureProcessor,
+                 warm_spare=False, quality_factory=None, reconnect_grace=30, on_close=None):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.reconnect_grace = reconnect_grace
+        self.processor_factory = processor_factory
+        self.quality_factory = quality_factory
+        self.on_close = on_close
+        self.warm_spare = warm_spare
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+        self._spare = None
+        self._spare_pending = False
+        self.spare_ready = threading.Event()
+
+    def start_warm_up(self, report=False):
+        """Build and warm a spare processor on a background thread.
+
+        With ``report`` the steps are recorded in the startup report.
+        """
+        with self._lock:
+            if not self.warm_spare or self._spare is not None or self._spare_pending:
+                return
+            self._spare_pending = True
+            self.spare_ready.clear()
+        threading.Thread(target=self._prepare_spare, args=(report,), daemon=True,
+                         name='processor-warm-up').start()
+
+    def _prepare_spare(self, report):
+        step = startup_report.step if report else (lambda name: nullcontext())
+        processor = None
+        try:
+            with step('create processor'):
+                processor = self.processor_factory()
+            with step('warm up hands'):
+                processor.warm_up()
+        except Exception as e:
+            logging.error(f"Error warming up spare processor: {e}")
+            if processor is not None:
+                processor.cleanup()
+            processor = None
+        with self._lock:
+            self._spare = processor
+            self._spare_pending = False
+        self.spare_ready.set()
+
+    def get(self, sid, create=True):
+        """Return the session for ``sid``, creating it if needed."""
+        evicted = []
+        created = False
+        processor = None
+        with self._lock:
+            evicted.extend(self._pop_idle())
+            session = self._sessions.get(sid)
+            if session is not None:
+                self._sessions.move_to_end(sid)
+                session.touch()
+            elif create:
+                processor, self._spare = self._spare, None
+
+        if session is None and create:
+            if processor is None:
+                # Builds a MediaPipe graph; other presenters' lookups must
+                # not wait for it
+                processor = self.processor_factory()
+            quality = self.quality_factory() if self.quality_factory is not None else None
+            with self._lock:
+                session = self._sessions.get(sid)
+                if session is None:
+                    while len(self._sessions) >= self.max_sessions:
+                        _, lru = self._sessions.popitem(last=False)
+                        evicted.append(lru)
+                    session = PresenterSession(sid, processor, quality)
+                    self._sessions[sid] = session
+                    processor = None
+                    created = True
+                session.touch()
+            if processor is not None:  # another thread created it meanwhile
+                processor.cleanup()
+
+        for old in evicted:
+            logging.info(f"Evicting presenter session {old.sid}")
+            self._close(old)
+        if created:
+            self.start_warm_up()
+        return session
+
+    def detach(self, sid):
+        """Keep ``sid``'s session for ``reconnect_grace`` seconds after a disconnect."""
+        if not self.reconnect_grace:
+            return self.release(sid)
+        with self._lock:
+            session = self._sessions.get(sid)
+            if session is not None:
+                session.detached_until = time.time() + self.reconnect_grace
+        return session is not None
+
+    def resume(self, token, sid):
+        """Move the detached session holding ``token`` to the reconnected ``sid``.
+
+        Returns ``(session, old_sid)``, or ``(None, None)`` if there is no
+        such session or its grace period has passed.
+        """
+        if not isinstance(token, str):
+            return None, None
+        evicted = []
+        with self._lock:
+            evicted.extend(self._pop_idle())
+            session = next((s for s in self._sessions.values()
+                            if s.detached_until is not None and secrets.compare_digest(s.token, token)), None)
+            if session is not None:
+                old_sid = session.sid
+                del self._sessions[old_sid]
+                session.sid = sid
+                session.detached_until = None
+                session.touch()
+                self._sessions[sid] = session
+        for old in evicted:
+            logging.info(f"Evicting presenter session {old.sid}")
+            self._close(old)
+        return (session, old_sid) if session is not None else (None, None)
+
+    def release(self, sid):
+        with self._lock:
+            session = self._sessions.pop(sid, None)
+        if session is not None:
+            self._close(session)
+        return session is not None
+
+    def evict_idle(self):
+        with self._lock:
+            evicted = self._pop_idle()
+        for old in evicted:
+            logging.info(f"Evicting idle presenter session {old.sid}")
+            self._close(old)
+        return len(evicted)
+
+    def _close(self, session):
+        session.close()
+        if self.on_close is not None:
+            try:
+                self.on_close(session)
+            except Exception as e:
+                logging.error(f"Error in on_close for session {session.sid}: {e}")
+
+    def _pop_idle(self):
+        now = time.time()
+        cutoff = now - self.idle_timeout if self.idle_timeout else None
+        idle = [sid for sid, s in self._sessions.items()
+                if (cutoff is not None and s.last_seen < cutoff) or
+                (s.detached_until is not None and s.detached_until < now)]
+        return [self._sessions.pop(sid) for sid in idle]
+
+    def memory_report(self):
+        """Per-session memory use in bytes, keyed by the opaque session id."""
+        with self._lock:
+            sessions = list(self._sessions.values())
+        report = {}
+        for session in sessions:
+            with session.lock:
+                usage = session.processor.memory_usage()
+                inference = session.processor.inference_stats()
+            usage['idle_seconds'] = round(time.time() - session.last_seen, 1)
+            usage['frames'] = session.frame_stats()
+            usage['frames']['inference'] = inference
+            if session.quality is not None:
+                usage['quality'] = session.quality.to_dict()
+            report[session.id] = usage
+        return report
+
+    def raster_bytes(self):
+        """Slide raster memory held by all sessions."""
+        with self._lock:
+            sessions = list(self._sessions.values())
+        return sum(session.processor.slides.nbytes for session in sessions)
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def __contains__(self, sid):
+        return sid in self._sessions
+
+    def shutdown(self):
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+            spare, self._spare = self._spare, None
+            self.warm_spare = False
+        for session in sessions:
+            self._close(session)
+        if spare is not None:
+            spare.cleanup()
@@ -0,0 +1,224 @@
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from render_worker import render_in_worker, render_page
+
+
+class SlideDeck:
+    """Slides kept as PDF page references and rendered on first access.
+
+    Rendered rasters live in an LRU cache bounded by ``budget_bytes``.
+    Reading a slide schedules its neighbours for background rendering, so
+    stepping through the deck rarely waits on PyMuPDF. When a ``DeckCache``
+    and key are given, rasters are read from and written back to disk, and
+    the cache entry is pinned until ``close``.
+
+    With a ``render_pool`` (a process pool), ``render_all`` renders every
+    page in parallel, slide 1 first, and publishes each raster as soon as it
+    is ready; reading a slide that is still in flight waits for it instead
+    of rendering it twice.
+
+    Supports ``len(deck)`` and ``deck[i]`` so it can stand in for the list
+    of slide arrays the processor used to hold.
+    """
+
+    def __init__(self, pdf_path=None, width=1280, height=720,
+                 budget_bytes=128 * 1024 ** 2, deck_cache=None, cache_key=None,
+                 owns_pdf=False, render_pool=None):
+        self.pdf_path = pdf_path
+        self.width = width
+        self.height = height
+        self.budget_bytes = budget_bytes
+        self.render_pool = render_pool
+        self.deck_cache = deck_cache
+        self.cache_key = cache_key
+        self.owns_pdf = owns_pdf
+
+        self._document = None
+        if deck_cache is not None and cache_key is not None:
+            deck_cache.pin(cache_key)
+        if pdf_path:
+            try:
+                # PyMuPDF is only needed once a deck is loaded
+                import fitz
+                self._document = fitz.open(pdf_path)
+            except Exception:
+                self._unpin()
+                raise
+        self._page_count = len(self._document) if self._document is not None else 0
+        self._rasters = OrderedDict()
+        self._raster_bytes = 0
+        self._render_lock = threading.Lock()
+        self._cache_lock = threading.Lock()
+        self._pending = set()
+        self._futures = {}  # slide index -> render pool future
+        self.rendered = 0
+        self._prefetcher = None
+        self._closed = False
+
+    def __len__(self):
+        return self._page_count
+
+    def __getitem__(self, index):
+        if not 0 <= index < self._page_count:
+            raise IndexError(f"slide {index} out of range")
+        raster = self._get(index)
+        self.prefetch(index)
+        return raster
+
+    def prefetch(self, index):
+        """Render the slides either side of ``index`` in the background."""
+        if self._closed:
+            return
+        for neighbour in (index + 1, index - 1):
+            if not 0 <= neighbour < self._page_count:
+                continue
+            with self._cache_lock:
+                if neighbour in self._rasters or neighbour in self._pending:
+                    continue
+                self._pending.add(neighbour)
+            if self._prefetcher is None:
+                self._prefetcher = ThreadPoolExecutor(max_workers=1, thread_name_prefix="slide-prefetch")
+            self._prefetcher.submit(self._prefetch_one, neighbour)
+
+    def render_all(self, on_rendered=None):
+        """Render all pages on the render pool, in slide order.
+
+        ``on_rendered(index, rendered, total)`` is called from a pool
+        thread as each slide becomes available. Without a deck cache to
+        spill to, only as many pages as fit in the raster budget are
+        rendered ahead; the rest stay lazy.
+        """
+        if self.render_pool is None or self._closed or not self._page_count:
+            return
+        cached = self.deck_cache is not None and self.cache_key is not None
+        limit = self._page_count if cached else max(self.budget_bytes // (self.width * self.height * 3), 1)
+        for index in range(min(self._page_count, limit)):
+            if cached and self.deck_cache.has_page(self.cache_key, index):
+                self._published(index, on_rendered)
+                continue
+            with self._cache_lock:
+                if index in self._rasters or index in self._futures:
+                    continue
+                future = self.render_pool.submit(render_in_worker, self.pdf_path, index,
+                                                 self.width, self.height)
+                self._futures[index] = future
+            future.add_done_callback(lambda f, i=index: self._pool_done(i, f, on_rendered))
+
+    def _pool_done(self, index, future, on_rendered):
+        try:
+            if future.cancelled() or self._closed:
+                return
+            raster = future.result()
+            if self.deck_cache is not None and self.cache_key is not None:
+                self.deck_cache.store_page(self.cache_key, index, raster)
+            self._remember(index, raster)
+            self._published(index, on_rendered)
+        except Exception as e:
+            logging.error(f"Error rendering slide {index}: {e}")
+        finally:
+            with self._cache_lock:
+                self._futures.pop(index, None)
+
+    def _published(self, index, on_rendered):
+        with self._cache_lock:
+            self.rendered += 1
+            rendered = self.rendered
+        if on_rendered is not None:
+            on_rendered(index, rendered, self._page_count)
+
+    @property
+    def nbytes(self):
+        return self._raster_bytes
+
+    def cached_slides(self):
+        with self._cache_lock:
+            return list(self._rasters)
+
+    def close(self):
+        was_closed, self._closed = self._closed, True
+        with self._cache_lock:
+            futures = list(self._futures.values())
+        for future in futures:
+            future.cancel()
+        if self._prefetcher is not None:
+            self._prefetcher.shutdown(wait=True, cancel_futures=True)
+        with self._render_lock:
+            if self._document is not None:
+                self._document.close()
+                self._document = None
+        with self._cache_lock:
+            self._rasters.clear()
+            self._raster_bytes = 0
+        if self.owns_pdf and self.pdf_path and os.path.exists(self.pdf_path):
+            os.unlink(self.pdf_path)
+        if not was_closed:
+            # Queued renders are cancelled and prefetches have finished
+            self._unpin()
+
+    def _unpin(self):
+        if self.deck_cache is not None and self.cache_key is not None:
+            self.deck_cache.unpin(self.cache_key)
+
+    def _prefetch_one(self, index):
+        try:
+            if not self._closed:
+                self._get(index)
+        except Exception as e:
+            logging.error(f"Error prefetching slide {index}: {e}")
+        finally:
+            with self._cache_lock:
+                self._pending.discard(index)
+
+    def _get(self, index):
+        with self._cache_lock:
+            raster = self._rasters.get(index)
+            if raster is not None:
+                self._rasters.move_to_end(index)
+                return raster
+            future = self._futures.get(index)
+
+        if future is not None:
+            # Already being rendered by the pool; wait rather than duplicate
+            try:
+                raster = future.result()
+                self._remember(index, raster)
+                return raster
+            except Exception as e:
+                logging.error(f"Error rendering slide {index} in pool: {e}")
+
+        # PyMuPDF documents must not be used from two threads at once
+        with self._render_lock:
+            with self._cache_lock:
+                raster = self._rasters.get(index)
+            if raster is None:
+                raster = self._load(index)
+                self._remember(index, raster)
+        return raster
+
+    def _load(self, index):
+        if self.deck_cache is not None and self.cache_key is not None:
+            raster = self.deck_cache.load_page(self.cache_key, index)
+            if raster is not None:
+                return raster
+
+        if self._document is None:
+            raise IndexError(f"slide {index} unavailable, deck is closed")
+        raster = render_page(self._document, index, self.width, self.height)
+        if self.deck_cache is not None and self.cache_key is not None:
+            self.deck_cache.store_page(self.cache_key, index, raster)
+        return raster
+
+    def _remember(self, index, raster):
+        with self._cache_lock:
+            if index in self._rasters:
+                return
+            self._rasters[index] = raster
+            self._raster_bytes += raster.nbytes
+            # Always keep at least the slide that was just requested
+            while self._raster_bytes > self.budget_bytes and len(self._rasters) > 1:
+                _, evicted = self._rasters.popitem(last=False)
+                self._raster_bytes -= evicted.nbytes
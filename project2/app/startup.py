@@ -0,0 +1,44 @@
+import logging
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StartupReport:
+    """Wall-clock cost of each import and initialization step at startup.
+
+    Steps are recorded with ``step``; nested steps are timed on their own,
+    so an outer step's time includes its inner ones.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.steps = []  # (name, seconds, thread name)
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def step(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.steps.append((name, elapsed, threading.current_thread().name))
+
+    def to_dict(self):
+        with self._lock:
+            steps = list(self.steps)
+        return {
+            'uptime_seconds': round(time.perf_counter() - self.started, 3),
+            'steps': [{'name': name, 'seconds': round(seconds, 4), 'thread': thread}
+                      for name, seconds, thread in steps]
+        }
+
+    def log(self):
+        lines = [f"  {step['name']:<32}{step['seconds'] * 1000:9.1f} ms  ({step['thread']})"
+                 for step in self.to_dict()['steps']]
+        logging.info("Startup report:\n" + "\n".join(lines))
+
+
+startup_report = StartupReport()
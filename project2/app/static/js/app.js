@@ -10,16 +10,52 @@ document.addEventListener('DOMContentLoaded', function() {
     const video = document.getElementById('videoElement');
     const pdfInput = document.getElementById('pdfFile');
     const uploadSection = document.getElementById('uploadSection');
+    const uploadStatus = document.getElementById('uploadStatus');
+    const shareButton = document.getElementById('shareButton');
+    const shareStatus = document.getElementById('shareStatus');
     const currentSlideSpan = document.getElementById('currentSlide');
     const totalSlidesSpan = document.getElementById('totalSlides');
     
     let isStreaming = false;
     let lastFrameTime = 0;
-    const FRAME_INTERVAL = 1000 / 30; // 30 FPS limit
+    // 30 FPS limit; the server's 'quality' events lower it (and the
+    // capture size) while the round trip is too slow
+    let frameInterval = 1000 / 30;
+    let lastRtt = null;
+    // Send raw JPEG bytes instead of base64 data URLs when the browser can
+    const USE_BINARY_FRAMES = typeof HTMLCanvasElement.prototype.toBlob === 'function' &&
+        typeof window.createImageBitmap === 'function';
+    const JPEG_QUALITY = 0.85;
+    // Ask the server for 'unchanged' / changed-region patches instead of
+    // a full frame every time
+    const USE_DELTA_FRAMES = true;
+    // Credit-based flow control: at most MAX_FRAMES_IN_FLIGHT unacknowledged
+    // frames, so a slow server never builds up a backlog
+    const USE_FRAME_CREDITS = true;
+    const MAX_FRAMES_IN_FLIGHT = 2;
+    const CREDIT_TIMEOUT = 1000;
+    let lastSentSeq = 0;
+    let lastAckedSeq = 0;
+    let lastAckTime = 0;
     let frameProcessingActive = false;
+    // Reclaims this presenter's server session (deck, ink) after a reconnect
+    let sessionToken = null;
+    // Background conversion jobs: progress events may arrive before the
+    // upload request returns, so finished jobs are remembered by id
+    const conversionWaiters = new Map();
+    const finishedConversions = new Map();
     let displayCanvas = null;
     let processingCanvas = null;
-    let currentFrameImage = null;
+    // Client-side compositing: the server sends each slide once (cached by
+    // URL) and ink as vector segments, and this page draws the output
+    const USE_CLIENT_COMPOSITING = true;
+    const SLIDE_WIDTH = 1280;
+    const SLIDE_HEIGHT = 720;
+    let inkCanvas = null;
+    const slideImages = new Map();  // 'deckId:index' -> Promise<image>
+    let scene = null;
+    let sceneLayout = null;
+    let sceneToolbar = [];
 
     // Initialize canvases
     function initializeCanvases() {
@@ -34,7 +70,26 @@ document.addEventListener('DOMContentLoaded', function() {
         return true;
     }
 
-    // Add the missing updateDisplay function
+    // Frames and patches are decoded asynchronously but must be painted in
+    // the order they arrived, since patches build on the previous frame
+    let drawQueue = Promise.resolve();
+
+    function decodeImage(frame, mime) {
+        if (frame instanceof ArrayBuffer) {
+            return createImageBitmap(new Blob([frame], { type: mime || 'image/jpeg' }));
+        }
+        return new Promise((resolve, reject) => {
+            const img = new Image();
+            img.onload = () => resolve(img);
+            img.onerror = reject;
+            img.src = frame;
+        });
+    }
+
+    function releaseImage(image) {
+        if (image && typeof image.close === 'function') image.close();
+    }
+
     function updateDisplay(data) {
         if (!displayCanvas) return;
     
@@ -42,37 +97,255 @@ document.addEventListener('DOMContentLoaded', function() {
             currentSlideSpan.textContent = (data.currentSlide + 1).toString();
             totalSlidesSpan.textContent = data.totalSlides.toString();
         }
-    
-        if (data.frame) {
-            if (!currentFrameImage) {
-                currentFrameImage = new Image();
+
+        if (data.unchanged) return;
+
+        const decoded = data.patches
+            ? Promise.all(data.patches.map((patch) => decodeImage(patch.frame, data.mime)))
+            : decodeImage(data.frame, data.mime);
+
+        drawQueue = drawQueue.then(() => decoded).then((images) => {
+            const ctx = displayCanvas.getContext('2d', { alpha: false });
+            if (!ctx) return;
+
+            if (data.patches) {
+                data.patches.forEach((patch, i) => {
+                    ctx.drawImage(images[i], patch.x, patch.y, patch.w, patch.h);
+                    releaseImage(images[i]);
+                });
+                return;
             }
-    
-            currentFrameImage.onload = () => {
-                try {
-                    const ctx = displayCanvas.getContext('2d', { 
-                        alpha: false,
-                        imageSmoothingEnabled: false
-                    });
-                    
-                    if (!ctx) return;
-                    
-                    displayCanvas.width = currentFrameImage.width;
-                    displayCanvas.height = currentFrameImage.height;
-                    
-                    ctx.clearRect(0, 0, displayCanvas.width, displayCanvas.height);
-                    ctx.drawImage(currentFrameImage, 0, 0);
-                } catch (error) {
-                    console.error('Display update error:', error);
-                }
-            };
-    
-            currentFrameImage.onerror = (error) => {
-                console.error('Image loading error:', error);
-            };
-    
-            currentFrameImage.src = data.frame;
+
+            // Reduced-resolution frames are stretched back to full size so
+            // later patches line up
+            const width = Math.round(images.width / (data.scale || 1));
+            const height = Math.round(images.height / (data.scale || 1));
+            if (displayCanvas.width !== width || displayCanvas.height !== height) {
+                displayCanvas.width = width;
+                displayCanvas.height = height;
+            }
+            ctx.drawImage(images, 0, 0, width, height);
+            releaseImage(images);
+        }).catch((error) => {
+            console.error('Display update error:', error);
+        });
+    }
+
+    function rgb(color, scale = 1) {
+        return `rgb(${color.map((c) => Math.floor(c * scale)).join(',')})`;
+    }
+
+    function slideImage(deckId, index) {
+        const key = `${deckId}:${index}`;
+        let image = slideImages.get(key);
+        if (!image) {
+            image = fetch(`http://localhost:5000/slides/${socket.id}/${deckId}/${index}`)
+                .then((response) => {
+                    if (!response.ok) throw new Error(`Slide ${index} unavailable`);
+                    return response.blob();
+                })
+                .then((blob) => createImageBitmap(blob));
+            image.catch(() => slideImages.delete(key));
+            slideImages.set(key, image);
+        }
+        return image;
+    }
+
+    function dropOtherDecks(deckId) {
+        for (const key of slideImages.keys()) {
+            if (!key.startsWith(`${deckId}:`)) slideImages.delete(key);
+        }
+    }
+
+    // Mirrors the server brushes in gesture_processor.py
+    function applyInk(ctx, event) {
+        if (event.tool === 'clear') {
+            ctx.clearRect(0, 0, SLIDE_WIDTH, SLIDE_HEIGHT);
+            return;
+        }
+        const [x0, y0] = event.from;
+        const [x1, y1] = event.to;
+        const line = (color, width) => {
+            ctx.strokeStyle = color;
+            ctx.lineWidth = width;
+            ctx.lineCap = 'round';
+            ctx.beginPath();
+            ctx.moveTo(x0, y0);
+            ctx.lineTo(x1, y1);
+            ctx.stroke();
+        };
+        if (event.tool === 'eraser') {
+            ctx.globalCompositeOperation = 'destination-out';
+            ctx.beginPath();
+            ctx.arc(x1, y1, event.width * 3, 0, 2 * Math.PI);
+            ctx.fill();
+            ctx.globalCompositeOperation = 'source-over';
+        } else if (event.dots) {
+            ctx.fillStyle = rgb(event.color);
+            for (const [x, y] of event.dots) {
+                ctx.beginPath();
+                ctx.arc(x, y, 1, 0, 2 * Math.PI);
+                ctx.fill();
+            }
+        } else if (event.poly) {
+            ctx.fillStyle = rgb(event.color);
+            ctx.beginPath();
+            event.poly.forEach(([x, y], i) => (i ? ctx.lineTo(x, y) : ctx.moveTo(x, y)));
+            ctx.closePath();
+            ctx.fill();
+        } else if (event.style === 'neon') {
+            const w = event.width;
+            for (let glow = 2 * w; glow > w; glow--) {
+                line(rgb(event.color, (glow - w) / (2 * w)), glow);
+            }
+            line(rgb(event.color), w);
+        } else {
+            line(rgb(event.color), event.width);
+        }
+    }
+
+    function decodeInkTiles(tiles) {
+        return Promise.all(tiles.map((tile) => decodeImage(tile.png, 'image/png')));
+    }
+
+    // Called in drawQueue order, so ink from earlier updates that were
+    // still waiting on a slide never lands on top of the reset layer
+    function resetInk(ctx, tiles, images) {
+        ctx.clearRect(0, 0, SLIDE_WIDTH, SLIDE_HEIGHT);
+        images.forEach((image, i) => {
+            ctx.drawImage(image, tiles[i].x, tiles[i].y);
+            releaseImage(image);
+        });
+    }
+
+    function drawToolbar(ctx) {
+        if (!sceneLayout) return;
+        const [x0, y0, x1, y1] = sceneLayout.panel;
+        ctx.fillStyle = 'rgb(50,50,50)';
+        ctx.fillRect(x0, y0, x1 - x0, y1 - y0);
+        ctx.font = '13px sans-serif';
+        for (const element of sceneLayout.elements) {
+            const active = sceneToolbar.includes(element.name);
+            ctx.fillStyle = rgb(active ? sceneLayout.activeColor : element.color);
+            ctx.fillRect(element.x, element.y, element.width, element.height);
+            if (element.label) {
+                ctx.fillStyle = 'white';
+                ctx.fillText(element.label, element.x + 5, element.y + 20);
+            }
+        }
+    }
+
+    function updateScene(data) {
+        if (data.currentSlide !== undefined && data.totalSlides !== undefined) {
+            currentSlideSpan.textContent = (data.currentSlide + 1).toString();
+            totalSlidesSpan.textContent = data.totalSlides.toString();
+        }
+        if (!inkCanvas) {
+            inkCanvas = document.createElement('canvas');
+            inkCanvas.width = SLIDE_WIDTH;
+            inkCanvas.height = SLIDE_HEIGHT;
+        }
+        if (data.layout) sceneLayout = data.layout;
+        if (data.toolbar) sceneToolbar = data.toolbar;
+        if (!scene || scene.deckId !== data.deckId) dropOtherDecks(data.deckId);
+        scene = data;
+
+        const slide = data.whiteboard ? null : slideImage(data.deckId, data.currentSlide);
+        if (!data.whiteboard && data.currentSlide + 1 < data.totalSlides) {
+            slideImage(data.deckId, data.currentSlide + 1);  // prefetch
+        }
+        // Decoding starts now; drawing waits for its turn in drawQueue
+        const inkTiles = data.inkReset ? decodeInkTiles(data.inkReset) : null;
+
+        drawQueue = drawQueue.then(() => inkTiles).then((images) => {
+            const inkCtx = inkCanvas.getContext('2d');
+            if (images) resetInk(inkCtx, data.inkReset, images);
+            if (data.ink) {
+                data.ink.forEach((event) => applyInk(inkCtx, event));
+            }
+            return slide;
+        }).then((slideImg) => {
+            if (displayCanvas.width !== SLIDE_WIDTH || displayCanvas.height !== SLIDE_HEIGHT) {
+                displayCanvas.width = SLIDE_WIDTH;
+                displayCanvas.height = SLIDE_HEIGHT;
+            }
+            const ctx = displayCanvas.getContext('2d', { alpha: false });
+            if (slideImg) {
+                ctx.drawImage(slideImg, 0, 0, SLIDE_WIDTH, SLIDE_HEIGHT);
+            } else {
+                ctx.fillStyle = 'white';
+                ctx.fillRect(0, 0, SLIDE_WIDTH, SLIDE_HEIGHT);
+            }
+            ctx.drawImage(inkCanvas, 0, 0);
+            if (data.pointer && sceneLayout) {
+                ctx.fillStyle = rgb(sceneLayout.pointerColor);
+                ctx.beginPath();
+                ctx.arc(data.pointer[0], data.pointer[1], 5, 0, 2 * Math.PI);
+                ctx.fill();
+            }
+            drawToolbar(ctx);
+            if (data.fps !== null && data.fps !== undefined) {
+                const mode = data.whiteboard ? 'Whiteboard' : `Slide ${data.currentSlide + 1}/${data.totalSlides}`;
+                ctx.font = 'bold 20px sans-serif';
+                ctx.fillStyle = 'white';
+                ctx.fillText(`${mode} - FPS: ${data.fps}`, 10, SLIDE_HEIGHT - 20);
+            }
+        }).catch((error) => {
+            console.error('Scene update error:', error);
+        });
+    }
+
+    function hasFrameCredit(now) {
+        if (!USE_FRAME_CREDITS) return true;
+        if (lastSentSeq - lastAckedSeq < MAX_FRAMES_IN_FLIGHT) return true;
+        // Never stall forever if acknowledgements were lost
+        if (now - lastAckTime > CREDIT_TIMEOUT) {
+            lastAckedSeq = lastSentSeq;
+            return true;
+        }
+        return false;
+    }
+
+    function acknowledgeFrame(data) {
+        if (data && typeof data.seq === 'number' && data.seq > lastAckedSeq) {
+            lastAckedSeq = data.seq;
+        }
+        lastAckTime = Date.now();
+        // Reported with the next frame for the server's quality controller
+        if (data && typeof data.ts === 'number') {
+            lastRtt = lastAckTime - data.ts;
+        }
+    }
+
+    function sendFrame(now) {
+        const seq = ++lastSentSeq;
+        if (lastAckTime === 0) lastAckTime = now;
+
+        if (!USE_BINARY_FRAMES) {
+            socket.emit('process_frame', {
+                frame: processingCanvas.toDataURL('image/jpeg', JPEG_QUALITY),
+                ts: now,
+                seq: seq,
+                rtt: lastRtt,
+                delta: USE_DELTA_FRAMES
+            });
+            return;
         }
+
+        processingCanvas.toBlob((blob) => {
+            if (!blob || !socket.connected) return;
+            blob.arrayBuffer().then((buffer) => {
+                socket.emit('process_frame', {
+                    frame: buffer,
+                    ts: now,
+                    seq: seq,
+                    rtt: lastRtt,
+                    delta: USE_DELTA_FRAMES,
+                    width: processingCanvas.width,
+                    height: processingCanvas.height
+                });
+            });
+        }, 'image/jpeg', JPEG_QUALITY);
     }
 
     // Socket connection handlers
@@ -83,20 +356,91 @@ document.addEventListener('DOMContentLoaded', function() {
 
     socket.on('connect', () => {
         console.log('Connected to server');
+        if (sessionToken) {
+            socket.emit('resume_session', { token: sessionToken });
+        }
     })
 
+    socket.on('session_token', (data) => {
+        // Lets this client resume_session after a reconnect
+        sessionToken = data.token;
+    });
+
+    socket.on('session_resumed', () => {
+        console.log('Presentation session resumed');
+        lastSentSeq = lastAckedSeq = 0;
+        lastAckTime = 0;
+        if (isStreaming) startWebcam();
+    });
+
+    socket.on('session_expired', () => {
+        // The server no longer has this presentation; start over
+        sessionToken = null;
+        frameProcessingActive = false;
+        releaseFrameResources();
+        uploadSection.style.display = '';
+        shareButton.hidden = true;
+        uploadStatus.textContent = 'Session expired, please upload the presentation again';
+        pdfInput.value = '';
+    });
+
     socket.on('disconnect', () => {
         console.log('Disconnected from server');
         frameProcessingActive = false;
         releaseFrameResources();
     });
 
+    socket.on('frame_ack', acknowledgeFrame);
+
+    socket.on('render_mode', (data) => {
+        console.log(`Render mode: ${data.mode}`);
+    });
+
+    socket.on('quality', (settings) => {
+        frameInterval = settings.frameInterval;
+        if (processingCanvas) {
+            processingCanvas.width = settings.captureWidth;
+            processingCanvas.height = settings.captureHeight;
+        }
+    });
+
+    socket.on('conversion_progress', (job) => {
+        uploadStatus.textContent = job.state === 'failed' ?
+            `Conversion failed: ${job.error}` :
+            `${job.state} (${Math.round(job.progress * 100)}%)`;
+        if (job.state !== 'done' && job.state !== 'failed') return;
+        const waiter = conversionWaiters.get(job.job_id);
+        if (waiter) {
+            conversionWaiters.delete(job.job_id);
+            waiter(job);
+        } else {
+            finishedConversions.set(job.job_id, job);
+        }
+    });
+
+    function waitForConversion(jobId) {
+        return new Promise((resolve) => {
+            const finished = finishedConversions.get(jobId);
+            if (finished) {
+                finishedConversions.delete(jobId);
+                resolve(finished);
+            } else {
+                conversionWaiters.set(jobId, resolve);
+            }
+        });
+    }
+
     socket.on('processed_frame', (data) => {
-        if (!data || !data.frame) {
+        acknowledgeFrame(data);
+        if (!data || !(data.frame || data.patches || data.unchanged || data.vector)) {
             console.error('Invalid frame data received');
             return;
         }
-        updateDisplay(data);
+        if (data.vector) {
+            updateScene(data);
+        } else {
+            updateDisplay(data);
+        }
     });
 
     // PDF upload handler with improved error handling
@@ -104,13 +448,14 @@ document.addEventListener('DOMContentLoaded', function() {
         const file = e.target.files[0];
         if (!file) return;
         
-        if (!file.type.includes('powerpoint') && !file.name.toLowerCase().endsWith('.pptx')) {
-            alert('Please select a PowerPoint (PPTX) file');
+        if (!/\.(pptx|pdf|zip)$/i.test(file.name)) {
+            alert('Please select a PowerPoint (PPTX), PDF or zip of slide images');
             return;
         }
 
         const formData = new FormData();
         formData.append('file', file);
+        formData.append('sid', socket.id);
 
         try {
             const response = await fetch('http://localhost:5000/upload-ppt', {
@@ -120,13 +465,22 @@ document.addEventListener('DOMContentLoaded', function() {
             
             const data = await response.json();
             console.log(data)
-            if (response.ok) {
-                console.log('PDF uploaded successfully');
+            if (!response.ok) {
+                throw new Error(data.error || 'Upload failed');
+            }
+            uploadStatus.textContent = 'queued';
+            const job = await waitForConversion(data.job_id);
+            if (job.state === 'done') {
+                console.log('Presentation converted successfully');
                 uploadSection.style.display = 'none';
+                shareButton.hidden = false;
                 initializeCanvases();
+                if (USE_CLIENT_COMPOSITING) {
+                    socket.emit('render_mode', { mode: 'client' });
+                }
                 await startWebcam();
             } else {
-                throw new Error(data.error || 'Upload failed');
+                throw new Error(job.error || 'Conversion failed');
             }
         } catch (error) {
             console.error('Upload error:', error);
@@ -137,7 +491,14 @@ document.addEventListener('DOMContentLoaded', function() {
 
     // Improved webcam handlers
     async function startWebcam() {
-    if (isStreaming) return;
+    if (isStreaming) {
+        // Already capturing, e.g. after a resumed or re-uploaded session
+        if (!frameProcessingActive) {
+            frameProcessingActive = true;
+            startFrameProcessing();
+        }
+        return;
+    }
     
     try {
         // First check if mediaDevices API is available
@@ -181,14 +542,13 @@ document.addEventListener('DOMContentLoaded', function() {
             }
         
             const now = Date.now();
-            if (now - lastFrameTime >= FRAME_INTERVAL) {
+            if (now - lastFrameTime >= frameInterval && hasFrameCredit(now)) {
                 try {
                     if (!processingCanvas || !ctx) return;
                     ctx.drawImage(video, 0, 0, processingCanvas.width, processingCanvas.height);
-                    const frameData = processingCanvas.toDataURL('image/jpeg', 0.85);
                     
                     if (socket && socket.connected) {
-                        socket.emit('process_frame', frameData);
+                        sendFrame(now);
                         lastFrameTime = now;
                     }
                 } catch (error) {
@@ -218,11 +578,8 @@ document.addEventListener('DOMContentLoaded', function() {
             ctx.clearRect(0, 0, displayCanvas.width, displayCanvas.height);
         }
         
-        // Clear current frame image
-        if (currentFrameImage) {
-            currentFrameImage.src = '';
-            currentFrameImage = null;
-        }
+        // Drop any frames still waiting to be painted
+        drawQueue = Promise.resolve();
     }
 
     // Cleanup function
@@ -250,6 +607,28 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     }
 
+    // Audience viewers watch the same output through a shareable link
+    shareButton.addEventListener('click', () => socket.emit('share_presentation'));
+
+    socket.on('presentation_shared', (data) => {
+        const url = new URL(data.viewer_url, 'http://localhost:5000').href;
+        shareStatus.textContent = `Viewer link: ${url}`;
+    });
+
+    // Ctrl+Z / Ctrl+Y (or Ctrl+Shift+Z) undo and redo annotations
+    document.addEventListener('keydown', (e) => {
+        if (!(e.ctrlKey || e.metaKey) || !socket.connected) return;
+        const key = e.key.toLowerCase();
+        if (key === 'z' && !e.shiftKey) {
+            socket.emit('undo');
+        } else if (key === 'y' || (key === 'z' && e.shiftKey)) {
+            socket.emit('redo');
+        } else {
+            return;
+        }
+        e.preventDefault();
+    });
+
     // Add cleanup on page unload
     window.addEventListener('beforeunload', cleanup);
     window.onerror = function(msg, url, lineNo, columnNo, error) {
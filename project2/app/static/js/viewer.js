@@ -0,0 +1,61 @@
+document.addEventListener('DOMContentLoaded', function() {
+    // Viewers connect to whichever host served the page
+    const socket = io({
+        transports: ['websocket'],
+        reconnectionAttempts: 5,
+        reconnectionDelay: 1000
+    });
+
+    const presentationId = document.getElementById('viewer').dataset.presentationId;
+    const displayCanvas = document.getElementById('displayCanvas');
+    const viewerStatus = document.getElementById('viewerStatus');
+    const currentSlideSpan = document.getElementById('currentSlide');
+    const totalSlidesSpan = document.getElementById('totalSlides');
+
+    // Every viewer frame is a full image. The server sends the next one only
+    // after 'viewer_ack', so a slow connection skips frames instead of
+    // queueing them.
+    let drawQueue = Promise.resolve();
+
+    function decodeImage(frame, mime) {
+        return createImageBitmap(new Blob([frame], { type: mime || 'image/jpeg' }));
+    }
+
+    socket.on('connect', () => {
+        socket.emit('join_presentation', { presentation_id: presentationId });
+    });
+
+    socket.on('viewer_joined', () => {
+        viewerStatus.textContent = 'Waiting for the presenter...';
+    });
+
+    socket.on('viewer_frame', (data) => {
+        currentSlideSpan.textContent = (data.currentSlide + 1).toString();
+        totalSlidesSpan.textContent = data.totalSlides.toString();
+        drawQueue = drawQueue.then(() => decodeImage(data.frame, data.mime)).then((image) => {
+            if (displayCanvas.width !== image.width || displayCanvas.height !== image.height) {
+                displayCanvas.width = image.width;
+                displayCanvas.height = image.height;
+            }
+            displayCanvas.getContext('2d', { alpha: false }).drawImage(image, 0, 0);
+            image.close();
+            viewerStatus.textContent = '';
+        }).catch((error) => {
+            console.error('Viewer frame error:', error);
+        }).finally(() => {
+            socket.emit('viewer_ack');
+        });
+    });
+
+    socket.on('presentation_ended', () => {
+        viewerStatus.textContent = 'The presentation has ended.';
+    });
+
+    socket.on('error', (data) => {
+        viewerStatus.textContent = data && data.message ? data.message : 'Connection error';
+    });
+
+    socket.on('disconnect', () => {
+        viewerStatus.textContent = 'Disconnected';
+    });
+});
@@ -0,0 +1,159 @@
+from collections import namedtuple
+from contextlib import contextmanager
+
+import numpy as np
+
+# One undoable edit of an annotation layer. ``points`` is a packed (N, 2)
+# int16 array of canvas coordinates; ``seed`` makes randomized brushes
+# (spray) repaint identically. A ``clear`` record has no points.
+Stroke = namedtuple('Stroke', ['tool', 'style', 'color', 'thickness', 'points', 'seed'])
+
+STROKE_OVERHEAD = 128  # rough per-record cost of the tuple and its fields
+
+
+def pack_points(points):
+    return np.array(points, dtype=np.int16).reshape(-1, 2)
+
+
+def clear_record():
+    return Stroke('clear', None, None, 0, pack_points([]), 0)
+
+
+def _stroke_bytes(stroke):
+    return stroke.points.nbytes + STROKE_OVERHEAD
+
+
+class StrokeJournal:
+    """Append-only undo/redo history for one ``TiledCanvas``.
+
+    Strokes are painted onto the canvas as they happen and then appended
+    here. Every ``checkpoint_strokes`` strokes, or sooner once
+    ``checkpoint_points`` points have been drawn, the canvas is snapshotted;
+    undo restores the nearest snapshot at or before the target and replays
+    only the strokes after it through ``render(stroke, canvas)``, so each
+    undo costs at most one checkpoint interval of repainting.
+
+    Strokes and snapshot tiles no longer shared with the canvas count
+    against ``max_bytes``; beyond it the oldest history is folded into the
+    base snapshot and can no longer be undone.
+    """
+
+    def __init__(self, canvas, render, max_bytes=4 * 1024 ** 2,
+                 checkpoint_strokes=16, checkpoint_points=512):
+        self.canvas = canvas
+        self.render = render
+        self.max_bytes = max_bytes
+        self.checkpoint_strokes = checkpoint_strokes
+        self.checkpoint_points = checkpoint_points
+        self._strokes = []
+        self._cursor = 0  # strokes[:cursor] are applied, the rest can be redone
+        self._checkpoints = {0: canvas.snapshot()}  # stroke index -> snapshot
+        self._stroke_bytes = 0
+
+    @property
+    def can_undo(self):
+        return self._cursor > 0
+
+    @property
+    def can_redo(self):
+        return self._cursor < len(self._strokes)
+
+    def __len__(self):
+        return len(self._strokes)
+
+    def append(self, stroke):
+        """Record a stroke that has already been painted onto the canvas."""
+        if self.can_redo:
+            # A new stroke forks the history; the redo branch is dropped
+            for dropped in self._strokes[self._cursor:]:
+                self._stroke_bytes -= _stroke_bytes(dropped)
+            del self._strokes[self._cursor:]
+            for index in [i for i in self._checkpoints if i > self._cursor]:
+                del self._checkpoints[index]
+        self._strokes.append(stroke)
+        self._stroke_bytes += _stroke_bytes(stroke)
+        self._cursor += 1
+        self._maybe_checkpoint()
+        self._trim()
+
+    def undo(self):
+        """Step back one stroke.
+
+        If replaying fails the canvas and cursor are left as they were and
+        the error propagates.
+        """
+        if not self.can_undo:
+            return False
+        target = self._cursor - 1
+        base = max(i for i in self._checkpoints if i <= target)
+        with self._rollback_on_error():
+            self.canvas.restore(self._checkpoints[base])
+            for stroke in self._strokes[base:target]:
+                self.render(stroke, self.canvas)
+        self._cursor = target
+        return True
+
+    def redo(self):
+        if not self.can_redo:
+            return False
+        with self._rollback_on_error():
+            self.render(self._strokes[self._cursor], self.canvas)
+        self._cursor += 1
+        self._maybe_checkpoint()
+        return True
+
+    @contextmanager
+    def _rollback_on_error(self):
+        before = self.canvas.snapshot()
+        try:
+            yield
+        except Exception:
+            self.canvas.restore(before)
+            raise
+
+    def _maybe_checkpoint(self):
+        if self._cursor in self._checkpoints:
+            return
+        base = max(i for i in self._checkpoints if i <= self._cursor)
+        since = self._strokes[base:self._cursor]
+        if (len(since) >= self.checkpoint_strokes or
+                sum(len(stroke.points) for stroke in since) >= self.checkpoint_points):
+            self._checkpoints[self._cursor] = self.canvas.snapshot()
+
+    @property
+    def nbytes(self):
+        """Memory held by the history beyond the canvas itself."""
+        seen = {id(tile) for tile, _ in self.canvas.snapshot().values()}
+        total = self._stroke_bytes
+        for snapshot in self._checkpoints.values():
+            for tile, mask in snapshot.values():
+                if id(tile) not in seen:
+                    seen.add(id(tile))
+                    total += tile.nbytes + mask.nbytes
+        return total
+
+    def _trim(self):
+        while self.nbytes > self.max_bytes:
+            if self._cursor > 0:
+                # Fold the oldest undoable strokes into the base snapshot
+                undoable = [i for i in self._checkpoints if 0 < i <= self._cursor]
+                if undoable:
+                    index = min(undoable)
+                else:
+                    index = self._cursor
+                    self._checkpoints[index] = self.canvas.snapshot()
+                self._rebase(index)
+            elif self.can_redo:
+                # Then the far end of the redo branch
+                self._checkpoints.pop(len(self._strokes), None)
+                self._stroke_bytes -= _stroke_bytes(self._strokes.pop())
+            else:
+                break
+
+    def _rebase(self, index):
+        for dropped in self._strokes[:index]:
+            self._stroke_bytes -= _stroke_bytes(dropped)
+        del self._strokes[:index]
+        self._checkpoints = {i - index: snapshot for i, snapshot in self._checkpoints.items()
+                             if i >= index}
+        self._cursor -= index
@@ -0,0 +1,168 @@
+from contextlib import contextmanager
+
+import cv2
+import numpy as np
+
+
+class TiledCanvas:
+    """Sparse annotation layer made of fixed-size tiles.
+
+    Only tiles that contain ink are allocated, and tiles on the right and
+    bottom edges are cropped to the canvas. Each stored tile keeps its ink
+    mask bit-packed (one bit per pixel, 1/24 of the tile's pixel data), so
+    compositing, clearing and emptiness checks cost time proportional to
+    the inked area rather than the full frame. The layer is smaller than a
+    dense ``height x width`` array until inked tiles cover about 96% of the
+    canvas, and at most 1/24 larger beyond that (see
+    benchmarks/bench_annotations.py).
+
+    Drawing goes through ``region``, which hands out a small dense patch
+    covering the requested rectangle and writes it back tile by tile::
+
+        with canvas.region(x0, y0, x1, y1) as (patch, ox, oy):
+            if patch is not None:
+                cv2.line(patch, (ax - ox, ay - oy), (bx - ox, by - oy), color, 3)
+    """
+
+    def __init__(self, height, width, channels=3, tile_size=64):
+        self.height = height
+        self.width = width
+        self.channels = channels
+        self.tile_size = tile_size
+        self.rows = -(-height // tile_size)
+        self.cols = -(-width // tile_size)
+        self._tiles = {}  # (row, col) -> (tile, np.packbits(mask, axis=1))
+        self._dirty = []
+
+    def is_empty(self):
+        return not self._tiles
+
+    def clear(self):
+        for (row, col) in self._tiles:
+            self._mark_dirty(row, col, row + 1, col + 1)
+        self._tiles.clear()
+
+    def snapshot(self):
+        """Cheap copy of the layer's current contents, for ``restore``.
+
+        Stored tiles are replaced rather than written in place, so the
+        snapshot shares tile arrays with the canvas and costs memory only
+        for tiles changed afterwards.
+        """
+        return dict(self._tiles)
+
+    def restore(self, snapshot):
+        """Return the layer to the contents captured by ``snapshot``."""
+        for key in self._tiles.keys() | snapshot.keys():
+            if self._tiles.get(key) is not snapshot.get(key):
+                row, col = key
+                self._mark_dirty(row, col, row + 1, col + 1)
+        self._tiles = dict(snapshot)
+
+    def take_dirty(self):
+        """Return and reset the rectangles changed since the last call."""
+        dirty, self._dirty = self._dirty, []
+        return dirty
+
+    def _mark_dirty(self, r0, c0, r1, c1):
+        ts = self.tile_size
+        if len(self._dirty) >= 64:
+            # Nobody is draining; collapse to one rectangle covering the canvas
+            self._dirty = [(0, 0, self.width, self.height)]
+            return
+        self._dirty.append((c0 * ts, r0 * ts, min(c1 * ts, self.width), min(r1 * ts, self.height)))
+
+    @property
+    def tile_count(self):
+        return len(self._tiles)
+
+    @property
+    def nbytes(self):
+        return sum(tile.nbytes + mask.nbytes for tile, mask in self._tiles.values())
+
+    def tiles(self):
+        """Iterate ``(x, y, tile, mask)`` for every allocated tile.
+
+        ``mask`` is unpacked to one 0/1 byte per pixel.
+        """
+        ts = self.tile_size
+        for (row, col), (tile, packed) in self._tiles.items():
+            yield col * ts, row * ts, tile, _unpack(packed, tile)
+
+    @contextmanager
+    def region(self, x0, y0, x1, y1):
+        """Yield ``(patch, ox, oy)`` for editing the rectangle ``[x0, x1) x [y0, y1)``.
+
+        The patch is aligned to the tile grid, so it may be a little larger
+        than requested; ``(ox, oy)`` is its top-left corner in canvas
+        coordinates. Changes are written back when the block exits. A
+        rectangle entirely outside the canvas yields a ``None`` patch, which
+        OpenCV must not be given.
+        """
+        ts = self.tile_size
+        r0 = max(int(y0) // ts, 0)
+        c0 = max(int(x0) // ts, 0)
+        r1 = min(-(-int(y1) // ts), self.rows)
+        c1 = min(-(-int(x1) // ts), self.cols)
+        if r0 >= r1 or c0 >= c1:
+            yield None, c0 * ts, r0 * ts
+            return
+
+        patch = np.zeros(((r1 - r0) * ts, (c1 - c0) * ts, self.channels), dtype=np.uint8)
+        for row in range(r0, r1):
+            for col in range(c0, c1):
+                stored = self._tiles.get((row, col))
+                if stored is not None:
+                    tile = stored[0]
+                    py, px = (row - r0) * ts, (col - c0) * ts
+                    patch[py:py + tile.shape[0], px:px + tile.shape[1]] = tile
+
+        yield patch, c0 * ts, r0 * ts
+
+        self._mark_dirty(r0, c0, r1, c1)
+        for row in range(r0, r1):
+            for col in range(c0, c1):
+                py, px = (row - r0) * ts, (col - c0) * ts
+                # Ink past the canvas edge is never shown; don't store it
+                tile = patch[py:py + min(ts, self.height - row * ts),
+                             px:px + min(ts, self.width - col * ts)]
+                mask = tile.any(axis=2)
+                if mask.any():
+                    self._tiles[(row, col)] = (tile.copy(), np.packbits(mask, axis=1))
+                else:
+                    self._tiles.pop((row, col), None)
+
+    def composite(self, display, rect=None):
+        """Copy inked pixels onto ``display`` in place.
+
+        With ``rect`` (tile-aligned, as returned by ``take_dirty``) only the
+        tiles inside it are copied.
+        """
+        ts = self.tile_size
+        height, width = display.shape[:2]
+        if rect is None:
+            items = self._tiles.items()
+        else:
+            x0, y0, x1, y1 = rect
+            items = [((row, col), self._tiles[(row, col)])
+                     for row in range(y0 // ts, -(-y1 // ts))
+                     for col in range(x0 // ts, -(-x1 // ts))
+                     if (row, col) in self._tiles]
+        for (row, col), (tile, packed) in items:
+            y, x = row * ts, col * ts
+            h, w = min(tile.shape[0], height - y), min(tile.shape[1], width - x)
+            if h <= 0 or w <= 0:
+                continue
+            # cv2.copyTo writes through the view and is much faster than
+            # boolean indexing for small tiles
+            cv2.copyTo(tile[:h, :w], _unpack(packed, tile)[:h, :w], display[y:y + h, x:x + w])
+        return display
+
+    def to_array(self):
+        """Dense ``height x width`` copy of the layer."""
+        dense = np.zeros((self.height, self.width, self.channels), dtype=np.uint8)
+        return self.composite(dense)
+
+
+def _unpack(packed, tile):
+    return np.unpackbits(packed, axis=1, count=tile.shape[1])
@@ -0,0 +1,101 @@
+"""Helpers for the two ``process_frame`` wire formats.
+
+Text clients emit a ``data:image/jpeg;base64,...`` string. Binary clients emit
+a small header object whose ``frame`` field is the raw JPEG as a Socket.IO
+binary attachment::
+
+    {'frame': <bytes>, 'ts': 1712345678901, 'width': 800, 'height': 600}
+
+The correlation fields ``ts`` and ``seq`` are echoed back on
+``processed_frame`` so the client can match results to the frames it sent.
+A header with ``delta: true`` asks for ``unchanged``/``patches`` results
+instead of a full frame every time, and ``rtt`` reports the client's last
+measured round trip in milliseconds for the quality controller.
+
+Clients that track hands themselves emit ``process_landmarks`` instead,
+with the 21 normalized MediaPipe hand landmarks of one hand::
+
+    {'landmarks': <bytes>, 'handedness': 'Right', 'mirrored': false, 'ts': ...}
+
+``landmarks`` is 21 ``(x, y)`` or ``(x, y, z)`` points, either packed
+little-endian float32 (a ``Float32Array``'s buffer) or a flat or nested
+list; null or empty when no hand is visible. Points are in camera image
+coordinates, which the server mirrors as it mirrors camera frames, unless
+``mirrored`` says the client already did. The other header fields mean the
+same as for ``process_frame``, plus ``binary: false`` for ``data:`` URL
+results instead of bytes.
+"""
+import numpy as np
+
+ECHOED_HEADER_FIELDS = ('ts', 'seq')
+LANDMARK_COUNT = 21
+HANDEDNESS = ('Left', 'Right')
+
+
+def unpack_frame_message(message):
+    """Split an incoming message into ``(payload, header)``.
+
+    ``payload`` is a ``str`` for the text transport and ``bytes`` for the
+    binary one. Returns ``(None, {})`` for malformed messages.
+    """
+    if isinstance(message, str):
+        return message, {}
+    if isinstance(message, (bytes, bytearray, memoryview)):
+        return bytes(message), {}
+    if isinstance(message, dict):
+        payload = message.get('frame')
+        if isinstance(payload, (bytes, bytearray, memoryview)):
+            payload = bytes(payload)
+        elif not isinstance(payload, str):
+            return None, {}
+        header = {k: v for k, v in message.items() if k != 'frame'}
+        return payload, header
+    return None, {}
+
+
+def echo_header(result, header):
+    """Copy the client's correlation fields onto an outgoing result."""
+    for field in ECHOED_HEADER_FIELDS:
+        if field in header:
+            result[field] = header[field]
+    return result
+
+
+def unpack_landmarks_message(message):
+    """Split a ``process_landmarks`` message into ``(points, header)``.
+
+    ``points`` is a ``(21, 3)`` float32 array in the server's mirrored
+    view, or an empty ``(0, 3)`` array when no hand is visible. The
+    header's ``handedness`` is corrected for the mirroring too. Returns
+    ``(None, {})`` for malformed messages.
+    """
+    if not isinstance(message, dict):
+        return None, {}
+    payload = message.get('landmarks')
+    try:
+        if isinstance(payload, (bytes, bytearray, memoryview)):
+            values = np.frombuffer(payload, dtype='<f4')
+        elif payload is None or isinstance(payload, (list, tuple)):
+            values = np.asarray(payload if payload is not None else [], dtype=np.float32).ravel()
+        else:
+            return None, {}
+    except (TypeError, ValueError):
+        return None, {}
+    if values.size == 0:
+        points = np.zeros((0, 3), dtype=np.float32)
+    elif values.size in (LANDMARK_COUNT * 2, LANDMARK_COUNT * 3) and np.isfinite(values).all():
+        points = np.zeros((LANDMARK_COUNT, 3), dtype=np.float32)
+        columns = values.size // LANDMARK_COUNT
+        points[:, :columns] = values.reshape(LANDMARK_COUNT, columns)
+    else:
+        return None, {}
+
+    header = {k: v for k, v in message.items() if k != 'landmarks'}
+    handedness = header.get('handedness')
+    if handedness is not None and handedness not in HANDEDNESS:
+        return None, {}
+    if not header.get('mirrored'):
+        points[:, 0] = 1.0 - points[:, 0]
+        if handedness is not None:
+            header['handedness'] = HANDEDNESS[1 - HANDEDNESS.index(handedness)]
+    return points, header
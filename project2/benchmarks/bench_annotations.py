@@ -0,0 +1,99 @@
+"""Per-frame ink compositing cost: dense drawing arrays vs TiledCanvas.
+
+Fills an increasing share of a 1280x720 layer with scribbles and times the
+work ``process_frame`` does every frame to overlay the ink on the slide,
+both rebuilt from scratch and through the incremental Compositor with one
+new stroke segment per frame:
+
+    python benchmarks/bench_annotations.py [--repeat 50]
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from app.tiled_canvas import TiledCanvas  # noqa: E402
+from app.compositor import Compositor  # noqa: E402
+
+WIDTH = 1280
+HEIGHT = 720
+COVERAGES = (0.0, 0.01, 0.05, 0.25, 0.6)
+
+
+def scribble(rng, coverage, dense, tiled):
+    """Draw strokes into both layers until ``coverage`` of the area is inked."""
+    if coverage <= 0:
+        return
+    target = int(coverage * WIDTH * HEIGHT)
+    thickness = 6 if coverage < 0.2 else 30
+    while np.count_nonzero(dense.any(axis=2)) < target:
+        for _ in range(25):
+            x, y = int(rng.integers(0, WIDTH)), int(rng.integers(0, HEIGHT))
+            nx = int(np.clip(x + rng.integers(-80, 81), 0, WIDTH - 1))
+            ny = int(np.clip(y + rng.integers(-80, 81), 0, HEIGHT - 1))
+            cv2.line(dense, (x, y), (nx, ny), (0, 0, 255), thickness)
+            with tiled.region(min(x, nx) - thickness, min(y, ny) - thickness,
+                              max(x, nx) + thickness + 1, max(y, ny) + thickness + 1) as (patch, ox, oy):
+                cv2.line(patch, (x - ox, y - oy), (nx - ox, ny - oy), (0, 0, 255), thickness)
+
+
+def composite_dense(slide, drawing):
+    display = slide.copy()
+    if np.any(drawing):
+        mask = cv2.cvtColor(drawing, cv2.COLOR_BGR2GRAY)
+        display[mask != 0] = drawing[mask != 0]
+    return display
+
+
+def composite_tiled(slide, canvas):
+    display = slide.copy()
+    if not canvas.is_empty():
+        canvas.composite(display)
+    return display
+
+
+def incremental_frame(compositor, slide, canvas, rng):
+    x, y = int(rng.integers(100, WIDTH - 100)), int(rng.integers(100, HEIGHT - 100))
+    with canvas.region(x - 10, y - 10, x + 40, y + 40) as (patch, ox, oy):
+        cv2.line(patch, (x - ox, y - oy), (x + 30 - ox, y + 30 - oy), (255, 0, 0), 3)
+    return compositor.compose('slide', slide, canvas)
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=50)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    slide = np.full((HEIGHT, WIDTH, 3), 240, dtype=np.uint8)
+    copy_ms = timed(slide.copy, args.repeat)
+    print(f"slide.copy() alone: {copy_ms:.2f} ms")
+    print(f"{'coverage':>8} {'tiles':>6} {'dense ms':>9} {'tiled ms':>9} {'incr. ms':>9} {'ink MB dense/tiled':>20}")
+    for coverage in COVERAGES:
+        dense = np.zeros((HEIGHT, WIDTH, 3), dtype=np.uint8)
+        tiled = TiledCanvas(HEIGHT, WIDTH)
+        scribble(rng, coverage, dense, tiled)
+
+        dense_ms = timed(lambda: composite_dense(slide, dense), args.repeat)
+        tiled_ms = timed(lambda: composite_tiled(slide, tiled), args.repeat)
+        tiles, tiled_bytes = tiled.tile_count, tiled.nbytes
+        compositor = Compositor(HEIGHT, WIDTH)
+        compositor.compose('slide', slide, tiled)
+        incremental_ms = timed(lambda: incremental_frame(compositor, slide, tiled, rng), args.repeat)
+        print(f"{coverage:>8.0%} {tiles:>6} {dense_ms:>9.2f} {tiled_ms:>9.2f} {incremental_ms:>9.2f} "
+              f"{dense.nbytes / 1e6:>9.1f} / {tiled_bytes / 1e6:<8.1f}")
+
+
+if __name__ == '__main__':
+    main()
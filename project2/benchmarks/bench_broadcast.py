@@ -0,0 +1,132 @@
+"""Load test for the audience viewer broadcast.
+
+Connects N virtual viewers to a real python-socketio server and feeds it a
+stream of changing 1280x720 frames, comparing server CPU per frame for
+
+  naive      encode a base64 data URL and emit it separately per viewer
+  broadcast  ViewerRoom: encode once, one room emit, per-viewer ack gating
+
+Outgoing packets are counted instead of written to sockets, so the numbers
+are the server's own work. A fraction of viewers are slow and only ack
+every few frames; the broadcast skips them instead of queueing.
+
+    python benchmarks/bench_broadcast.py [--frames 120] [--viewers 1 10 50 200]
+"""
+import argparse
+import base64
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+import socketio
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.broadcast import ViewerRoom  # noqa: E402
+
+SLIDE_WIDTH = 1280
+SLIDE_HEIGHT = 720
+JPEG_QUALITY = 85
+
+
+def synthetic_frames(count):
+    slide = np.full((SLIDE_HEIGHT, SLIDE_WIDTH, 3), 245, dtype=np.uint8)
+    cv2.rectangle(slide, (0, 0), (SLIDE_WIDTH, 120), (120, 60, 20), -1)
+    for i in range(8):
+        cv2.putText(slide, f"- Bullet point number {i + 1}", (80, 200 + i * 55),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1.1, (40, 40, 40), 2)
+    frames = []
+    for i in range(count):
+        frame = slide.copy()
+        cv2.circle(frame, (100 + i * 8 % 1000, 400), 12, (0, 0, 255), -1)  # moving pointer
+        frames.append(frame)
+    return frames
+
+
+def encode_jpeg(frame):
+    _, buffer = cv2.imencode('.jpg', frame, [int(cv2.IMWRITE_JPEG_QUALITY), JPEG_QUALITY])
+    return buffer.tobytes()
+
+
+class CountingServer:
+    """A Socket.IO server whose transport only counts outgoing bytes."""
+
+    def __init__(self, viewers, room):
+        self.server = socketio.Server(async_mode='threading')
+        self.server.manager.initialize()
+        self.bytes_out = 0
+        self.packets_out = 0
+        self.server._send_eio_packet = self._count
+        self.sids = []
+        for i in range(viewers):
+            eio_sid = f'eio-{i}'
+            sid = self.server.manager.connect(eio_sid, '/')
+            self.server.manager.basic_enter_room(sid, '/', room, eio_sid)
+            self.sids.append(sid)
+
+    def _count(self, eio_sid, eio_pkt):
+        self.packets_out += 1
+        self.bytes_out += len(eio_pkt.data)
+
+    def send(self, event, data, to, skip_sid=None):
+        self.server.emit(event, data, to=to, skip_sid=skip_sid)
+
+
+def run_naive(frames, viewers):
+    counting = CountingServer(viewers, 'viewers:naive')
+    cpu_start = time.process_time()
+    for frame in frames:
+        for sid in counting.sids:
+            url = 'data:image/jpeg;base64,' + base64.b64encode(encode_jpeg(frame)).decode('utf-8')
+            counting.server.emit('viewer_frame', {'frame': url}, to=sid)
+    return (time.process_time() - cpu_start) / len(frames), counting
+
+
+def run_broadcast(frames, viewers, slow_every, slow_fraction):
+    room = ViewerRoom('presenter', None)
+    counting = CountingServer(viewers, room.room)
+    room.send = counting.send
+    slow = set(counting.sids[:int(viewers * slow_fraction)])
+    for sid in counting.sids:
+        room.add(sid)
+    cpu_start = time.process_time()
+    for i, frame in enumerate(frames):
+        room.publish({'frame': encode_jpeg(frame), 'version': i})
+        for sid in counting.sids:
+            if sid not in slow or i % slow_every == 0:
+                room.ack(sid)
+    cpu = (time.process_time() - cpu_start) / len(frames)
+    dropped = sum(v['dropped'] for v in room.stats().values())
+    return cpu, counting, dropped
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--frames', type=int, default=120)
+    parser.add_argument('--viewers', type=int, nargs='+', default=[1, 10, 50, 200])
+    parser.add_argument('--slow-fraction', type=float, default=0.2,
+                        help='share of viewers that only ack every --slow-every frames')
+    parser.add_argument('--slow-every', type=int, default=5)
+    parser.add_argument('--naive-max', type=int, default=50,
+                        help='skip the naive run above this many viewers')
+    args = parser.parse_args()
+
+    frames = synthetic_frames(args.frames)
+    print(f"{args.frames} frames of {SLIDE_WIDTH}x{SLIDE_HEIGHT}, JPEG q{JPEG_QUALITY}; "
+          f"{args.slow_fraction:.0%} of viewers ack every {args.slow_every} frames")
+    print(f"{'viewers':>8}  {'naive ms/frame':>15}  {'broadcast ms/frame':>19}  "
+          f"{'KiB out/frame':>14}  {'dropped':>8}")
+    for viewers in args.viewers:
+        naive = '-'
+        if viewers <= args.naive_max:
+            naive_cpu, _ = run_naive(frames, viewers)
+            naive = f'{naive_cpu * 1000:.2f}'
+        cpu, counting, dropped = run_broadcast(frames, viewers, args.slow_every, args.slow_fraction)
+        print(f"{viewers:>8}  {naive:>15}  {cpu * 1000:>19.2f}  "
+              f"{counting.bytes_out / len(frames) / 1024:>14.1f}  {dropped:>8}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+"""Per-style brush cost and a visual regression check for app/brushes.py.
+
+Times one stroke segment of every brush style, for the previous Python
+loops over OpenCV calls ("loop") and the vectorized brush engine
+("engine"), then draws the same seeded scribbles with both into a
+1280x720 layer; every style must come out pixel-identical.
+
+    python benchmarks/bench_brushes.py [--repeat 2000] [--thickness 2 4 6]
+                                       [--save DIR]
+
+``--save`` writes loop | engine | difference images per style. Exits
+non-zero if a style no longer matches; ``tests/test_brushes.py`` runs the
+same check with the test suite.
+"""
+import argparse
+import os
+import sys
+import time
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from app import brushes  # noqa: E402
+
+WIDTH = 1280
+HEIGHT = 720
+COLOR = (0, 165, 255)
+STYLES = ('spray', 'calligraphy', 'neon')
+
+
+# The brushes as HandGestureProcessor drew them before app/brushes.py
+
+def loop_spray(patch, origin, pos, color, thickness, rng):
+    x, y = pos
+    ox, oy = origin
+    for _ in range(20):
+        angle = rng.random() * 360
+        radius = rng.random() * thickness * 2
+        px = int(x + radius * np.cos(angle))
+        py = int(y + radius * np.sin(angle))
+        cv2.circle(patch, (px - ox, py - oy), 1, color, -1)
+
+
+def loop_calligraphy(patch, origin, start_pos, end_pos, color, thickness):
+    angle = np.arctan2(end_pos[1] - start_pos[1], end_pos[0] - start_pos[0]) + np.pi / 4
+    points = []
+    width = thickness * 2
+    for i in [-1, 1]:
+        dx = width * np.cos(angle) * i
+        dy = width * np.sin(angle) * i
+        points.append((int(start_pos[0] + dx), int(start_pos[1] + dy)))
+        points.append((int(end_pos[0] + dx), int(end_pos[1] + dy)))
+    cv2.fillPoly(patch, [np.array(points, np.int32)], color, offset=(-origin[0], -origin[1]))
+
+
+def loop_neon(patch, origin, start_pos, end_pos, color, thickness):
+    start_pos = (start_pos[0] - origin[0], start_pos[1] - origin[1])
+    end_pos = (end_pos[0] - origin[0], end_pos[1] - origin[1])
+    for glow in range(thickness * 2, thickness - 1, -1):
+        alpha = (glow - thickness) / (thickness * 2)
+        cv2.line(patch, start_pos, end_pos, tuple(int(c * alpha) for c in color), glow)
+    cv2.line(patch, start_pos, end_pos, color, thickness)
+
+
+def engine_calligraphy(patch, origin, start_pos, end_pos, color, thickness):
+    pts = brushes.calligraphy_polygon(start_pos, end_pos, thickness)
+    cv2.fillPoly(patch, [pts], color, offset=(-origin[0], -origin[1]))
+
+
+def paint(style, engine, patch, origin, start, end, thickness, rng):
+    if style == 'spray':
+        spray = brushes.spray if engine else loop_spray
+        spray(patch, origin, end, COLOR, thickness, rng)
+    elif style == 'calligraphy':
+        calligraphy = engine_calligraphy if engine else loop_calligraphy
+        calligraphy(patch, origin, start, end, COLOR, thickness)
+    else:
+        neon = brushes.neon if engine else loop_neon
+        neon(patch, origin, start, end, COLOR, thickness)
+
+
+def scribbles(seed, strokes=30, points=25):
+    """Seeded fingertip paths: lists of (x, y) a few pixels to ~40 px apart."""
+    rng = np.random.default_rng(seed)
+    paths = []
+    for _ in range(strokes):
+        steps = rng.integers(-40, 41, (points, 2))
+        start = [int(rng.integers(100, WIDTH - 100)), int(rng.integers(100, HEIGHT - 100))]
+        path = np.clip(np.cumsum(steps, axis=0) + start, 0, [WIDTH - 1, HEIGHT - 1])
+        paths.append([tuple(int(v) for v in p) for p in path])
+    return paths
+
+
+def time_segments(style, engine, thickness, repeat):
+    patch = np.zeros((256, 256, 3), dtype=np.uint8)
+    origin = (1000, 300)
+    segments = [((1100, 420), (1100 + dx, 420 + dy)) for dx, dy in ((12, 5), (-20, 17), (3, -30), (25, 25))]
+    rng = np.random.default_rng(0)
+    paint(style, engine, patch, origin, *segments[0], thickness, rng)  # warm up caches
+    start = time.perf_counter()
+    for i in range(repeat):
+        paint(style, engine, patch, origin, *segments[i % len(segments)], thickness, rng)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def draw_layer(style, engine, thickness, seed):
+    layer = np.zeros((HEIGHT, WIDTH, 3), dtype=np.uint8)
+    for stroke, path in enumerate(scribbles(seed)):
+        rng = np.random.default_rng(seed * 1000 + stroke)  # one seed per stroke, as journaled
+        for start, end in zip(path, path[1:]):
+            paint(style, engine, layer, (0, 0), start, end, thickness, rng)
+    return layer
+
+
+def compare_layers(before, after):
+    """Share of inked pixels that differ, and the largest channel difference."""
+    inked = before.any(axis=2) | after.any(axis=2)
+    differ = (before != after).any(axis=2)
+    share = differ.sum() / max(inked.sum(), 1)
+    return share, int(np.abs(before.astype(np.int16) - after).max())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=2000)
+    parser.add_argument('--thickness', type=int, nargs='+', default=[2, 4, 6])
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--save', help='directory for loop | engine | difference images')
+    args = parser.parse_args()
+
+    print(f"one segment, {args.repeat} repeats")
+    print(f"{'style':<12} {'size':>4}  {'loop us':>8}  {'engine us':>9}  {'speedup':>7}")
+    for style in STYLES:
+        for thickness in args.thickness:
+            loop_us = time_segments(style, False, thickness, args.repeat)
+            engine_us = time_segments(style, True, thickness, args.repeat)
+            print(f"{style:<12} {thickness:>4}  {loop_us:>8.1f}  {engine_us:>9.1f}  {loop_us / engine_us:>6.1f}x")
+
+    print(f"\nvisual check, {len(scribbles(args.seed))} seeded strokes at {WIDTH}x{HEIGHT}")
+    print(f"{'style':<12} {'size':>4}  {'differing ink':>13}  {'max diff':>8}")
+    ok = True
+    if args.save:
+        os.makedirs(args.save, exist_ok=True)
+    for style in STYLES:
+        for thickness in args.thickness:
+            before = draw_layer(style, False, thickness, args.seed)
+            after = draw_layer(style, True, thickness, args.seed)
+            share, max_diff = compare_layers(before, after)
+            failed = share > 0
+            ok &= not failed
+            print(f"{style:<12} {thickness:>4}  {share:>13.2%}  {max_diff:>8}{'  MISMATCH' if failed else ''}")
+            if args.save:
+                difference = cv2.absdiff(before, after)
+                cv2.imwrite(os.path.join(args.save, f'{style}-{thickness}.png'),
+                            np.hstack([before, after, difference]))
+    if not ok:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""Compare output frame encoders on real slide + ink frames.
+
+Renders the fixture deck at 1280x720, scribbles ink on each slide the way
+the brushes do, then times every available backend (see app/encoders.py)
+at each quality and chroma subsampling, for raw bytes (binary transport)
+and ``data:`` URLs (text transport):
+
+    python benchmarks/bench_encoders.py [--deck PDF] [--repeat 20]
+                                        [--quality 85 70 50] [--subsampling 420 444]
+
+Pick the fastest backend for the host and set FLASK_FRAME_ENCODER.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import cv2
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..'))
+from app.encoders import ENCODERS, available_encoders  # noqa: E402
+from app.slide_deck import render_page  # noqa: E402
+
+WIDTH = 1280
+HEIGHT = 720
+COLORS = [(0, 0, 255), (0, 255, 0), (255, 0, 0), (0, 255, 255), (255, 0, 255), (0, 165, 255)]
+
+
+def slide_frames(deck_path, seed=0):
+    import fitz
+    rng = np.random.default_rng(seed)
+    frames = []
+    with fitz.open(deck_path) as document:
+        for page in range(len(document)):
+            frame = render_page(document, page, WIDTH, HEIGHT)
+            for stroke in range(12):
+                color = COLORS[stroke % len(COLORS)]
+                thickness = int(rng.integers(2, 8))
+                points = np.cumsum(rng.integers(-15, 16, (40, 2)), axis=0) + \
+                    [int(rng.integers(100, WIDTH - 100)), int(rng.integers(100, HEIGHT - 100))]
+                points = np.clip(points, 0, [WIDTH - 1, HEIGHT - 1]).astype(np.int32)
+                if stroke % 3 == 2:  # neon-style glow
+                    cv2.polylines(frame, [points], False, tuple(c // 3 for c in color), thickness * 2)
+                cv2.polylines(frame, [points], False, color, thickness)
+            frames.append(frame)
+    return frames
+
+
+def time_encoder(encoder, frames, repeat, data_url):
+    encode = encoder.encode_data_url if data_url else encoder.encode
+    encode(frames[0])  # warm up
+    timings = []
+    size = 0
+    for _ in range(repeat):
+        for frame in frames:
+            start = time.perf_counter()
+            payload = encode(frame)
+            timings.append(time.perf_counter() - start)
+            size += len(payload)
+    return statistics.median(timings), size / (repeat * len(frames))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--deck', default=os.path.join(HERE, 'fixtures', 'deck.pdf'))
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--quality', type=int, nargs='+', default=[85, 70, 50])
+    parser.add_argument('--subsampling', nargs='+', default=['420', '444'])
+    args = parser.parse_args()
+
+    frames = slide_frames(args.deck)
+    backends = available_encoders()
+    missing = sorted(set(ENCODERS) - set(backends))
+    print(f"{len(frames)} slide+ink frames at {WIDTH}x{HEIGHT}, {args.repeat} repeats; "
+          f"backends: {', '.join(backends)}" + (f" (not installed: {', '.join(missing)})" if missing else ''))
+    print(f"{'backend':<10} {'q':>3} {'chroma':>6}  {'bytes ms':>8}  {'KiB':>7}  {'data URL ms':>11}")
+    results = []
+    for name in backends:
+        # WebP has no chroma option
+        subsamplings = ['420'] if name == 'webp' else args.subsampling
+        for quality in args.quality:
+            for subsampling in subsamplings:
+                encoder = ENCODERS[name](quality, subsampling)
+                seconds, size = time_encoder(encoder, frames, args.repeat, data_url=False)
+                url_seconds, _ = time_encoder(encoder, frames, args.repeat, data_url=True)
+                results.append((seconds, name, quality, subsampling))
+                print(f"{name:<10} {quality:>3} {subsampling:>6}  {seconds * 1000:>8.2f}  "
+                      f"{size / 1024:>7.1f}  {url_seconds * 1000:>11.2f}")
+    seconds, name, quality, subsampling = min(results)
+    print(f"fastest: {name} q{quality} {subsampling} at {seconds * 1000:.2f} ms/frame")
+
+
+if __name__ == '__main__':
+    main()
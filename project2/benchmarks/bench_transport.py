@@ -0,0 +1,95 @@
+"""Compare the text (base64 data URL) and binary frame transports.
+
+Measures payload bytes and CPU time per frame for both directions of the
+``process_frame`` / ``processed_frame`` round trip:
+
+    python benchmarks/bench_transport.py [--frames 200]
+"""
+import argparse
+import base64
+import time
+
+import cv2
+import numpy as np
+
+SLIDE_WIDTH = 1280
+SLIDE_HEIGHT = 720
+CAMERA_WIDTH = 800
+CAMERA_HEIGHT = 600
+JPEG_QUALITY = 85
+
+
+def synthetic_slide():
+    slide = np.full((SLIDE_HEIGHT, SLIDE_WIDTH, 3), 245, dtype=np.uint8)
+    cv2.rectangle(slide, (0, 0), (SLIDE_WIDTH, 120), (120, 60, 20), -1)
+    cv2.putText(slide, "Quarterly Review", (60, 85), cv2.FONT_HERSHEY_SIMPLEX, 2, (255, 255, 255), 3)
+    for i in range(8):
+        cv2.putText(slide, f"- Bullet point number {i + 1}", (80, 200 + i * 55),
+                    cv2.FONT_HERSHEY_SIMPLEX, 1.1, (40, 40, 40), 2)
+    cv2.line(slide, (700, 600), (1200, 200), (0, 0, 255), 4)
+    return slide
+
+
+def synthetic_camera_frame(rng):
+    frame = rng.integers(0, 255, (CAMERA_HEIGHT // 8, CAMERA_WIDTH // 8, 3), dtype=np.uint8)
+    return cv2.resize(frame, (CAMERA_WIDTH, CAMERA_HEIGHT), interpolation=cv2.INTER_LINEAR)
+
+
+def encode_jpeg(frame):
+    _, buffer = cv2.imencode('.jpg', frame, [int(cv2.IMWRITE_JPEG_QUALITY), JPEG_QUALITY])
+    return buffer
+
+
+def text_round_trip(camera_jpeg, slide):
+    # Client -> server: data URL, decoded the way _decode_base64_frame does
+    message = 'data:image/jpeg;base64,' + base64.b64encode(camera_jpeg).decode('utf-8')
+    img_bytes = base64.b64decode(message.split(',')[1])
+    cv2.imdecode(np.frombuffer(img_bytes, np.uint8), cv2.IMREAD_REDUCED_COLOR_2)
+    # Server -> client: JPEG -> base64 -> data URL
+    reply = f'data:image/jpeg;base64,{base64.b64encode(encode_jpeg(slide)).decode("utf-8")}'
+    return len(message), len(reply)
+
+
+def binary_round_trip(camera_jpeg, slide):
+    message = bytes(camera_jpeg)
+    cv2.imdecode(np.frombuffer(message, np.uint8), cv2.IMREAD_REDUCED_COLOR_2)
+    reply = encode_jpeg(slide).tobytes()
+    return len(message), len(reply)
+
+
+def run(name, fn, camera_jpegs, slide):
+    up = down = 0
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    for camera_jpeg in camera_jpegs:
+        sent, received = fn(camera_jpeg, slide)
+        up += sent
+        down += received
+    cpu = time.process_time() - cpu_start
+    wall = time.perf_counter() - wall_start
+    n = len(camera_jpegs)
+    print(f"{name:<8} up {up / n / 1024:8.1f} KiB  down {down / n / 1024:8.1f} KiB  "
+          f"cpu {cpu / n * 1000:6.2f} ms  wall {wall / n * 1000:6.2f} ms  per frame")
+    return up + down, cpu
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--frames', type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    slide = synthetic_slide()
+    camera_jpegs = [encode_jpeg(synthetic_camera_frame(rng)) for _ in range(min(args.frames, 20))]
+    camera_jpegs = (camera_jpegs * (args.frames // len(camera_jpegs) + 1))[:args.frames]
+
+    print(f"Round trip over {args.frames} frames ({CAMERA_WIDTH}x{CAMERA_HEIGHT} in, "
+          f"{SLIDE_WIDTH}x{SLIDE_HEIGHT} out, JPEG q{JPEG_QUALITY})")
+    text_bytes, text_cpu = run('text', text_round_trip, camera_jpegs, slide)
+    binary_bytes, binary_cpu = run('binary', binary_round_trip, camera_jpegs, slide)
+    print(f"binary saves {100 * (1 - binary_bytes / text_bytes):.1f}% bytes and "
+          f"{100 * (1 - binary_cpu / text_cpu):.1f}% CPU")
+
+
+if __name__ == '__main__':
+    main()
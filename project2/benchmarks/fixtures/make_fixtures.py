@@ -0,0 +1,123 @@
+"""Regenerate the fixture deck, camera frames and landmarks used by ``replay.py``.
+
+    python benchmarks/fixtures/make_fixtures.py
+
+The camera frames are synthetic and contain no hand MediaPipe would
+detect, so they only measure decode, inference and rendering of an idle
+presenter. ``landmarks.npz`` is a scripted hand instead: a sequence of
+21-point poses that points, draws, turns the slide forward and back and
+undoes, replayed with ``replay.py --input landmarks``.
+"""
+import os
+
+import cv2
+import fitz
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FRAME_WIDTH = 800
+FRAME_HEIGHT = 600
+FRAME_COUNT = 24
+PAGE_COUNT = 3
+
+# Scripted hand for landmarks.npz: (gesture, packets, fingertip path).
+# Fingers are thumb..pinky as in app/gesture_table.json; None is no hand.
+POSES = {
+    'POINTER': (0, 1, 0, 0, 0),
+    'DRAW': (0, 1, 1, 0, 0),
+    'NEXT': (1, 1, 1, 0, 0),
+    'PREVIOUS': (1, 1, 0, 0, 0),
+    'UNDO': (1, 0, 0, 0, 1),
+}
+SCRIPT = [
+    (None, 10, None),
+    ('POINTER', 60, ((0.25, 0.5), (0.75, 0.45))),
+    ('DRAW', 90, ((0.3, 0.6), (0.7, 0.6))),
+    (None, 10, None),
+    ('NEXT', 60, ((0.5, 0.5), (0.5, 0.5))),
+    (None, 10, None),
+    ('DRAW', 60, ((0.4, 0.4), (0.6, 0.7))),
+    ('UNDO', 40, ((0.5, 0.5), (0.5, 0.5))),
+    ('PREVIOUS', 60, ((0.5, 0.5), (0.5, 0.5))),
+    (None, 10, None),
+]
+
+
+def make_deck(path):
+    doc = fitz.open()
+    for i in range(PAGE_COUNT):
+        page = doc.new_page(width=960, height=540)
+        page.draw_rect(fitz.Rect(0, 0, 960, 90), color=None, fill=(0.08, 0.24, 0.47))
+        page.insert_text((40, 62), f"Fixture slide {i + 1}", fontsize=36, color=(1, 1, 1))
+        for line in range(5):
+            page.insert_text((60, 160 + line * 60), f"- Bullet point {line + 1}", fontsize=24)
+        page.draw_circle(fitz.Point(760, 330), 90 + 20 * i, color=(0.8, 0.1, 0.1), width=6)
+    doc.save(path, garbage=4, deflate=True)
+    doc.close()
+
+
+def make_frames(directory):
+    """A smooth background with a blob sweeping across, like a moving hand."""
+    os.makedirs(directory, exist_ok=True)
+    ys, xs = np.mgrid[0:FRAME_HEIGHT, 0:FRAME_WIDTH]
+    background = np.dstack([(xs * 0.15 + 60), (ys * 0.2 + 50), np.full(xs.shape, 90.0)]).astype(np.uint8)
+    for i in range(FRAME_COUNT):
+        frame = background.copy()
+        cx = int(150 + i * (FRAME_WIDTH - 300) / (FRAME_COUNT - 1))
+        cv2.ellipse(frame, (cx, 330), (70, 100), 0, 0, 360, (120, 160, 210), -1)
+        cv2.rectangle(frame, (cx - 12, 150), (cx + 12, 260), (120, 160, 210), -1)
+        cv2.imwrite(os.path.join(directory, f"{i:03d}.jpg"), frame, [int(cv2.IMWRITE_JPEG_QUALITY), 70])
+
+
+def hand_pose(fingers, tip):
+    """``(21, 3)`` landmarks, in the mirrored view, with the index tip at ``tip``.
+
+    Extended fingers have their tip above the PIP joint and folded ones
+    below it; the thumb is extended when its tip is left of its IP joint.
+    """
+    points = np.zeros((21, 3), dtype=np.float32)
+    x0, y0 = tip[0] - 0.01, tip[1] + 0.16  # index MCP below a raised tip
+    points[0] = (x0 + 0.04, y0 + 0.14, 0)  # wrist
+    for finger in range(1, 5):
+        mcp = np.array((x0 + 0.03 * (finger - 1), y0, 0))
+        if fingers[finger]:
+            joints = [mcp - (0, 0.05 * i, 0) for i in (0, 1, 2, 3)]
+        else:
+            joints = [mcp, mcp - (0, 0.04, 0), mcp - (0, 0.02, 0), mcp + (0, 0.01, 0)]
+        points[1 + 4 * finger:5 + 4 * finger] = joints
+    if fingers[0]:
+        points[1:5] = [(x0 - 0.02 - 0.025 * i, y0 + 0.1 - 0.02 * i, 0) for i in range(4)]
+    else:
+        points[1:5] = [(x0 - 0.02, y0 + 0.1, 0), (x0 - 0.03, y0 + 0.07, 0),
+                       (x0 - 0.02, y0 + 0.05, 0), (x0, y0 + 0.05, 0)]
+    if fingers[1]:
+        # Put the index tip exactly where the path says
+        points[:] += (tip[0] - points[8, 0], tip[1] - points[8, 1], 0)
+    return points
+
+
+def make_landmarks(path):
+    """Write the scripted hand as packets in camera coordinates, as clients send them."""
+    points, visible = [], []
+    for gesture, count, route in SCRIPT:
+        for i in range(count):
+            if gesture is None:
+                points.append(np.zeros((21, 3), dtype=np.float32))
+                visible.append(False)
+                continue
+            (x0, y0), (x1, y1) = route
+            t = i / max(count - 1, 1)
+            # A gentle wave along the path so strokes are not straight lines
+            tip = (x0 + (x1 - x0) * t, y0 + (y1 - y0) * t + 0.03 * np.sin(t * 4 * np.pi))
+            pose = hand_pose(POSES[gesture], tip)
+            pose[:, 0] = 1.0 - pose[:, 0]  # unmirror
+            points.append(pose)
+            visible.append(True)
+    np.savez_compressed(path, points=np.array(points, dtype=np.float32), visible=np.array(visible),
+                        handedness='Right')
+
+
+if __name__ == '__main__':
+    make_deck(os.path.join(HERE, 'deck.pdf'))
+    make_frames(os.path.join(HERE, 'frames'))
+    make_landmarks(os.path.join(HERE, 'landmarks.npz'))
@@ -0,0 +1,296 @@
+"""Replay recorded camera frames through HandGestureProcessor headlessly.
+
+Frames are JPEG files from a directory (sent as the binary transport does)
+or a text file with one ``data:image/jpeg;base64,...`` payload per line
+(as ``app.js`` sends them with the text transport). Reports per-stage
+timings, latency percentiles and throughput, and can save the results or
+compare them with a saved baseline:
+
+    python benchmarks/replay.py [--frames DIR|FILE] [--deck PDF] [--repeat 5]
+                                [--transport binary|text] [--delta]
+                                [--input frames|landmarks|both] [--landmarks NPZ]
+                                [--output results.json] [--baseline base.json]
+
+``--input landmarks`` replays hand landmarks as ``process_landmarks``
+packets, the way a client running its own hand tracking sends them: the
+``--landmarks`` file, the bundled scripted hand by default, or with
+``--frames`` given, hands tracked once up front in those frames. ``both``
+replays the two paths and compares them. Packets replay far faster than
+a camera delivers them, so gesture holds and cooldowns are turned off:
+otherwise no pose would last long enough to act. Results count the
+gestures each replay saw and the slide changes they caused.
+
+Without arguments it replays the bundled fixtures (see
+``fixtures/make_fixtures.py``), which is enough for a CPU-only CI box.
+The fixture frames contain no detectable hand; only the landmarks
+fixture exercises gestures, drawing and slide changes.
+"""
+import argparse
+import base64
+import glob
+import json
+import os
+import platform
+import sys
+import time
+from collections import Counter
+
+import numpy as np
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..'))
+from app.gesture_processor import HandGestureProcessor  # noqa: E402
+from app.gestures import GestureClassifier, load_gesture_table  # noqa: E402
+from app.hand_tracker import landmarks_to_array  # noqa: E402
+from app.transport import unpack_landmarks_message  # noqa: E402
+
+FIXTURES = os.path.join(HERE, 'fixtures')
+FIXTURE_FRAMES = os.path.join(FIXTURES, 'frames')
+FIXTURE_LANDMARKS = os.path.join(FIXTURES, 'landmarks.npz')
+STAGES = ('decode', 'resize_flip', 'mediapipe', 'gestures', 'composite', 'ui', 'encode')
+PERCENTILES = (50, 95, 99)
+
+
+def load_frames(path, transport):
+    """Return the frame payloads in the form the chosen transport sends."""
+    if os.path.isdir(path):
+        frames = []
+        for name in sorted(glob.glob(os.path.join(path, '*.jpg')) + glob.glob(os.path.join(path, '*.jpeg'))):
+            with open(name, 'rb') as f:
+                frames.append(f.read())
+    else:
+        with open(path) as f:
+            urls = [line.strip() for line in f if line.strip()]
+        frames = [base64.b64decode(url.split(',', 1)[-1]) for url in urls]
+    if transport == 'text':
+        return ['data:image/jpeg;base64,' + base64.b64encode(frame).decode('utf-8') for frame in frames]
+    return frames
+
+
+def record_landmarks(processor, frames):
+    """Track hands in ``frames`` once; return the ``process_landmarks`` packets."""
+    packets = []
+    for frame in frames:
+        results = processor.hands.process(processor._decode_stage(frame))
+        if not results.multi_hand_landmarks:
+            packets.append({'landmarks': None})
+            continue
+        points = landmarks_to_array(results.multi_hand_landmarks[0]).copy()
+        points[:, 0] = 1.0 - points[:, 0]  # back to camera coordinates, as clients send them
+        packet = {'landmarks': points.astype('<f4').tobytes()}
+        if results.multi_handedness:
+            label = results.multi_handedness[0].classification[0].label
+            packet['handedness'] = 'Left' if label == 'Right' else 'Right'
+        packets.append(packet)
+    return packets
+
+
+def load_landmarks(path):
+    """Read recorded ``process_landmarks`` packets (see ``make_fixtures.py``)."""
+    with np.load(path) as recording:
+        points = recording['points'].astype('<f4')
+        visible = recording['visible']
+        handedness = str(recording['handedness']) if 'handedness' in recording else None
+    packets = []
+    for hand, seen in zip(points, visible):
+        if not seen:
+            packets.append({'landmarks': None})
+            continue
+        packet = {'landmarks': hand.tobytes()}
+        if handedness:
+            packet['handedness'] = handedness
+        packets.append(packet)
+    return packets
+
+
+def untimed_classifier():
+    """The default gesture table with every hold and cooldown set to zero."""
+    table = load_gesture_table()
+    table['hold'] = 0.0
+    for gesture in table['gestures']:
+        gesture.pop('hold', None)
+        gesture.pop('cooldown', None)
+    return GestureClassifier(table)
+
+
+def summarize(samples):
+    samples = np.asarray(samples) * 1000
+    summary = {'mean_ms': round(float(samples.mean()), 3)}
+    for p in PERCENTILES:
+        summary[f'p{p}_ms'] = round(float(np.percentile(samples, p)), 3)
+    return summary
+
+
+def replay(processor, frames, repeat, warmup, delta, landmarks=False, binary=True):
+    if landmarks:
+        def process(packet, delta):
+            # Includes unpacking, which the server does per message too
+            points, header = unpack_landmarks_message(packet)
+            return processor.process_landmarks(points, header.get('handedness'), binary=binary, delta=delta)
+    else:
+        process = processor.process_frame
+
+    for frame in frames[:warmup]:
+        process(frame, delta=delta)
+
+    latencies = []
+    stages = {stage: [] for stage in STAGES}
+    gestures = Counter()
+    slide_changes = 0
+    failed = 0
+    wall_start = time.perf_counter()
+    for _ in range(repeat):
+        for frame in frames:
+            processor.stage_times = {}
+            slide = processor.current_slide
+            start = time.perf_counter()
+            result = process(frame, delta=delta)
+            latencies.append(time.perf_counter() - start)
+            if result is None:
+                failed += 1
+            # position_history is cleared whenever no hand is visible
+            gestures[processor.last_gesture if processor.position_history else 'no hand'] += 1
+            slide_changes += processor.current_slide != slide
+            for stage in STAGES:
+                stages[stage].append(processor.stage_times.get(stage, 0.0))
+    wall = time.perf_counter() - wall_start
+    processor.stage_times = None
+
+    return {
+        'frames': len(latencies),
+        'failed': failed,
+        'fps': round(len(latencies) / wall, 2),
+        'latency': summarize(latencies),
+        'stages': {stage: summarize(times) for stage, times in stages.items()},
+        'gestures': dict(sorted(gestures.items())),
+        'slide_changes': slide_changes,
+    }
+
+
+def print_results(results):
+    print(f"{results['frames']} frames, {results['failed']} failed, {results['fps']} fps")
+    print('gestures: ' + ', '.join(f"{name} {count}" for name, count in results['gestures'].items()) +
+          f"; {results['slide_changes']} slide changes")
+    header = f"{'stage':<12}{'mean':>9}" + ''.join(f"{'p' + str(p):>9}" for p in PERCENTILES)
+    print(header)
+    rows = list(results['stages'].items()) + [('total', results['latency'])]
+    for name, summary in rows:
+        print(f"{name:<12}{summary['mean_ms']:9.2f}" +
+              ''.join(f"{summary[f'p{p}_ms']:9.2f}" for p in PERCENTILES))
+
+
+def compare_inputs(frames, landmarks):
+    """Print how the landmarks path compares with full camera frames."""
+    print("\nlandmarks vs frames")
+    print(f"{'fps':<16}{frames['fps']:10.2f} -> {landmarks['fps']:10.2f}  "
+          f"x{landmarks['fps'] / frames['fps']:.1f}")
+    for p in PERCENTILES:
+        before = frames['latency'][f'p{p}_ms']
+        after = landmarks['latency'][f'p{p}_ms']
+        print(f"{'latency p' + str(p):<16}{before:10.2f} -> {after:10.2f}  x{before / max(after, 1e-6):.1f}")
+
+
+def compare(results, baseline, tolerance, min_delta_ms):
+    """Print changes against ``baseline``; return True if nothing regressed.
+
+    Latencies must also worsen by more than ``min_delta_ms`` to count, so
+    noise in sub-millisecond stages is not reported.
+    """
+    ok = True
+    checks = [('fps', baseline['fps'], results['fps'], False)]
+    checks += [(f'latency p{p}', baseline['latency'][f'p{p}_ms'], results['latency'][f'p{p}_ms'], True)
+               for p in PERCENTILES]
+    checks += [(f'{stage} p50', baseline['stages'][stage]['p50_ms'], results['stages'][stage]['p50_ms'], True)
+               for stage in STAGES if stage in baseline.get('stages', {})]
+    print(f"\nvs baseline (tolerance {tolerance:.0%})")
+    for name, before, after, lower_is_better in checks:
+        change = (after - before) / before if before else 0.0
+        if lower_is_better:
+            regressed = change > tolerance and after - before > min_delta_ms
+        else:
+            regressed = change < -tolerance
+        ok &= not regressed
+        print(f"{name:<16}{before:10.2f} -> {after:10.2f}  {change:+7.1%}{'  REGRESSION' if regressed else ''}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--frames', help='directory of JPEG frames or file of base64 data URLs '
+                                         '(default: the fixture frames)')
+    parser.add_argument('--deck', default=os.path.join(FIXTURES, 'deck.pdf'))
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--warmup', type=int, default=5)
+    parser.add_argument('--transport', choices=('binary', 'text'), default='binary')
+    parser.add_argument('--delta', action='store_true', help='request delta results like app.js')
+    parser.add_argument('--adaptive-inference', action='store_true')
+    parser.add_argument('--input', choices=('frames', 'landmarks', 'both'), default='frames',
+                        help='replay camera frames, client-tracked landmarks, or compare both')
+    parser.add_argument('--landmarks', help='recorded landmarks (.npz) for --input landmarks '
+                                            '(default: the scripted fixture hand, or hands '
+                                            'tracked in --frames when that is given)')
+    parser.add_argument('--output', help='write results as JSON')
+    parser.add_argument('--baseline', help='JSON results to compare against')
+    parser.add_argument('--tolerance', type=float, default=0.1,
+                        help='allowed relative regression before exiting non-zero')
+    parser.add_argument('--min-delta-ms', type=float, default=0.1,
+                        help='ignore latency regressions smaller than this')
+    args = parser.parse_args()
+
+    track_frames = args.frames is not None and args.landmarks is None
+    args.frames = args.frames or FIXTURE_FRAMES
+    if not track_frames:
+        args.landmarks = args.landmarks or FIXTURE_LANDMARKS
+    frames = load_frames(args.frames, args.transport)
+    if not frames:
+        parser.error(f"no frames found in {args.frames}")
+
+    def run(landmarks):
+        # A fresh processor per path, so neither inherits the other's ink
+        processor = HandGestureProcessor(adaptive_inference=args.adaptive_inference)
+        processor.gesture_classifier = untimed_classifier()
+        try:
+            if args.deck and not processor.open_deck(args.deck):
+                parser.error(f"could not open deck {args.deck}")
+            if not landmarks:
+                return replay(processor, frames, args.repeat, args.warmup, args.delta)
+            packets = record_landmarks(processor, frames) if track_frames else load_landmarks(args.landmarks)
+            return replay(processor, packets, args.repeat, args.warmup, args.delta,
+                          landmarks=True, binary=args.transport == 'binary')
+        finally:
+            processor.cleanup()
+
+    frame_results = run(False) if args.input != 'landmarks' else None
+    landmark_results = run(True) if args.input != 'frames' else None
+    results = frame_results or landmark_results
+
+    results['config'] = {
+        'frames': os.path.relpath(args.frames),
+        'landmarks': landmark_results and args.landmarks and os.path.relpath(args.landmarks),
+        'deck': args.deck and os.path.relpath(args.deck),
+        'transport': args.transport,
+        'delta': args.delta,
+        'input': 'landmarks' if frame_results is None else 'frames',
+        'adaptive_inference': args.adaptive_inference,
+        'python': platform.python_version(),
+        'machine': platform.machine(),
+    }
+    print_results(results)
+    if frame_results and landmark_results:
+        print("\nlandmarks input")
+        print_results(landmark_results)
+        compare_inputs(frame_results, landmark_results)
+        results['landmarks'] = landmark_results
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if not compare(results, baseline, args.tolerance, args.min_delta_ms):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""Slide rasterization, importable without the ``app`` package.
+
+Render pool workers are spawned processes that unpickle their entry point
+by module name. Anything under ``app`` would first run ``app/__init__``,
+which builds the Flask app, the session manager, the converter pool and
+the deck cache in every worker; this module only needs OpenCV, NumPy and
+PyMuPDF.
+"""
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+
+def render_page(pdf_document, page_num, width, height):
+    """Rasterize one PDF page straight to a ``height x width`` BGR array."""
+    import fitz
+    page = pdf_document[page_num]
+    rect = page.rect
+    pix = page.get_pixmap(matrix=fitz.Matrix(width / rect.width, height / rect.height), alpha=False)
+    raster = np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width, pix.n)
+    if (pix.width, pix.height) != (width, height):
+        # Rounding of the page box can leave a pixel over or under
+        raster = cv2.resize(raster, (width, height), interpolation=cv2.INTER_AREA)
+    return cv2.cvtColor(raster, cv2.COLOR_RGB2BGR)
+
+
+# Documents opened by a render pool worker process, most recent last
+_worker_documents = OrderedDict()
+_WORKER_DOCUMENTS = 4
+
+
+def render_in_worker(pdf_path, page_num, width, height):
+    """Render pool entry point; each worker keeps its own open documents."""
+    document = _worker_documents.get(pdf_path)
+    if document is None:
+        import fitz
+        document = _worker_documents[pdf_path] = fitz.open(pdf_path)
+        while len(_worker_documents) > _WORKER_DOCUMENTS:
+            _worker_documents.popitem(last=False)[1].close()
+    else:
+        _worker_documents.move_to_end(pdf_path)
+    return render_page(document, page_num, width, height)
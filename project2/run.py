@@ -1,6 +1,27 @@
-from app import app, socketio
+import logging
+import threading
+
+
+def _report_when_warm(session_manager, startup_report):
+    session_manager.spare_ready.wait()
+    startup_report.log()
+
 
 if __name__ == '__main__':
+    # Imported here, not at module level: spawned render pool workers
+    # re-import this module and must not build the app again
+    from app import app, socketio, converter, session_manager, reap_sessions
+    from app.startup import startup_report
+
+    logging.basicConfig(level=logging.INFO)
+    # Initialize LibreOffice profiles and MediaPipe before the first presenter arrives
+    converter.start()
+    session_manager.start_warm_up(report=True)
+    socketio.start_background_task(reap_sessions)
+    if session_manager.warm_spare:
+        threading.Thread(target=_report_when_warm, args=(session_manager, startup_report), daemon=True).start()
+    else:
+        startup_report.log()
     socketio.run(app, 
         debug=True, 
         host='0.0.0.0', 
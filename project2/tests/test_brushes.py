@@ -0,0 +1,27 @@
+"""The vectorized brushes in app/brushes.py against the per-pixel loops they replaced."""
+import numpy as np
+import pytest
+
+from bench_brushes import STYLES, draw_layer, paint
+
+
+@pytest.mark.parametrize('thickness', [2, 4, 6])
+@pytest.mark.parametrize('style', STYLES)
+def test_engine_matches_loops(style, thickness):
+    np.testing.assert_array_equal(draw_layer(style, True, thickness, seed=7),
+                                  draw_layer(style, False, thickness, seed=7))
+
+
+@pytest.mark.parametrize('style', STYLES)
+def test_engine_matches_loops_in_offset_patch(style):
+    # Segments partly outside a small patch, as TiledCanvas.region hands out
+    origin = (1000, 300)
+    segments = [((1010, 305), (990, 290)), ((1100, 420), (1140, 380)), ((1070, 350), (1060, 365))]
+    layers = []
+    for engine in (False, True):
+        patch = np.zeros((128, 128, 3), dtype=np.uint8)
+        rng = np.random.default_rng(3)
+        for start, end in segments:
+            paint(style, engine, patch, origin, start, end, 4, rng)
+        layers.append(patch)
+    np.testing.assert_array_equal(*layers)
@@ -0,0 +1,43 @@
+import os
+
+from app.deck_cache import DeckCache
+from app.slide_deck import SlideDeck
+
+DECK = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'benchmarks', 'fixtures', 'deck.pdf')
+
+
+def store(cache, name):
+    key = cache.key(name.encode())
+    return key, cache.store_pdf(key, DECK, 3)
+
+
+def test_open_deck_pins_its_entry(tmp_path):
+    cache = DeckCache(root=str(tmp_path), max_bytes=10 ** 9)
+    key, pdf = store(cache, 'open')
+    deck = SlideDeck(pdf, deck_cache=cache, cache_key=key)
+    other, _ = store(cache, 'other')
+
+    cache.max_bytes = 0
+    cache.evict()
+    assert cache.pdf_path(key) is not None  # still in use
+    assert cache.pdf_path(other) is None
+    assert deck[1] is not None  # lazy renders keep working
+
+    deck.close()
+    deck.close()  # closing twice releases the pin once
+    cache.evict()
+    assert cache.pdf_path(key) is None
+
+
+def test_pins_are_counted(tmp_path):
+    cache = DeckCache(root=str(tmp_path), max_bytes=10 ** 9)
+    key, pdf = store(cache, 'shared')
+    first = SlideDeck(pdf, deck_cache=cache, cache_key=key)
+    second = SlideDeck(pdf, deck_cache=cache, cache_key=key)
+    cache.max_bytes = 0
+    first.close()
+    cache.evict()
+    assert cache.pdf_path(key) is not None
+    second.close()
+    cache.evict()
+    assert cache.pdf_path(key) is None
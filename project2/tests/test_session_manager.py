@@ -0,0 +1,26 @@
+import time
+
+from app.session_manager import SessionManager
+
+
+class FakeProcessor:
+    def __init__(self):
+        self.closed = False
+
+    def cleanup(self):
+        self.closed = True
+
+
+def test_evict_idle_closes_expired_detached_sessions():
+    closed = []
+    manager = SessionManager(processor_factory=FakeProcessor, reconnect_grace=0.01,
+                             on_close=closed.append)
+    session = manager.get('presenter')
+    manager.get('other')
+    manager.detach('presenter')
+    time.sleep(0.02)
+
+    assert manager.evict_idle() == 1
+    assert closed == [session]
+    assert session.processor.closed
+    assert 'presenter' not in manager and 'other' in manager
@@ -0,0 +1,38 @@
+import cv2
+import numpy as np
+
+from app.tiled_canvas import TiledCanvas
+
+HEIGHT, WIDTH = 720, 1280
+
+
+def fill(canvas, dense, x0, y0, x1, y1, color):
+    cv2.rectangle(dense, (x0, y0), (x1 - 1, y1 - 1), color, -1)
+    with canvas.region(x0, y0, x1, y1) as (patch, ox, oy):
+        if patch is not None:
+            cv2.rectangle(patch, (x0 - ox, y0 - oy), (x1 - 1 - ox, y1 - 1 - oy), color, -1)
+
+
+def test_matches_dense_layer_across_edges():
+    canvas = TiledCanvas(HEIGHT, WIDTH)
+    dense = np.zeros((HEIGHT, WIDTH, 3), dtype=np.uint8)
+    fill(canvas, dense, 1200, 700, 1300, 760, (0, 0, 255))  # crosses the bottom-right edge
+    fill(canvas, dense, 10, 10, 300, 200, (1, 0, 0))  # barely nonzero ink still counts
+    np.testing.assert_array_equal(canvas.to_array(), dense)
+    for x, y, tile, mask in canvas.tiles():
+        assert tile.shape[:2] == mask.shape
+        assert y + tile.shape[0] <= HEIGHT and x + tile.shape[1] <= WIDTH
+        np.testing.assert_array_equal(mask, dense[y:y + mask.shape[0], x:x + mask.shape[1]].any(axis=2))
+
+
+def test_memory_break_even():
+    canvas = TiledCanvas(HEIGHT, WIDTH)
+    dense = np.zeros((HEIGHT, WIDTH, 3), dtype=np.uint8)
+    for y in range(0, HEIGHT, 64):
+        fill(canvas, dense, 0, y + 5, WIDTH, y + 8, (0, 255, 0))
+        covered = sum(tile.shape[0] * tile.shape[1] for _, _, tile, _ in canvas.tiles())
+        if covered < 0.95 * HEIGHT * WIDTH:
+            assert canvas.nbytes < dense.nbytes
+    # Every tile inked: at most the packed masks on top of the dense size
+    assert canvas.tile_count == canvas.rows * canvas.cols
+    assert dense.nbytes < canvas.nbytes <= dense.nbytes * (1 + 1 / 24)
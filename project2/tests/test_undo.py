@@ -0,0 +1,51 @@
+"""Undo on a fresh surface, driven through ``process_landmarks``."""
+import numpy as np
+import pytest
+
+pytest.importorskip('mediapipe')
+
+from app.gesture_processor import HandGestureProcessor  # noqa: E402
+from fixtures.make_fixtures import POSES, hand_pose  # noqa: E402
+from replay import untimed_classifier  # noqa: E402
+
+
+@pytest.fixture
+def processor():
+    processor = HandGestureProcessor()
+    processor.gesture_classifier = untimed_classifier()
+    yield processor
+    processor.cleanup()
+
+
+def draw_stroke(processor, y=0.6):
+    for t in np.linspace(0.0, 1.0, 20):
+        processor.process_landmarks(hand_pose(POSES['DRAW'], (0.3 + 0.4 * t, y)), binary=True)
+    processor.process_landmarks(np.empty((0, 3), dtype=np.float32), binary=True)  # hand lost
+
+
+@pytest.mark.parametrize('whiteboard', [False, True])
+def test_undo_first_stroke_empties_layer(processor, whiteboard):
+    if whiteboard:
+        processor.toggle_whiteboard()
+    draw_stroke(processor)
+    layer = processor._drawing_layer()
+    assert layer is not None and not layer.is_empty()
+
+    assert processor.undo()
+    assert layer.is_empty()
+    assert processor.history_state() == {'canUndo': False, 'canRedo': True}
+
+    assert processor.redo()
+    assert not layer.is_empty()
+
+
+def test_undo_first_stroke_after_clear(processor):
+    draw_stroke(processor)
+    processor.clear_drawings()
+    layer = processor._drawing_layer()
+    assert layer.is_empty()
+
+    assert processor.undo()
+    assert not layer.is_empty()
+    assert processor.undo()
+    assert layer.is_empty()